@@ -54,6 +54,17 @@ export function useI18n() {
   return context
 }
 
+// Official template labels, one lazily loaded chunk per language
+// (generated by scripts/translations.py from the 'Translations' sheet)
+const templateLabelShards = import.meta.glob<Record<string, string>>("../locales/template/[a-z][a-z].json", {
+  import: "default",
+})
+
+export async function loadTemplateLabels(language: string): Promise<Record<string, string>> {
+  const load = templateLabelShards[`../locales/template/${language}.json`]
+  return load ? load() : {}
+}
+
 export const supportedLanguages: Array<{ value: Language; label: string }> = [
   { value: "en", label: "English" },
   { value: "de", label: "Deutsch" },
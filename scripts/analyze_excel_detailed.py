@@ -13,6 +13,15 @@ except ImportError:
     import openpyxl
     from openpyxl.utils import get_column_letter
 
+from field_records import FieldRecord
+
+
+class FormField(FieldRecord):
+    """A form field candidate found in a Basic Report sheet"""
+    __slots__ = ('row', 'label', 'data_type', 'required', 'optional', 'options', 'sheet')
+    _keys = __slots__
+    _interned = frozenset({'sheet'})
+
 def analyze_sheet_detailed(ws, sheet_name):
     """Analyze a sheet in detail for form fields"""
     print(f"\n{'='*80}")
@@ -84,15 +93,15 @@ def analyze_sheet_detailed(ws, sheet_name):
                                 ]):
                                     options.append(option)
                 
-                field = {
-                    'row': row_idx,
-                    'label': label,
-                    'data_type': data_type,
-                    'required': required,
-                    'optional': optional,
-                    'options': options[:10] if options else None,  # Limit to 10 options
-                    'sheet': sheet_name
-                }
+                field = FormField(
+                    row=row_idx,
+                    label=label,
+                    data_type=data_type,
+                    required=required,
+                    optional=optional,
+                    options=tuple(options[:10]) if options else None,  # Limit to 10 options
+                    sheet=sheet_name
+                )
                 
                 fields.append(field)
     
@@ -122,11 +131,11 @@ def analyze_basic_report_sheets(wb):
             
             # Group fields by category
             for field in fields[:30]:  # Show first 30 fields
-                req_str = "[REQUIRED]" if field['required'] else "[OPTIONAL]" if field['optional'] else ""
-                type_str = f"Type: {field['data_type']}"
-                options_str = f"Options: {', '.join(field['options'])}" if field['options'] else ""
+                req_str = "[REQUIRED]" if field.required else "[OPTIONAL]" if field.optional else ""
+                type_str = f"Type: {field.data_type}"
+                options_str = f"Options: {', '.join(field.options)}" if field.options else ""
                 
-                print(f"  Row {field['row']:3d}: {req_str} {field['label'][:60]}")
+                print(f"  Row {field.row:3d}: {req_str} {field.label[:60]}")
                 if options_str:
                     print(f"           {options_str[:70]}")
         else:
@@ -158,8 +167,8 @@ def main():
         required_fields = 0
         for sheet_name, sheet_fields in fields.items():
             total_fields += len(sheet_fields)
-            required_fields += sum(1 for f in sheet_fields if f['required'])
-            print(f"{sheet_name}: {len(sheet_fields)} fields ({sum(1 for f in sheet_fields if f['required'])} required)")
+            required_fields += sum(1 for f in sheet_fields if f.required)
+            print(f"{sheet_name}: {len(sheet_fields)} fields ({sum(1 for f in sheet_fields if f.required)} required)")
         
         print(f"\nTotal Basic Report fields: {total_fields}")
         print(f"Total required fields: {required_fields}")
@@ -175,7 +184,7 @@ def main():
             print("interface " + sheet_name.replace(" ", "") + "Data {")
             for field in sheet_fields[:20]:  # Show first 20 fields per sheet
                 # Create field name from label
-                field_name = field['label'][:50].lower()
+                field_name = field.label[:50].lower()
                 field_name = field_name.replace(' ', '_')
                 field_name = field_name.replace('-', '_')
                 field_name = field_name.replace('[', '').replace(']', '')
@@ -185,15 +194,15 @@ def main():
                 
                 # Determine TypeScript type
                 ts_type = 'string'
-                if field['data_type'] == 'number':
+                if field.data_type == 'number':
                     ts_type = 'number'
-                elif field['data_type'] == 'boolean':
+                elif field.data_type == 'boolean':
                     ts_type = 'boolean'
-                elif field['options']:
-                    ts_type = f'"{'\" | \"'.join(field['options'][:5])}"'
+                elif field.options:
+                    ts_type = ' | '.join(f'"{option}"' for option in field.options[:5])
                 
-                optional = '?' if not field['required'] else ''
-                print(f"  {field_name}{optional}: {ts_type}  // {field['label'][:50]}")
+                optional = '?' if not field.required else ''
+                print(f"  {field_name}{optional}: {ts_type}  // {field.label[:50]}")
             print("}")
             print("```")
         
@@ -11,6 +11,25 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
     import openpyxl
 
+from field_records import FieldRecord, records_to_json
+
+
+class DataCell(FieldRecord):
+    """A non-empty data cell next to a field label"""
+    __slots__ = ('col', 'value')
+    _keys = ('col', 'value')
+
+
+class BasicField(FieldRecord):
+    """A Basic Report field with its exact cell position"""
+    __slots__ = (
+        'sheet', 'row', 'disclosure_code', 'paragraph_reference',
+        'guidance_reference', 'label', 'field_type', 'required', 'optional',
+        'data_cells', 'options'
+    )
+    _keys = __slots__
+    _interned = frozenset({'sheet', 'disclosure_code'})
+
 def extract_field_structure(ws, sheet_name):
     """Extract field structure with exact cell positions"""
     fields = []
@@ -70,10 +89,10 @@ def extract_field_structure(ws, sheet_name):
         for col_idx in range(4, min(10, ws.max_column + 1)):
             cell = ws.cell(row=row_idx, column=col_idx)
             if cell.value and str(cell.value).strip() not in ['-', 'N/A', 'TBD', '']:
-                data_cells.append({
-                    'col': col_idx,
-                    'value': str(cell.value).strip()[:100]
-                })
+                data_cells.append(DataCell(
+                    col=col_idx,
+                    value=str(cell.value).strip()[:100]
+                ))
         
         # Determine field type
         if 'year' in label.lower() or 'date' in label.lower():
@@ -103,19 +122,19 @@ def extract_field_structure(ws, sheet_name):
                             if len(options) >= 10:  # Limit options
                                 break
         
-        field = {
-            'sheet': sheet_name,
-            'row': row_idx,
-            'disclosure_code': disclosure_code,
-            'paragraph_reference': para_ref,
-            'guidance_reference': guidance_ref,
-            'label': label,
-            'field_type': field_type,
-            'required': is_required,
-            'optional': is_optional,
-            'data_cells': data_cells,
-            'options': options if options else None
-        }
+        field = BasicField(
+            sheet=sheet_name,
+            row=row_idx,
+            disclosure_code=disclosure_code,
+            paragraph_reference=para_ref,
+            guidance_reference=guidance_ref,
+            label=label,
+            field_type=field_type,
+            required=is_required,
+            optional=is_optional,
+            data_cells=tuple(data_cells),
+            options=tuple(options) if options else None
+        )
         
         fields.append(field)
     
@@ -148,7 +167,7 @@ def main():
             # Group by disclosure code
             by_code = {}
             for field in fields:
-                code = field['disclosure_code'] or 'Other'
+                code = field.disclosure_code or 'Other'
                 if code not in by_code:
                     by_code[code] = []
                 by_code[code].append(field)
@@ -156,12 +175,15 @@ def main():
             for code, code_fields in sorted(by_code.items()):
                 print(f"\n{code}: {len(code_fields)} fields")
                 for field in code_fields[:5]:  # Show first 5
-                    req = "[REQUIRED]" if field['required'] else "[OPTIONAL]" if field['optional'] else ""
-                    print(f"  {req} Row {field['row']:3d}: {field['label'][:70]}")
+                    req = "[REQUIRED]" if field.required else "[OPTIONAL]" if field.optional else ""
+                    print(f"  {req} Row {field.row:3d}: {field.label[:70]}")
     
     # Save to JSON for reference
     with open('vsme_fields_structure.json', 'w', encoding='utf-8') as f:
-        json.dump(all_fields, f, indent=2, ensure_ascii=False)
+        json.dump(
+            {sheet_name: records_to_json(fields) for sheet_name, fields in all_fields.items()},
+            f, indent=2, ensure_ascii=False
+        )
     
     print(f"\n{'='*80}")
     print("Field structure saved to vsme_fields_structure.json")
@@ -169,7 +191,7 @@ def main():
     
     # Generate summary
     total = sum(len(fields) for fields in all_fields.values())
-    required = sum(sum(1 for f in fields if f['required']) for fields in all_fields.values())
+    required = sum(sum(1 for f in fields if f.required) for fields in all_fields.values())
     
     print(f"\nSummary:")
     print(f"  Total fields: {total}")
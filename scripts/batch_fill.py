@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Fill a whole portfolio of reports from a JSONL file of payloads.
+
+Each input line is ``{"reportId", "datapoints", "tables"}`` (the format of
+synthetic_reports' payloads.jsonl; ``tables`` is optional, a missing
+``reportId`` becomes the line number). The template is read once into a
+`multiprocessing.shared_memory` block; every worker builds its `ReportFiller`
+on that block, so the template entries copied into each workbook unchanged
+are streamed from the shared pages instead of a per-process copy. The parsed
+and compiled template is not shared: each worker inflates the parts it
+patches (mapped worksheets, sharedStrings.xml, workbook.xml, about 1 MB) and
+compiles its own sheets from the spec. The parent only hands out raw lines,
+so JSON parsing and filling both scale with the number of workers.
+
+Output goes to a directory (``<reportId>.xlsx`` per report, written by the
+workers and renamed by the parent), or to a single ``.zip`` or ``.tar``
+archive written by the parent as results arrive, in input order. In both
+modes the parent names the files, so repeated report ids get the same
+``-2``, ``-3`` suffixes. Lines that fail are reported and skipped.
+
+    python scripts/batch_fill.py payloads.jsonl --output build/reports [--jobs 8]
+    python scripts/batch_fill.py payloads.jsonl --output portfolio.zip
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tarfile
+import time
+import zipfile
+from multiprocessing import shared_memory
+from typing import IO, Iterator, NamedTuple, Optional, Tuple
+
+from import_filled_report import SPEC_PATH
+from normalize_template import fill_template_path
+from report_filler import ReportFiller
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar')
+UNSAFE_NAME_RE = re.compile(r'[^\w.-]+')
+
+
+class Result(NamedTuple):
+    line: int
+    report_id: str
+    size: int
+    content: Optional[bytes] = None
+    error: Optional[str] = None
+    # Directory mode: the worker's file, renamed by the parent
+    temporary: Optional[str] = None
+
+
+def file_name(report_id: str) -> str:
+    return UNSAFE_NAME_RE.sub('_', report_id).strip('._') or 'report'
+
+
+# Per worker process, set by _init_worker
+_filler: Optional[ReportFiller] = None
+_memory: Optional[shared_memory.SharedMemory] = None
+_directory: Optional[str] = None
+
+
+def _init_worker(memory_name: Optional[str], size: int, template_path: str, spec_path: str,
+                 directory: Optional[str], inline_strings: bool = False) -> None:
+    global _filler, _memory, _directory
+    template = None
+    if memory_name:
+        # Spawned workers share the parent's resource tracker, which unlinks
+        # the block only if the parent does not
+        _memory = shared_memory.SharedMemory(memory_name)
+        template = _memory.buf[:size]
+    _filler = ReportFiller(template_path, spec_path, template, inline_strings)
+    _directory = directory
+
+
+def _fill(job: Tuple[int, str]) -> Result:
+    """Fill one payload line; written to the output directory when there is
+    one, returned as bytes otherwise"""
+    line_number, line = job
+    report_id = str(line_number)
+    try:
+        record = json.loads(line)
+        report_id = str(record.get('reportId') or report_id)
+        content = _filler.fill(record.get('datapoints', []), record.get('tables'))
+    except (ValueError, TypeError, AttributeError) as e:
+        return Result(line_number, report_id, 0, error=f"{type(e).__name__}: {e}")
+    if _directory is None:
+        return Result(line_number, report_id, len(content), content)
+    temporary = os.path.join(_directory, f'.line-{line_number}.xlsx.tmp')
+    with open(temporary, 'wb') as f:
+        f.write(content)
+    return Result(line_number, report_id, len(content), temporary=temporary)
+
+
+def iter_lines(stream: IO[str]) -> Iterator[Tuple[int, str]]:
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            yield number, line
+
+
+class UniqueNames:
+    """File names of report ids, suffixed -2, -3, ... on repeats"""
+
+    def __init__(self) -> None:
+        self.names = set()
+
+    def take(self, report_id: str) -> str:
+        name = file_name(report_id)
+        unique, n = name, 1
+        while unique in self.names:
+            n += 1
+            unique = f'{name}-{n}'
+        self.names.add(unique)
+        return unique
+
+
+class ArchiveWriter:
+    """Workbooks appended to a .zip (stored: xlsx is compressed already) or .tar"""
+
+    def __init__(self, path: str) -> None:
+        self.tar = path.endswith('.tar')
+        self.archive = tarfile.open(path, 'w') if self.tar else zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED)
+        self.names = UniqueNames()
+
+    def add(self, result: Result) -> None:
+        unique = self.names.take(result.report_id)
+        if self.tar:
+            info = tarfile.TarInfo(unique + '.xlsx')
+            info.size = len(result.content)
+            info.mtime = int(time.time())
+            self.archive.addfile(info, io.BytesIO(result.content))
+        else:
+            self.archive.writestr(unique + '.xlsx', result.content)
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+class DirectoryWriter:
+    """Workbooks written by the workers, renamed in input order"""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.names = UniqueNames()
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, result: Result) -> None:
+        os.replace(result.temporary, os.path.join(self.directory, self.names.take(result.report_id) + '.xlsx'))
+
+    def close(self) -> None:
+        pass
+
+
+def batch_fill(payloads: IO[str], output: str, jobs: int = 1, template_path: Optional[str] = None,
+               spec_path: str = SPEC_PATH, inline_strings: bool = False) -> Iterator[Result]:
+    """Fill every payload line into ``output`` (directory or archive); yields
+    each result in input order as it is written"""
+    template_path = template_path or fill_template_path()
+    archive = output.endswith(ARCHIVE_SUFFIXES)
+    writer = ArchiveWriter(output) if archive else DirectoryWriter(output)
+    directory = None if archive else output
+    memory = None
+    try:
+        if jobs > 1:
+            with open(template_path, 'rb') as f:
+                template = f.read()
+            memory = shared_memory.SharedMemory(create=True, size=len(template))
+            memory.buf[:len(template)] = template
+            initargs = (memory.name, len(template), template_path, spec_path, directory, inline_strings)
+            with multiprocessing.get_context('spawn').Pool(jobs, _init_worker, initargs) as pool:
+                # imap keeps the output ordered and streams results as they finish
+                for result in pool.imap(_fill, iter_lines(payloads), chunksize=4):
+                    if not result.error:
+                        writer.add(result)
+                    yield result._replace(content=None, temporary=None)
+        else:
+            _init_worker(None, 0, template_path, spec_path, directory, inline_strings)
+            for job in iter_lines(payloads):
+                result = _fill(job)
+                if not result.error:
+                    writer.add(result)
+                yield result._replace(content=None, temporary=None)
+    finally:
+        writer.close()
+        if memory:
+            memory.close()
+            memory.unlink()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill many reports from a JSONL file of payloads")
+    parser.add_argument('payloads', help="JSONL file, one {reportId, datapoints, tables} per line ('-': stdin)")
+    parser.add_argument('--output', required=True, help="Directory, or a .zip / .tar archive to write")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--template', default=fill_template_path(),
+                        help="Excel template to fill (the normalized one once built)")
+    parser.add_argument('--spec', default=SPEC_PATH, help="Data model spec with the cell addresses")
+    parser.add_argument('--inline-strings', action='store_true',
+                        help="Write text as inline strings; sharedStrings.xml is copied untouched")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    written = failed = total_bytes = 0
+    stream = sys.stdin if args.payloads == '-' else open(args.payloads, encoding='utf-8')
+    try:
+        for result in batch_fill(stream, args.output, args.jobs, args.template, args.spec, args.inline_strings):
+            if result.error:
+                failed += 1
+                print(f"\n⚠️  line {result.line} ({result.report_id}): {result.error}", file=sys.stderr)
+                continue
+            written += 1
+            total_bytes += result.size
+            if written % 50 == 0:
+                elapsed = time.perf_counter() - started
+                print(f"\r  {written} reports, {written / elapsed:.0f}/s", end='', file=sys.stderr)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    elapsed = time.perf_counter() - started
+    print(file=sys.stderr)
+    print(f"✓ {written} reports in {elapsed:.1f} s ({written / elapsed if elapsed else 0:.0f}/s, "
+          f"{args.jobs} job(s)), {total_bytes / 1024 / 1024:.1f} MB -> {args.output}"
+          + (f", {failed} failed" if failed else ''))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Incremental build of the generated data-model artifacts.
+
+Every generator script is declared as a stage with its input files and its
+output (a file, or a directory whose files are hashed together); the local modules a script imports, directly or through other
+modules, are found from its `import` statements and count as inputs too.
+`build` hashes the inputs (SHA-256), compares them with the stamps
+recorded by the last successful run and reruns only the stages whose inputs or
+output changed. A stage whose output changes invalidates every stage reading
+it. Stages whose dependencies are satisfied run concurrently.
+
+    python scripts/build_data_model.py build [--force] [--jobs N] [--dry-run]
+    python scripts/build_data_model.py status
+"""
+import argparse
+import ast
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS = Path("scripts")
+DATA_MODEL = Path("docs") / "data-model"
+TEMPLATE = Path("VSME-Digital-Template-1.1.0.xlsx")
+STAMPS_PATH = ROOT / DATA_MODEL / ".build-stamps.json"
+
+
+class Stage(NamedTuple):
+    name: str
+    command: List[str]
+    inputs: List[Path]
+    output: Path
+
+
+COMPLETE_STRUCTURE = DATA_MODEL / "vsme-complete-structure.json"
+ENUMERATIONS = DATA_MODEL / "vsme-enumerations.json"
+BASIC_MAPPING = DATA_MODEL / "vsme-basic-modules-mapping.json"
+COMPREHENSIVE_MAPPING = DATA_MODEL / "vsme-comprehensive-modules-mapping.json"
+DATA_MODEL_SPEC = DATA_MODEL / "vsme-data-model-spec.json"
+REBUILT_SPEC = Path("build") / "vsme-data-model-spec.rebuilt.json"
+XBRL_CONCEPTS = DATA_MODEL / "vsme-xbrl-concepts.json"
+ZOD_SCHEMAS = Path("frontend") / "src" / "schemas" / "vsme-zod-schemas.ts"
+TEMPLATE_LABELS = Path("frontend") / "src" / "locales" / "template"
+NORMALIZED_TEMPLATE = Path("build") / "VSME-Digital-Template-1.1.0.normalized.xlsx"
+SLIM_TEMPLATE = Path("build") / "VSME-Digital-Template-1.1.0.slim.xlsx"
+BASIC_TEMPLATE = Path("build") / "partial" / "VSME-Digital-Template-1.1.0.basic.xlsx"
+
+# Paths are relative to the repository root. A stage depends on another stage
+# when one of its inputs is that stage's output. Only the entry script of a
+# stage is listed; the modules it imports are added by `stage_inputs`.
+STAGES: List[Stage] = [
+    Stage(
+        name="complete-structure",
+        command=[sys.executable, str(SCRIPTS / "extract_complete_vsme_structure.py"),
+                 "--template", str(TEMPLATE), "--output", str(COMPLETE_STRUCTURE)],
+        inputs=[TEMPLATE, SCRIPTS / "extract_complete_vsme_structure.py"],
+        output=COMPLETE_STRUCTURE,
+    ),
+    Stage(
+        name="enumerations",
+        command=[sys.executable, str(SCRIPTS / "enumerations.py"),
+                 "--template", str(TEMPLATE), "--output", str(ENUMERATIONS)],
+        inputs=[TEMPLATE, SCRIPTS / "enumerations.py"],
+        output=ENUMERATIONS,
+    ),
+    Stage(
+        # One shard per language plus index.json; the whole directory is the
+        # output, so an edited or missing shard makes the stage stale
+        name="template-labels",
+        command=[sys.executable, str(SCRIPTS / "translations.py"),
+                 "--template", str(TEMPLATE), "--output-dir", str(TEMPLATE_LABELS)],
+        inputs=[TEMPLATE, SCRIPTS / "translations.py"],
+        output=TEMPLATE_LABELS,
+    ),
+    Stage(
+        # Not committed (build/ is ignored); report_service --template uses it
+        name="normalized-template",
+        command=[sys.executable, str(SCRIPTS / "normalize_template.py"),
+                 "--template", str(TEMPLATE), "--output", str(NORMALIZED_TEMPLATE)],
+        inputs=[TEMPLATE, SCRIPTS / "normalize_template.py"],
+        output=NORMALIZED_TEMPLATE,
+    ),
+    Stage(
+        name="slim-template",
+        command=[sys.executable, str(SCRIPTS / "slim_template.py"),
+                 "--template", str(NORMALIZED_TEMPLATE), "--output", str(SLIM_TEMPLATE),
+                 "--spec", str(DATA_MODEL_SPEC)],
+        inputs=[NORMALIZED_TEMPLATE, DATA_MODEL_SPEC, SCRIPTS / "slim_template.py"],
+        output=SLIM_TEMPLATE,
+    ),
+    Stage(
+        name="basic-template",
+        command=[sys.executable, str(SCRIPTS / "partial_export.py"), "--template-only", "--modules", "basic",
+                 "--template", str(NORMALIZED_TEMPLATE), "--source", str(TEMPLATE),
+                 "--spec", str(DATA_MODEL_SPEC), "--directory", str(BASIC_TEMPLATE.parent)],
+        inputs=[NORMALIZED_TEMPLATE, TEMPLATE, DATA_MODEL_SPEC, SCRIPTS / "partial_export.py"],
+        output=BASIC_TEMPLATE,
+    ),
+    Stage(
+        name="basic-mapping",
+        command=[sys.executable, str(SCRIPTS / "map_basic_modules.py"),
+                 "--template", str(TEMPLATE), "--output", str(BASIC_MAPPING),
+                 "--enumerations", str(ENUMERATIONS)],
+        inputs=[TEMPLATE, SCRIPTS / "map_basic_modules.py", ENUMERATIONS],
+        output=BASIC_MAPPING,
+    ),
+    Stage(
+        name="comprehensive-mapping",
+        command=[sys.executable, str(SCRIPTS / "map_comprehensive_modules.py"),
+                 "--output", str(COMPREHENSIVE_MAPPING)],
+        inputs=[SCRIPTS / "map_comprehensive_modules.py"],
+        output=COMPREHENSIVE_MAPPING,
+    ),
+    Stage(
+        # The committed spec is curated and read by every stage below; the
+        # auto-extracted variant with a datapoint per Named Range is only a
+        # build artifact to review against it (build/ is ignored)
+        name="rebuilt-spec",
+        command=[sys.executable, str(SCRIPTS / "rebuild_vsme_data_model.py"),
+                 "--template", str(TEMPLATE), "--spec", str(DATA_MODEL_SPEC), "--output", str(REBUILT_SPEC)],
+        inputs=[TEMPLATE, DATA_MODEL_SPEC, SCRIPTS / "rebuild_vsme_data_model.py"],
+        output=REBUILT_SPEC,
+    ),
+    Stage(
+        name="xbrl-concepts",
+        command=[sys.executable, str(SCRIPTS / "xbrl_concepts.py"), "--template", str(TEMPLATE),
+                 "--spec", str(DATA_MODEL_SPEC), "--output", str(XBRL_CONCEPTS)],
+        inputs=[TEMPLATE, DATA_MODEL_SPEC, SCRIPTS / "xbrl_concepts.py"],
+        output=XBRL_CONCEPTS,
+    ),
+    Stage(
+        name="zod-schemas",
+        command=["npx", "--yes", "tsx", str(SCRIPTS / "generate-zod-schemas.ts")],
+        inputs=[SCRIPTS / "generate-zod-schemas.ts", BASIC_MAPPING,
+                COMPREHENSIVE_MAPPING, COMPLETE_STRUCTURE, DATA_MODEL_SPEC],
+        output=ZOD_SCHEMAS,
+    ),
+]
+
+
+def file_hash(path: Path) -> Optional[str]:
+    """SHA-256 of a file relative to the repository root, None if it is missing.
+    A directory hashes the names and contents of all files below it."""
+    full = ROOT / path
+    if not full.exists():
+        return None
+    files = sorted(p for p in full.rglob("*") if p.is_file()) if full.is_dir() else [full]
+    digest = hashlib.sha256()
+    for file in files:
+        if full.is_dir():
+            digest.update(str(file.relative_to(full)).encode("utf-8") + b"\0")
+        with file.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_stamps() -> Dict[str, Dict]:
+    if not STAMPS_PATH.exists():
+        return {}
+    return json.loads(STAMPS_PATH.read_text())
+
+
+def save_stamps(stamps: Dict[str, Dict]) -> None:
+    STAMPS_PATH.write_text(json.dumps(stamps, indent=2, sort_keys=True) + "\n")
+
+
+def dependencies(stages: List[Stage]) -> Dict[str, List[str]]:
+    """Map each stage to the stages producing its inputs."""
+    producers = {stage.output: stage.name for stage in stages}
+    return {
+        stage.name: [producers[path] for path in stage.inputs if path in producers]
+        for stage in stages
+    }
+
+
+def topological_order(stages: List[Stage]) -> List[Stage]:
+    deps = dependencies(stages)
+    by_name = {stage.name: stage for stage in stages}
+    ordered: List[Stage] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str) -> None:
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise SystemExit(f"Dependency cycle at stage '{name}'")
+        state[name] = "visiting"
+        for dep in deps[name]:
+            visit(dep)
+        state[name] = "done"
+        ordered.append(by_name[name])
+
+    for stage in stages:
+        visit(stage.name)
+    return ordered
+
+
+@lru_cache(maxsize=None)
+def local_imports(script: Path) -> FrozenSet[Path]:
+    """Modules of scripts/ imported by ``script``, at any depth (including
+    imports inside try/except and functions)."""
+    seen = set()
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        full = ROOT / path
+        if not full.exists():
+            continue
+        tree = ast.parse(full.read_text(encoding="utf-8"), filename=str(path))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = SCRIPTS / (name.split(".")[0] + ".py")
+                if module != script and module not in seen and (ROOT / module).exists():
+                    seen.add(module)
+                    pending.append(module)
+    return frozenset(seen)
+
+
+def stage_inputs(stage: Stage) -> List[Path]:
+    """Declared inputs plus the local modules their scripts import."""
+    inputs = list(stage.inputs)
+    for path in stage.inputs:
+        if path.suffix == ".py" and path.parent == SCRIPTS:
+            inputs.extend(sorted(local_imports(path) - set(inputs)))
+    return inputs
+
+
+def input_hashes(stage: Stage) -> Dict[str, Optional[str]]:
+    return {str(path): file_hash(path) for path in stage_inputs(stage)}
+
+
+def stale_reason(stage: Stage, stamps: Dict[str, Dict]) -> Optional[str]:
+    """Why a stage must rerun, or None when its stamp is still valid."""
+    stamp = stamps.get(stage.name)
+    if stamp is None:
+        return "never built"
+    output_hash = file_hash(stage.output)
+    if output_hash is None:
+        return f"{stage.output} missing"
+    if output_hash != stamp.get("output"):
+        return f"{stage.output} changed since last build"
+    recorded = stamp.get("inputs", {})
+    for path, digest in input_hashes(stage).items():
+        if digest is None:
+            return f"input {path} missing"
+        if recorded.get(path) != digest:
+            return f"input {path} changed"
+    return None
+
+
+def run_stage(stage: Stage) -> Tuple[int, str, float]:
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(stage.command, cwd=ROOT, capture_output=True, text=True)
+    except FileNotFoundError as e:
+        return 127, str(e), time.perf_counter() - started
+    return result.returncode, result.stdout + result.stderr, time.perf_counter() - started
+
+
+def build(force: bool = False, jobs: int = 4, dry_run: bool = False) -> int:
+    stages = topological_order(STAGES)
+    deps = dependencies(stages)
+    stamps = load_stamps()
+
+    pending = {stage.name: stage for stage in stages}
+    rebuilt: set = set()
+    failed: set = set()
+    running: Dict[Future, Stage] = {}
+
+    def ready(stage: Stage) -> bool:
+        return all(dep not in pending and dep not in {s.name for s in running.values()}
+                   for dep in deps[stage.name])
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            for stage in [s for s in pending.values() if ready(s)]:
+                del pending[stage.name]
+                if any(dep in failed for dep in deps[stage.name]):
+                    failed.add(stage.name)
+                    print(f"  skip   {stage.name} (dependency failed)")
+                    continue
+                upstream = [dep for dep in deps[stage.name] if dep in rebuilt]
+                reason = "forced" if force else stale_reason(stage, stamps)
+                if reason is None and dry_run and upstream:
+                    reason = "upstream would change"
+                if reason is None:
+                    print(f"  fresh  {stage.name}")
+                    continue
+                if dry_run:
+                    # Assume the stage changes its output so dependents show up too
+                    rebuilt.add(stage.name)
+                    print(f"  would  {stage.name} ({reason})")
+                    continue
+                print(f"  run    {stage.name} ({reason}{', after ' + ', '.join(upstream) if upstream else ''})")
+                running[pool.submit(run_stage, stage)] = stage
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                code, output, elapsed = future.result()
+                if code != 0:
+                    failed.add(stage.name)
+                    print(f"  FAILED {stage.name} (exit {code}, {elapsed:.1f}s)")
+                    print("\n".join("         " + line for line in output.strip().splitlines()[-20:]))
+                    continue
+                previous_output = stamps.get(stage.name, {}).get("output")
+                stamps[stage.name] = {
+                    "inputs": input_hashes(stage),
+                    "output": file_hash(stage.output),
+                }
+                save_stamps(stamps)
+                if stamps[stage.name]["output"] != previous_output:
+                    rebuilt.add(stage.name)
+                print(f"  done   {stage.name} ({elapsed:.1f}s)")
+
+    if failed:
+        print(f"\n✗ {len(failed)} stage(s) failed: {', '.join(sorted(failed))}")
+        return 1
+    if dry_run:
+        print(f"\n{len(rebuilt)} stage(s) would run")
+        return 0
+    print("\n✓ Data model artifacts are up to date")
+    return 0
+
+
+def status() -> int:
+    stamps = load_stamps()
+    deps = dependencies(STAGES)
+    for stage in topological_order(STAGES):
+        reason = stale_reason(stage, stamps)
+        after = f"  <- {', '.join(deps[stage.name])}" if deps[stage.name] else ""
+        print(f"  {'stale' if reason else 'fresh':5}  {stage.name:22} {stage.output}{after}")
+        if reason:
+            print(f"         {reason}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild generated data-model artifacts incrementally")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="Rerun stale stages")
+    build_parser.add_argument("--force", action="store_true", help="Rerun every stage")
+    build_parser.add_argument("--jobs", type=int, default=4, help="Stages to run concurrently")
+    build_parser.add_argument("--dry-run", action="store_true", help="Only report what would run")
+    sub.add_parser("status", help="Show which stages are stale")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        return build(force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    return status()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
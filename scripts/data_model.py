@@ -0,0 +1,146 @@
+"""
+In-memory query API over vsme-data-model-spec.json.
+
+The spec is walked once (``coreReport`` -> modules -> disclosures ->
+datapoints) into hash indexes by module code, disclosure id, datapoint id,
+Named Range and sheet, so questions like "which datapoint owns this Named
+Range" or "what lives on Social Disclosures" are dictionary lookups instead of
+nested loops. Aggregate counts are computed on first use and cached until the
+model is changed through `add_module` / `add_datapoint`.
+
+The indexes hold the spec's own dictionaries: edits to a datapoint are visible
+in the spec, and the spec can be written back as is.
+
+    model = DataModel.load()
+    entry = model.owner_of_named_range('EntityName')
+    entry.module['moduleCode'], entry.datapoint['datapointId']
+"""
+import json
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from import_filled_report import SPEC_PATH, datapoint_reference
+from xlsx_parts import split_reference
+
+MODULE_GROUPS = ('basicModules', 'comprehensiveModules')
+
+
+class DatapointEntry(NamedTuple):
+    module: Dict
+    disclosure: Dict
+    datapoint: Dict
+
+
+class DisclosureEntry(NamedTuple):
+    module: Dict
+    disclosure: Dict
+
+
+class DataModel:
+    """Spec indexed by module, disclosure, datapoint, Named Range and sheet"""
+
+    def __init__(self, spec: Dict) -> None:
+        self.spec = spec
+        self.named_ranges: Dict[str, Dict] = spec.get('namedRanges', {})
+        self.modules: Dict[str, Dict] = {}
+        self.disclosures: Dict[str, DisclosureEntry] = {}
+        self.datapoints: Dict[str, DatapointEntry] = {}
+        self._by_named_range: Dict[str, DatapointEntry] = {}
+        self._by_sheet: Dict[str, List[DatapointEntry]] = {}
+        self._counts: Optional[Dict] = None
+        core = spec.get('coreReport', {})
+        for group in MODULE_GROUPS:
+            for module in core.get(group, []):
+                self._index_module(module)
+
+    @classmethod
+    def load(cls, spec_path: str = SPEC_PATH) -> 'DataModel':
+        with open(spec_path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_modules(cls, basic_modules: Iterable[Dict] = (), comprehensive_modules: Iterable[Dict] = ()) -> 'DataModel':
+        """Model over bare module lists, e.g. the output of the map_* scripts"""
+        return cls({'coreReport': {
+            'basicModules': list(basic_modules),
+            'comprehensiveModules': list(comprehensive_modules),
+        }})
+
+    def module(self, module_code: str) -> Optional[Dict]:
+        return self.modules.get(module_code)
+
+    def disclosure(self, disclosure_id: str) -> Optional[DisclosureEntry]:
+        return self.disclosures.get(disclosure_id)
+
+    def datapoint(self, datapoint_id: str) -> Optional[DatapointEntry]:
+        return self.datapoints.get(datapoint_id)
+
+    def owner_of_named_range(self, name: str) -> Optional[DatapointEntry]:
+        """Datapoint whose excelNamedRange is ``name``"""
+        return self._by_named_range.get(name)
+
+    def on_sheet(self, sheet: str) -> List[DatapointEntry]:
+        """Datapoints whose cell is on ``sheet``, in spec order"""
+        return self._by_sheet.get(sheet, [])
+
+    def reference(self, datapoint_id: str) -> Optional[str]:
+        entry = self.datapoints.get(datapoint_id)
+        return datapoint_reference(entry.datapoint, self.named_ranges) if entry else None
+
+    def iter_datapoints(self, module_code: Optional[str] = None) -> Iterator[DatapointEntry]:
+        """Datapoints in spec order, optionally of a single module"""
+        for entry in self.datapoints.values():
+            if module_code is None or entry.module.get('moduleCode') == module_code:
+                yield entry
+
+    @property
+    def counts(self) -> Dict:
+        if self._counts is None:
+            types = Counter(entry.datapoint.get('dataType') for entry in self.datapoints.values())
+            self._counts = {
+                'modules': len(self.modules),
+                'disclosures': sum(len(m.get('disclosures', [])) for m in self.modules.values()),
+                'datapoints': len(self.datapoints),
+                'required': sum(1 for entry in self.datapoints.values() if entry.datapoint.get('required')),
+                'namedRanges': len(self._by_named_range),
+                'sheets': len(self._by_sheet),
+                'byDataType': dict(types.most_common()),
+                'byModule': dict(Counter(entry.module.get('moduleCode') for entry in self.datapoints.values())),
+            }
+        return self._counts
+
+    def add_module(self, module: Dict, group: str = 'basicModules') -> Dict:
+        """Append a module to the spec and index it"""
+        module.setdefault('disclosures', [])
+        self.spec.setdefault('coreReport', {}).setdefault(group, []).append(module)
+        self._index_module(module)
+        self._counts = None
+        return module
+
+    def add_datapoint(self, module: Dict, disclosure: Dict, datapoint: Dict) -> DatapointEntry:
+        """Append a datapoint to a disclosure of ``module`` and index it"""
+        disclosure.setdefault('datapoints', []).append(datapoint)
+        if disclosure.get('disclosureId') not in self.disclosures:
+            self.disclosures[disclosure.get('disclosureId')] = DisclosureEntry(module, disclosure)
+        self._counts = None
+        return self._index_datapoint(DatapointEntry(module, disclosure, datapoint))
+
+    def _index_module(self, module: Dict) -> None:
+        self.modules[module['moduleCode']] = module
+        for disclosure in module.get('disclosures', []):
+            # Auto-generated containers share an id across modules; the first
+            # one wins, as for datapoints
+            self.disclosures.setdefault(disclosure.get('disclosureId'), DisclosureEntry(module, disclosure))
+            for datapoint in disclosure.get('datapoints', []):
+                self._index_datapoint(DatapointEntry(module, disclosure, datapoint))
+
+    def _index_datapoint(self, entry: DatapointEntry) -> DatapointEntry:
+        datapoint = entry.datapoint
+        self.datapoints.setdefault(datapoint['datapointId'], entry)
+        if datapoint.get('excelNamedRange'):
+            self._by_named_range.setdefault(datapoint['excelNamedRange'], entry)
+        reference = datapoint_reference(datapoint, self.named_ranges)
+        sheet = split_reference(reference)[0] if reference else entry.module.get('sheet')
+        if sheet:
+            self._by_sheet.setdefault(sheet, []).append(entry)
+        return entry
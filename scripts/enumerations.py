@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Frozen index of the dropdown value lists on the 'Enumeration Lists' sheet.
+
+The sheet is the largest worksheet part of the template, but all that
+validators and fillers need from it are the enum_* Named Ranges (currencies,
+countries, NACE codes, waste types, ...). `extract_enumerations` reads them
+once into docs/data-model/vsme-enumerations.json, a compact file holding each
+list in sheet order; `EnumerationIndex.load` turns it into read-only hash maps
+(list name -> code -> ordinal) so membership checks are O(1) and the workbook
+is never opened at runtime.
+
+    python scripts/enumerations.py [--template ...] [--output ...]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from xlsx_parts import split_reference
+
+ENUMERATION_SHEET = 'Enumeration Lists'
+ENUM_PREFIX = 'enum_'
+INDEX_PATH = 'docs/data-model/vsme-enumerations.json'
+
+
+def enum_code(value) -> Optional[str]:
+    """Cell value as the string a payload would carry (2025, not 2025.0)"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def extract_enumerations(excel_file: str) -> Dict[str, List[str]]:
+    """enum_* Named Range -> its values in sheet order (trailing blanks dropped).
+    Formula columns (NACE technical names, country codes) use cached values."""
+    # Imported here so loading the saved index never pays for openpyxl
+    try:
+        import openpyxl
+    except ImportError:
+        import subprocess
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
+        import openpyxl
+
+    wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    ws = wb[ENUMERATION_SHEET]
+    lists: Dict[str, List[str]] = {}
+    for name, definition in sorted(wb.defined_names.items()):
+        if not name.startswith(ENUM_PREFIX):
+            continue
+        sheet, cell_ref = split_reference(definition.attr_text)
+        if sheet != ENUMERATION_SHEET:
+            continue
+        values = [enum_code(row[0].value) for row in ws[cell_ref.replace('$', '')]]
+        while values and values[-1] is None:
+            values.pop()
+        lists[name] = [value for value in values if value is not None]
+    wb.close()
+    return lists
+
+
+def lists_hash(lists: Mapping[str, Iterable[str]]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(lists):
+        digest.update(name.encode('utf-8') + b'\0')
+        for value in lists[name]:
+            digest.update(value.encode('utf-8') + b'\x1f')
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+class EnumerationIndex:
+    """Immutable list name -> code -> ordinal maps"""
+
+    __slots__ = ('_lists', '_ordinals', 'sha256')
+
+    def __init__(self, lists: Mapping[str, Iterable[str]]) -> None:
+        self._lists = MappingProxyType({name: tuple(values) for name, values in lists.items()})
+        ordinals = {}
+        for name, values in self._lists.items():
+            table: Dict[str, int] = {}
+            for ordinal, value in enumerate(values):
+                # Duplicates keep their first position, like MATCH(..., 0)
+                table.setdefault(value, ordinal)
+            ordinals[name] = MappingProxyType(table)
+        self._ordinals = MappingProxyType(ordinals)
+        self.sha256 = lists_hash(self._lists)
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH) -> 'EnumerationIndex':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls(data['lists'])
+        if data.get('sha256') and data['sha256'] != index.sha256:
+            raise ValueError(f"{path}: content does not match its sha256, regenerate it")
+        return index
+
+    def save(self, path: str = INDEX_PATH, source: str = '') -> None:
+        data = {'source': source, 'sha256': self.sha256, 'lists': {n: list(v) for n, v in self._lists.items()}}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            f.write('\n')
+
+    def names(self) -> List[str]:
+        return list(self._lists)
+
+    def values(self, name: str) -> tuple:
+        """Values of a list in dropdown order"""
+        return self._lists[name]
+
+    def validation_values(self, formula: str, named_ranges: Optional[Mapping[str, Mapping]] = None) -> Optional[tuple]:
+        """Values a list data validation offers, from its ``formula1``: an
+        inline ``"A, B"`` list, an enum_* list, or the 'Enumeration Lists'
+        range of one (resolved through the spec's ``named_ranges``). None for
+        other sources, such as ranges on the report sheets."""
+        formula = formula.strip()
+        if formula.startswith('"') and formula.endswith('"'):
+            return tuple(value.strip() for value in formula[1:-1].split(',') if value.strip())
+        if formula in self._lists:
+            return self._lists[formula]
+        reference = formula.replace('$', '')
+        for name, named_range in (named_ranges or {}).items():
+            if name in self._lists and (named_range.get('reference') or '').replace('$', '') == reference:
+                return self._lists[name]
+        return None
+
+    def ordinals(self, name: str) -> Mapping[str, int]:
+        return self._ordinals[name]
+
+    def contains(self, name: str, code) -> bool:
+        return enum_code(code) in self._ordinals[name]
+
+    def ordinal(self, name: str, code) -> Optional[int]:
+        return self._ordinals[name].get(enum_code(code))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._lists
+
+    def __len__(self) -> int:
+        return len(self._lists)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract the enumeration index from the template")
+    parser.add_argument('--template', default="VSME-Digital-Template-1.1.0.xlsx", help="Excel template to read")
+    parser.add_argument('--output', default=INDEX_PATH, help="Index file to write")
+    args = parser.parse_args(argv)
+
+    index = EnumerationIndex(extract_enumerations(args.template))
+    index.save(args.output, source=os.path.basename(args.template))
+    print(f"✓ {len(index)} enumeration lists "
+          f"({sum(len(index.values(n)) for n in index.names())} values) saved to {args.output}")
+    for name in index.names():
+        print(f"  {name:40} {len(index.values(name)):5d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,9 @@ Comprehensive extraction of VSME Excel Template structure
 Extracts all modules, disclosures, datapoints, and Named Ranges
 """
 import sys
-import json
+import os
 import re
+import argparse
 from collections import defaultdict
 
 try:
@@ -15,18 +16,36 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
     import openpyxl
 
+from field_records import FieldRecord
+from json_stream import StreamArray, StreamObject, write_json
+from label_matcher import LabelMatcher, document_frequencies
+from module_index import ModuleSpanIndex
 
-def extract_all_named_ranges(wb):
-    """Extract all Named Ranges with their definitions"""
-    named_ranges = {}
-    
+
+class DetailedField(FieldRecord):
+    """One labelled row of a disclosure sheet"""
+    __slots__ = (
+        'sheet', 'row', 'module', 'label', 'paragraph_reference',
+        'guidance_reference', 'field_type', 'required', 'optional',
+        'potential_named_ranges'
+    )
+    _keys = (
+        'sheet', 'row', 'module', 'label', 'paragraphReference',
+        'guidanceReference', 'fieldType', 'required', 'optional',
+        'potentialNamedRanges'
+    )
+    _interned = frozenset({'sheet', 'module'})
+
+
+def iter_named_ranges(wb):
+    """Yield (name, definition) for every Named Range that has a destination"""
     for name_str, definition in wb.defined_names.items():
         try:
             # Get the cell reference
             destinations = list(definition.destinations)
             if destinations:
                 sheet_name, cell_ref = destinations[0]
-                named_ranges[name_str] = {
+                yield name_str, {
                     'name': name_str,
                     'reference': f"'{sheet_name}'!{cell_ref}",
                     'sheet': sheet_name,
@@ -34,8 +53,24 @@ def extract_all_named_ranges(wb):
                 }
         except Exception as e:
             print(f"Warning: Could not parse named range {name_str}: {e}")
-    
-    return named_ranges
+
+
+# Labels scored against the Named Ranges per batch, so a sheet's rows are
+# never all held at once
+LABEL_BATCH = 64
+
+
+def extract_all_named_ranges(wb):
+    """Extract all Named Ranges with their definitions"""
+    return dict(iter_named_ranges(wb))
+
+
+def range_names_by_sheet(wb):
+    """Group Named Range names by the sheet of their first destination"""
+    by_sheet = defaultdict(list)
+    for name_str, info in iter_named_ranges(wb):
+        by_sheet[info['sheet']].append(name_str)
+    return by_sheet
 
 
 def extract_table_of_contents(wb):
@@ -52,10 +87,7 @@ def extract_table_of_contents(wb):
     current_module = None
     current_disclosure = None
     
-    for row_idx in range(1, ws.max_row + 1):
-        col_a = ws.cell(row=row_idx, column=1).value
-        col_b = ws.cell(row=row_idx, column=2).value
-        
+    for col_a, col_b in ws.iter_rows(min_row=1, max_row=ws.max_row, max_col=2, values_only=True):
         if not col_a and not col_b:
             continue
         
@@ -110,53 +142,54 @@ def extract_table_of_contents(wb):
     return structure
 
 
-def extract_detailed_sheet_structure(ws, sheet_name, named_ranges):
-    """Extract detailed field structure from a specific sheet"""
-    fields = []
-    
-    # Track the current module/disclosure context
-    current_module = None
-    current_disclosure = None
-    
-    for row_idx in range(1, min(ws.max_row + 1, 300)):
-        # Column A: Paragraph Reference
-        # Column B: Guidance Reference
-        # Column C: Field Label/Description
-        # Column D+: Data fields
-        
-        para_ref = ws.cell(row=row_idx, column=1).value
-        guidance_ref = ws.cell(row=row_idx, column=2).value
-        label_cell = ws.cell(row=row_idx, column=3)
-        
-        if not label_cell.value:
+def iter_detailed_sheet_structure(ws, sheet_name, matcher, module_index):
+    """Yield the detailed field structure of a specific sheet row by row
+
+    ``matcher`` is a LabelMatcher over the sheet's Named Ranges; the candidate
+    ranges of the labels are scored LABEL_BATCH rows at a time. The module of
+    each row comes from ``module_index`` (a ModuleSpanIndex).
+    """
+    rows = []
+    # Column A: Paragraph Reference
+    # Column B: Guidance Reference
+    # Column C: Field Label/Description
+    # Column D+: Data fields
+    cells = ws.iter_rows(min_row=1, max_row=min(ws.max_row, 299), max_col=3, values_only=True)
+    for row_idx, (para_ref, guidance_ref, label_value) in enumerate(cells, 1):
+        if not label_value:
             continue
         
-        label = str(label_cell.value).strip()
+        label = str(label_value).strip()
         
         # Skip very short labels
         if len(label) < 10:
             continue
-        
-        # Extract module code from label
-        module_match = re.search(r'\b([BC]\d+)\b', label)
-        if module_match:
-            current_module = module_match.group(1)
+        rows.append((row_idx, para_ref, guidance_ref, label))
+        if len(rows) == LABEL_BATCH:
+            yield from _detailed_fields(rows, sheet_name, matcher, module_index)
+            rows = []
+    yield from _detailed_fields(rows, sheet_name, matcher, module_index)
+
+
+def _detailed_fields(rows, sheet_name, matcher, module_index):
+    """DetailedFields of a batch of (row, paragraph, guidance, label) rows"""
+    if not rows:
+        return
+    # Best Named Ranges on this sheet for every label, preferring ranges on
+    # the label's own row
+    candidates = matcher.top_candidates(
+        [label for _, _, _, label in rows], [sheet_name] * len(rows), k=5,
+        label_rows=[row_idx for row_idx, _, _, _ in rows]
+    )
+
+    for (row_idx, para_ref, guidance_ref, label), matching_ranges in zip(rows, candidates):
+        # Module of the section header span containing this row
+        current_module = module_index.module_for(sheet_name, row_idx)
         
         # Determine if required or optional
         is_required = '[Always to be reported]' in label or '[Alw' in label
         is_optional = '[If applicable]' in label
         
-        # Try to find matching named range for this field
-        matching_ranges = []
-        label_keywords = re.findall(r'\b\w{4,}\b', label.lower())
-        
-        for range_name, range_info in named_ranges.items():
-            if range_info['sheet'] == sheet_name:
-                # Check if this named range might correspond to this field
-                range_name_lower = range_name.lower()
-                if any(keyword in range_name_lower for keyword in label_keywords[:5]):
-                    matching_ranges.append(range_name)
-        
         # Determine field type
         field_type = 'text'
         if 'date' in label.lower() or 'year' in label.lower() or 'month' in label.lower() or 'day' in label.lower():
@@ -170,47 +203,73 @@ def extract_detailed_sheet_structure(ws, sheet_name, named_ranges):
         elif 'table' in label.lower() or 'list' in label.lower():
             field_type = 'table'
         
-        field = {
-            'sheet': sheet_name,
-            'row': row_idx,
-            'module': current_module,
-            'label': label,
-            'paragraphReference': str(para_ref).strip() if para_ref else None,
-            'guidanceReference': str(guidance_ref).strip() if guidance_ref else None,
-            'fieldType': field_type,
-            'required': is_required,
-            'optional': is_optional,
-            'potentialNamedRanges': matching_ranges[:5] if matching_ranges else []
-        }
+        field = DetailedField(
+            sheet=sheet_name,
+            row=row_idx,
+            module=current_module,
+            label=label,
+            paragraph_reference=str(para_ref).strip() if para_ref else None,
+            guidance_reference=str(guidance_ref).strip() if guidance_ref else None,
+            field_type=field_type,
+            required=is_required,
+            optional=is_optional,
+            potential_named_ranges=tuple(matching_ranges[:5])
+        )
         
-        fields.append(field)
-    
-    return fields
+        yield field
+
+
+def extract_detailed_sheet_structure(ws, sheet_name, named_ranges, module_index):
+    """Extract detailed field structure from a specific sheet"""
+    matcher = LabelMatcher(named_ranges)
+    return list(iter_detailed_sheet_structure(ws, sheet_name, matcher, module_index))
 
 
-def main():
-    excel_file = "VSME-Digital-Template-1.1.0.xlsx"
+class SheetTally:
+    """Field counts of one sheet, collected while its fields are streamed"""
+
+    def __init__(self):
+        self.fields = 0
+        self.required = 0
+        self.optional = 0
+
+    def count(self, fields):
+        for field in fields:
+            self.fields += 1
+            self.required += field.required
+            self.optional += field.optional
+            yield field.to_dict()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract the complete VSME template structure")
+    parser.add_argument('--template', default="VSME-Digital-Template-1.1.0.xlsx", help="Excel template to read")
+    parser.add_argument('--output', default='vsme-complete-structure.json', help="JSON file to write")
+    args = parser.parse_args(argv)
+    excel_file = args.template
     
     print("=" * 80)
     print("VSME Complete Structure Extraction")
     print("=" * 80)
     
     try:
-        wb = openpyxl.load_workbook(excel_file, data_only=True)
+        # Rows are streamed from the sheet parts instead of building every cell
+        wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
         
-        # Step 1: Extract all Named Ranges
-        print("\n1. Extracting Named Ranges...")
-        named_ranges = extract_all_named_ranges(wb)
-        print(f"   Found {len(named_ranges)} named ranges")
+        # Step 1: Feature weights over all Named Ranges; the ranges
+        # themselves are matched against labels one sheet at a time
+        print("\n1. Indexing Named Ranges...")
+        frequencies = document_frequencies(name for name, _ in iter_named_ranges(wb))
+        total_named_ranges = frequencies[1]
+        print(f"   Found {total_named_ranges} named ranges")
         
         # Step 2: Extract Table of Contents structure
         print("\n2. Extracting Table of Contents structure...")
         toc_structure = extract_table_of_contents(wb)
         print(f"   Found {len(toc_structure['basicModules'])} Basic Modules")
         print(f"   Found {len(toc_structure['comprehensiveModules'])} Comprehensive Modules")
-        
-        # Step 3: Extract detailed structure from each sheet
-        print("\n3. Extracting detailed field structure from sheets...")
+        module_index = ModuleSpanIndex.from_workbook(wb, toc_structure)
+        print(f"   Indexed {len(module_index.spans())} module/disclosure spans")
         
         sheets_to_analyze = [
             'General Information',
@@ -218,33 +277,35 @@ def main():
             'Social Disclosures',
             'Governance Disclosures'
         ]
+        sheets = [name for name in sheets_to_analyze if name in wb.sheetnames]
+        tallies = {sheet_name: SheetTally() for sheet_name in sheets}
         
-        detailed_structure = {}
-        for sheet_name in sheets_to_analyze:
-            if sheet_name in wb.sheetnames:
+        def detailed_fields():
+            for sheet_name in sheets:
                 print(f"   Analyzing {sheet_name}...")
-                ws = wb[sheet_name]
-                fields = extract_detailed_sheet_structure(ws, sheet_name, named_ranges)
-                detailed_structure[sheet_name] = fields
-                print(f"     Found {len(fields)} fields")
+                # Only this sheet's ranges can be candidates for its labels
+                matcher = LabelMatcher({name: info for name, info in iter_named_ranges(wb)
+                                        if info['sheet'] == sheet_name}, frequencies=frequencies)
+                fields = iter_detailed_sheet_structure(wb[sheet_name], sheet_name, matcher, module_index)
+                yield sheet_name, StreamArray(tallies[sheet_name].count(fields))
         
-        # Step 4: Compile complete structure
-        print("\n4. Compiling complete structure...")
+        # Step 3: Stream the complete structure to JSON; named ranges and
+        # detailed fields are written as they are produced
+        print("\n3. Streaming complete structure (detailed fields per sheet)...")
         complete_structure = {
             'metadata': {
-                'sourceFile': excel_file,
-                'totalNamedRanges': len(named_ranges),
-                'sheets': list(detailed_structure.keys())
+                'sourceFile': os.path.basename(excel_file),
+                'totalNamedRanges': total_named_ranges,
+                'sheets': sheets
             },
-            'namedRanges': named_ranges,
+            'namedRanges': StreamObject(iter_named_ranges(wb)),
             'tableOfContents': toc_structure,
-            'detailedFields': detailed_structure
+            'detailedFields': StreamObject(detailed_fields())
         }
         
-        # Step 5: Save to JSON
-        output_file = 'vsme-complete-structure.json'
+        output_file = args.output
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(complete_structure, f, indent=2, ensure_ascii=False)
+            write_json(complete_structure, f)
         
         print(f"\n✓ Complete structure saved to {output_file}")
         
@@ -252,7 +313,7 @@ def main():
         print("\n" + "=" * 80)
         print("SUMMARY")
         print("=" * 80)
-        print(f"Total Named Ranges: {len(named_ranges)}")
+        print(f"Total Named Ranges: {total_named_ranges}")
         print(f"\nBasic Modules ({len(toc_structure['basicModules'])}):")
         for module in toc_structure['basicModules']:
             print(f"  {module['moduleCode']}: {module['moduleName']}")
@@ -265,11 +326,9 @@ def main():
         
         print(f"\nDetailed Fields by Sheet:")
         total_fields = 0
-        for sheet_name, fields in detailed_structure.items():
-            total_fields += len(fields)
-            required = sum(1 for f in fields if f['required'])
-            optional = sum(1 for f in fields if f['optional'])
-            print(f"  {sheet_name}: {len(fields)} fields ({required} required, {optional} optional)")
+        for sheet_name, tally in tallies.items():
+            total_fields += tally.fields
+            print(f"  {sheet_name}: {tally.fields} fields ({tally.required} required, {tally.optional} optional)")
         
         print(f"\nTotal fields extracted: {total_fields}")
         
@@ -0,0 +1,53 @@
+"""
+Compact field records shared by the sheet extractors.
+
+The extractors emit one record per labelled row. Records use ``__slots__``
+instead of a dict per field, intern the sheet/module strings that repeat on
+every row and keep per-field lists as tuples, so a field table stays small
+when extraction runs over many filled reports or larger templates.
+``to_dict`` restores the original JSON shape, key order included.
+"""
+import sys
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, FieldRecord):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_to_json(item) for item in value]
+    return value
+
+
+class FieldRecord:
+    """Base class for slotted field records.
+
+    Subclasses declare ``__slots__`` plus ``_keys`` (the JSON key of each slot,
+    in output order) and ``_interned`` (slots holding repeated strings).
+    """
+
+    __slots__ = ()
+    _keys: Tuple[str, ...] = ()
+    _interned: FrozenSet[str] = frozenset()
+
+    def __init__(self, **values: Any) -> None:
+        for name in self.__slots__:
+            value = values[name]
+            if name in self._interned and value is not None:
+                value = sys.intern(value)
+            setattr(self, name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            key: _to_json(getattr(self, name))
+            for name, key in zip(self.__slots__, self._keys)
+        }
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+def records_to_json(records: Iterable[FieldRecord]) -> List[Dict[str, Any]]:
+    """Serialize a field table to the list-of-dicts shape used in the JSON files."""
+    return [record.to_dict() for record in records]
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Vectorised version of the template's 'Fuel Converter' sheet.
+
+The converter sheet turns one fuel quantity at a time into MWh for B3
+(energy consumption from fuels). Its chain, per fuel column (P10:P18,
+A25:A27, O22):
+
+    quantity -> Gg (solid) or L (liquid/gaseous)      unit factor, P18
+    L -> Gg via typical density                        A25
+    Gg x typical NCV [TJ/Gg] -> TJ                     A26:A27
+    TJ x 277.778 -> MWh                                O22
+
+The fuel table ('Fuel Conversion Parameters'!A2:F61) is lifted into NumPy
+arrays once; `FuelConverter.convert` then applies the chain to whole columns
+of (fuel, unit, amount) rows, and `totals` sums the result per site/report
+into the renewable / non-renewable / total split reported in B3.
+
+    python scripts/fuel_converter.py [fuel_quantities.csv] [--template ...]
+
+The CSV needs the columns group, fuel, unit, amount (group is the site or
+report the row belongs to). Without a CSV the parameter table is printed.
+"""
+import argparse
+import csv
+import sys
+import time
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "numpy"])
+    import numpy as np
+
+try:
+    import openpyxl
+except ImportError:
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
+    import openpyxl
+
+
+PARAMETERS_SHEET = 'Fuel Conversion Parameters'
+# Same bounds as the INDEX/MATCH lookups on the converter sheet
+PARAMETER_ROWS = (2, 61)
+
+SOLID, LIQUID, GASEOUS = 0, 1, 2
+STATES = {'Solid': SOLID, 'Liquid': LIQUID, 'Gaseous': GASEOUS}
+
+# Unit factors of 'Fuel Converter'!P18: mass units go to Gg, volume units to L
+MASS_UNITS: Dict[str, float] = {
+    'g - gram': 1e-9,
+    'Kg - Kilogram': 1e-6,
+    't - tonne': 1e-3,
+    'Gg - Gigagram': 1.0,
+}
+VOLUME_UNITS: Dict[str, float] = {
+    'm³ - cubic meters': 1000.0,
+    'L - Liter': 1.0,
+}
+# 'Fuel Converter'!O22 uses this rounded TJ -> MWh factor; keep it so the
+# results match the workbook to the last digit
+MWH_PER_TJ = 277.778
+
+
+class FuelEnergy(NamedTuple):
+    """Per-row result of `FuelConverter.convert`"""
+    mwh: 'np.ndarray'        # NaN where the row cannot be converted
+    renewable: 'np.ndarray'  # typical renewability state of the fuel
+    valid: 'np.ndarray'      # known fuel, unit matching its state of matter
+
+
+class EnergyTotals(NamedTuple):
+    """Per-group sums in MWh; groups in first-seen order"""
+    groups: List[str]
+    renewable: 'np.ndarray'
+    non_renewable: 'np.ndarray'
+    total: 'np.ndarray'
+    invalid_rows: 'np.ndarray'
+
+
+def _lookup(keys: Sequence, table: Dict[str, int]) -> 'np.ndarray':
+    """Index of each key in ``table`` (-1 when unknown). Integer arrays are
+    taken as already-encoded indices, so callers converting the same columns
+    repeatedly can encode them once."""
+    if isinstance(keys, np.ndarray) and keys.dtype.kind in 'iu':
+        return keys.astype(np.int64, copy=False)
+    get = table.get
+    return np.fromiter((get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+
+
+def _factorize(keys: Sequence[str]) -> Tuple[List[str], 'np.ndarray']:
+    """Distinct keys in first-seen order and the code of every key"""
+    codes: Dict[str, int] = {}
+    encoded = np.fromiter((codes.setdefault(key, len(codes)) for key in keys), dtype=np.int64, count=len(keys))
+    return list(codes), encoded
+
+
+class FuelConverter:
+    """Fuel parameters as arrays, indexed by fuel name"""
+
+    def __init__(self, fuels: Sequence[str], states: Sequence[int], ncv: Sequence[float],
+                 density_kg_per_l: Sequence[float], density_kg_per_m3: Sequence[float],
+                 renewable: Sequence[bool]) -> None:
+        self.fuels = list(fuels)
+        self.index = {name: i for i, name in enumerate(self.fuels)}
+        self.states = np.asarray(states, dtype=np.int8)
+        self.ncv = np.asarray(ncv, dtype=np.float64)
+        self.density_kg_per_l = np.asarray(density_kg_per_l, dtype=np.float64)
+        self.density_kg_per_m3 = np.asarray(density_kg_per_m3, dtype=np.float64)
+        self.renewable = np.asarray(renewable, dtype=bool)
+
+        units = list(MASS_UNITS) + list(VOLUME_UNITS)
+        self.unit_index = {unit: i for i, unit in enumerate(units)}
+        self.unit_factor = np.array([MASS_UNITS.get(u, VOLUME_UNITS.get(u)) for u in units])
+        self.unit_is_mass = np.array([u in MASS_UNITS for u in units])
+
+        # Gg per base unit (Gg for solids, L for liquids and gases), folded
+        # into one factor per fuel so conversion is a single gather
+        self.gg_per_base = np.select(
+            [self.states == SOLID, self.states == LIQUID, self.states == GASEOUS],
+            [np.ones(len(self.fuels)), self.density_kg_per_l * 1e-6, self.density_kg_per_m3 * 1e-9],
+            default=np.nan,
+        )
+        self.mwh_per_base = self.gg_per_base * self.ncv * MWH_PER_TJ
+
+    @classmethod
+    def from_workbook(cls, excel_file: str = 'VSME-Digital-Template-1.1.0.xlsx') -> 'FuelConverter':
+        wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+        ws = wb[PARAMETERS_SHEET]
+        first, last = PARAMETER_ROWS
+        columns: Tuple[List, ...] = ([], [], [], [], [], [])
+        for name, state, ncv, density_l, density_m3, renewability in ws.iter_rows(
+                min_row=first, max_row=last, max_col=6, values_only=True):
+            # 'Other 1..10' rows stay empty unless the user fills them in
+            if not name or state not in STATES:
+                continue
+            for column, value in zip(columns, (
+                    str(name).strip(), STATES[state], _number(ncv), _number(density_l),
+                    _number(density_m3), renewability == 'Renewable')):
+                column.append(value)
+        wb.close()
+        return cls(*columns)
+
+    def fuel_codes(self, fuels: Sequence[str]) -> 'np.ndarray':
+        return _lookup(fuels, self.index)
+
+    def unit_codes(self, units: Sequence[str]) -> 'np.ndarray':
+        return _lookup(units, self.unit_index)
+
+    def convert(self, fuels: Sequence, units: Sequence, amounts: Sequence[float]) -> FuelEnergy:
+        """MWh for every (fuel, unit, amount) row in one pass; fuels and units
+        are names or codes from `fuel_codes`/`unit_codes`"""
+        fuel = _lookup(fuels, self.index)
+        unit = _lookup(units, self.unit_index)
+        amount = np.asarray(amounts, dtype=np.float64)
+
+        known = (fuel >= 0) & (unit >= 0)
+        fuel_i = np.where(known, fuel, 0)
+        unit_i = np.where(known, unit, 0)
+        # Solids need a mass unit, liquids and gases a volume unit (Q16 warnings)
+        unit_matches = self.unit_is_mass[unit_i] == (self.states[fuel_i] == SOLID)
+        mwh = amount * self.unit_factor[unit_i] * self.mwh_per_base[fuel_i]
+        valid = known & unit_matches & np.isfinite(mwh)
+        return FuelEnergy(
+            mwh=np.where(valid, mwh, np.nan),
+            renewable=np.where(known, self.renewable[fuel_i], False),
+            valid=valid,
+        )
+
+    def totals(self, groups: Sequence[str], energy: FuelEnergy) -> EnergyTotals:
+        """Renewable / non-renewable / total MWh per group (site, report, ...)"""
+        names, codes = _factorize(groups)
+        mwh = np.where(energy.valid, energy.mwh, 0.0)
+        size = len(names)
+        renewable = np.bincount(codes, weights=np.where(energy.renewable, mwh, 0.0), minlength=size)
+        non_renewable = np.bincount(codes, weights=np.where(energy.renewable, 0.0, mwh), minlength=size)
+        invalid = np.bincount(codes, weights=~energy.valid, minlength=size).astype(np.int64)
+        return EnergyTotals(list(names), renewable, non_renewable, renewable + non_renewable, invalid)
+
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def read_quantities(path: str) -> Tuple[List[str], List[str], List[str], List[float]]:
+    groups, fuels, units, amounts = [], [], [], []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            groups.append(row['group'])
+            fuels.append(row['fuel'])
+            units.append(row['unit'])
+            amounts.append(float(row['amount']) if row['amount'] else np.nan)
+    return groups, fuels, units, amounts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch fuel-to-energy conversion for B3")
+    parser.add_argument('quantities', nargs='?', help="CSV with group, fuel, unit, amount columns")
+    parser.add_argument('--template', default='VSME-Digital-Template-1.1.0.xlsx', help="Excel template to read")
+    args = parser.parse_args(argv)
+
+    converter = FuelConverter.from_workbook(args.template)
+    if not args.quantities:
+        print(f"{len(converter.fuels)} fuels from '{PARAMETERS_SHEET}'")
+        state_names = {code: name for name, code in STATES.items()}
+        for i, name in enumerate(converter.fuels):
+            print(f"  {name[:40]:40} {state_names[converter.states[i]]:8} NCV {converter.ncv[i]:6.2f} TJ/Gg  "
+                  f"{'renewable' if converter.renewable[i] else 'non-renewable'}")
+        return 0
+
+    groups, fuels, units, amounts = read_quantities(args.quantities)
+    started = time.perf_counter()
+    energy = converter.convert(fuels, units, amounts)
+    totals = converter.totals(groups, energy)
+    elapsed = time.perf_counter() - started
+
+    print(f"Converted {len(fuels)} rows for {len(totals.groups)} groups in {elapsed * 1000:.1f} ms")
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['group', 'renewable_mwh', 'non_renewable_mwh', 'total_mwh', 'invalid_rows'])
+    for i, group in enumerate(totals.groups):
+        writer.writerow([group, f'{totals.renewable[i]:.6g}', f'{totals.non_renewable[i]:.6g}',
+                         f'{totals.total[i]:.6g}', totals.invalid_rows[i]])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
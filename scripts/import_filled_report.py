@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Import a filled VSME workbook back into the datapoint payload.
+
+The output is the list the backend `Datapoint` record and the frontend
+WizardStore exchange: ``[{"datapointId": ..., "values": "..."}]``, with the
+same normalisation as the wizard (ISO dates, "true"/"false", numbers without a
+trailing ".0", empty and formula cells skipped).
+
+With ``--unmapped``, entered cells that fall inside a Named Range but are not
+read into any datapoint are listed with the innermost range covering them, as
+looked up in a `RangeIndex` of the spec's Named Ranges.
+
+Cell addresses come from vsme-data-model-spec.json and are resolved once per
+importer. Importing a file then opens only the sheet parts that hold mapped
+cells and streams each one until all of its targets have been seen; only the
+referenced shared strings are parsed.
+
+    python scripts/import_filled_report.py VSME_Report_2025-11-21.xlsx [--output payload.json] [--unmapped]
+"""
+import argparse
+import json
+import sys
+import time
+import zipfile
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from range_index import RangeIndex
+from xlsx_parts import (Cell, CellValue, cell_name, iter_cells, parse_cell, read_shared_strings, scan_cells,
+                        sheet_parts, split_reference)
+
+SPEC_PATH = 'docs/data-model/vsme-data-model-spec.json'
+EXCEL_EPOCH = date(1899, 12, 30)
+# Repeating tables are handled through repeatingDataPatterns, not single cells
+SKIPPED_TYPES = {'table'}
+# Named Ranges of document settings and dropdown lists, not report content
+UNREPORTED_PREFIXES = ('template_', 'enum_')
+
+
+class Target(NamedTuple):
+    datapoint_id: str
+    data_type: str
+    sheet: str
+    cell: Cell
+
+
+def iter_datapoints(spec: Dict) -> Iterator[Dict]:
+    """All datapoints of the core report, basic modules first"""
+    core = spec.get('coreReport', {})
+    for group in ('basicModules', 'comprehensiveModules'):
+        for module in core.get(group, []):
+            for disclosure in module.get('disclosures', []):
+                yield from disclosure.get('datapoints', [])
+
+
+def datapoint_reference(datapoint: Dict, named_ranges: Dict[str, Dict]) -> Optional[str]:
+    """Explicit excelReference, else the reference of its Named Range"""
+    if datapoint.get('excelReference'):
+        return datapoint['excelReference']
+    named_range = named_ranges.get(datapoint.get('excelNamedRange') or '')
+    return named_range.get('reference') if named_range else None
+
+
+def format_value(value: CellValue, data_type: str, shared_strings: Dict[int, str]) -> Optional[str]:
+    """Cell content as the wizard would send it; None for empty cells and
+    formula results (those are derived, not entered)"""
+    if value.formula:
+        return None
+    if value.type == 's':
+        text = shared_strings.get(int(value.raw))
+    elif value.type in ('str', 'inlineStr'):
+        text = value.raw
+    elif value.type == 'b':
+        text = 'true' if value.raw == '1' else 'false'
+    elif value.type == 'e':
+        return None
+    elif value.type == 'd':
+        # ISO 8601 date cell ("2025-01-31" or "2025-01-31T00:00:00")
+        day, _, time_of_day = value.raw.strip().partition('T')
+        if data_type == 'date' or time_of_day.strip('0:.Z') == '':
+            text = day
+        else:
+            text = value.raw.strip()
+    else:
+        number = float(value.raw)
+        if data_type == 'date':
+            return (EXCEL_EPOCH + timedelta(days=int(number))).isoformat()
+        text = str(int(number)) if number.is_integer() else repr(number)
+    if text is None or not text.strip():
+        return None
+    return text
+
+
+class ReportImporter:
+    """Reads the spec's mapped cells from filled workbooks"""
+
+    def __init__(self, spec_path: str = SPEC_PATH) -> None:
+        with open(spec_path, encoding='utf-8') as f:
+            spec = json.load(f)
+        named_ranges = spec.get('namedRanges', {})
+        self.targets: List[Target] = []
+        self.unresolved: List[str] = []
+        for datapoint in iter_datapoints(spec):
+            if datapoint.get('dataType') in SKIPPED_TYPES:
+                continue
+            reference = datapoint_reference(datapoint, named_ranges)
+            if not reference:
+                self.unresolved.append(datapoint['datapointId'])
+                continue
+            sheet, cell_ref = split_reference(reference)
+            try:
+                cell = parse_cell(cell_ref)
+            except ValueError:
+                self.unresolved.append(datapoint['datapointId'])
+                continue
+            self.targets.append(Target(datapoint['datapointId'], datapoint.get('dataType', 'text'), sheet, cell))
+
+        self.by_sheet: Dict[str, List[Target]] = defaultdict(list)
+        for target in self.targets:
+            self.by_sheet[target.sheet].append(target)
+        self.range_index = RangeIndex.from_spec(named_ranges)
+
+    def import_report(self, path: str) -> List[Dict[str, str]]:
+        """Datapoint payload of one filled workbook, in spec order"""
+        with zipfile.ZipFile(path) as zf:
+            parts = sheet_parts(zf)
+            cells: Dict[Target, CellValue] = {}
+            for sheet, targets in self.by_sheet.items():
+                if sheet not in parts:
+                    continue
+                found = scan_cells(zf, parts[sheet], {t.cell for t in targets})
+                for target in targets:
+                    if target.cell in found:
+                        cells[target] = found[target.cell]
+            string_indexes = {int(v.raw) for v in cells.values() if v.type == 's'}
+            shared_strings = read_shared_strings(zf, string_indexes)
+
+        payload = []
+        for target in self.targets:
+            if target not in cells:
+                continue
+            text = format_value(cells[target], target.data_type, shared_strings)
+            if text is not None:
+                payload.append({'datapointId': target.datapoint_id, 'values': text})
+        return payload
+
+    def unmapped_cells(self, path: str) -> Dict[str, Dict[str, str]]:
+        """Entered cells inside a Named Range that no datapoint reads:
+        reference -> innermost Named Range and the cell's text. Only the sheets
+        holding datapoints are scanned; template_* and enum_* ranges (document
+        settings, dropdown lists) are not reported."""
+        mapped = {(t.sheet, t.cell) for t in self.targets}
+        with zipfile.ZipFile(path) as zf:
+            found = []
+            parts = sheet_parts(zf)
+            for sheet in self.by_sheet:
+                if sheet not in parts:
+                    continue
+                for cell, value in iter_cells(zf, parts[sheet]):
+                    if value.formula or (sheet, cell) in mapped:
+                        continue
+                    name = self.range_index.name_at(sheet, cell)
+                    if name and not name.startswith(UNREPORTED_PREFIXES):
+                        found.append((sheet, cell, name, value))
+            string_indexes = {int(v.raw) for *_, v in found if v.type == 's'}
+            shared_strings = read_shared_strings(zf, string_indexes)
+
+        unmapped = {}
+        for sheet, cell, name, value in found:
+            text = format_value(value, 'text', shared_strings)
+            if text is not None:
+                unmapped[f"'{sheet}'!{cell_name(*cell)}"] = {'namedRange': name, 'values': text}
+        return unmapped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import filled VSME workbooks into datapoint payloads")
+    parser.add_argument('files', nargs='+', help="Filled .xlsx reports")
+    parser.add_argument('--spec', default=SPEC_PATH, help="Data model spec with the cell addresses")
+    parser.add_argument('--output', help="JSON file to write (default: stdout); with several inputs a "
+                                         "mapping of file name to payload is written")
+    parser.add_argument('--unmapped', action='store_true',
+                        help="Also list entered cells of Named Ranges that no datapoint reads (on stderr)")
+    args = parser.parse_args(argv)
+
+    importer = ReportImporter(args.spec)
+    if importer.unresolved:
+        print(f"⚠️  {len(importer.unresolved)} datapoints have no cell address: "
+              f"{', '.join(importer.unresolved[:10])}", file=sys.stderr)
+
+    results = {}
+    for path in args.files:
+        started = time.perf_counter()
+        results[path] = importer.import_report(path)
+        elapsed = time.perf_counter() - started
+        print(f"{path}: {len(results[path])}/{len(importer.targets)} datapoints in {elapsed * 1000:.1f} ms",
+              file=sys.stderr)
+        if args.unmapped:
+            for reference, cell in importer.unmapped_cells(path).items():
+                print(f"  {reference} ({cell['namedRange']}): {cell['values'][:60]}", file=sys.stderr)
+
+    output = results[args.files[0]] if len(args.files) == 1 else results
+    text = json.dumps(output, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
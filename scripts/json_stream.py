@@ -0,0 +1,80 @@
+"""
+Incremental JSON writer for the generated data-model files.
+
+``write_json`` produces the same bytes as ``json.dump(value, fp, indent=2,
+ensure_ascii=False)``, but any ``StreamObject``/``StreamArray`` inside ``value``
+is consumed lazily: each member is encoded and written as soon as its
+generator yields it, so only one member has to be in memory at a time.
+"""
+import json
+from typing import Any, Iterable, Iterator, TextIO, Tuple
+
+
+class StreamObject:
+    """A JSON object whose (key, value) members come from an iterable"""
+
+    __slots__ = ('items',)
+
+    def __init__(self, items: Iterable[Tuple[str, Any]]) -> None:
+        self.items = items
+
+
+class StreamArray:
+    """A JSON array whose elements come from an iterable"""
+
+    __slots__ = ('items',)
+
+    def __init__(self, items: Iterable[Any]) -> None:
+        self.items = items
+
+
+def _is_lazy(value: Any) -> bool:
+    if isinstance(value, (StreamObject, StreamArray)):
+        return True
+    if isinstance(value, dict):
+        return any(_is_lazy(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_is_lazy(v) for v in value)
+    return False
+
+
+class _Writer:
+    def __init__(self, fp: TextIO, indent: int) -> None:
+        self.fp = fp
+        self.indent = indent
+        self.encoder = json.JSONEncoder(indent=indent, ensure_ascii=False)
+
+    def value(self, value: Any, depth: int) -> None:
+        if isinstance(value, StreamObject):
+            self.members(iter(value.items), depth, '{', '}', keyed=True)
+        elif isinstance(value, StreamArray):
+            self.members(iter(value.items), depth, '[', ']', keyed=False)
+        elif isinstance(value, dict) and _is_lazy(value):
+            self.members(iter(value.items()), depth, '{', '}', keyed=True)
+        elif isinstance(value, (list, tuple)) and _is_lazy(value):
+            self.members(iter(value), depth, '[', ']', keyed=False)
+        else:
+            encoded = self.encoder.encode(value)
+            if depth:
+                encoded = encoded.replace('\n', '\n' + ' ' * (self.indent * depth))
+            self.fp.write(encoded)
+
+    def members(self, items: Iterator[Any], depth: int, open_: str, close: str, keyed: bool) -> None:
+        inner = '\n' + ' ' * (self.indent * (depth + 1))
+        first = True
+        for item in items:
+            self.fp.write(open_ + inner if first else ',' + inner)
+            first = False
+            if keyed:
+                key, item = item
+                self.fp.write(self.encoder.encode(str(key)) + ': ')
+            self.value(item, depth + 1)
+        if first:
+            self.fp.write(open_ + close)
+        else:
+            self.fp.write('\n' + ' ' * (self.indent * depth) + close)
+
+
+def write_json(value: Any, fp: TextIO, indent: int = 2) -> None:
+    """Write ``value`` to ``fp``, streaming any lazy objects/arrays it contains"""
+    _Writer(fp, indent).value(value, 0)
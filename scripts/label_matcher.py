@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Batch TF-IDF matcher between sheet labels and Named Ranges.
+
+Named Range names are split on CamelCase ("NACESectorClassificationCode" ->
+nace sector classification code), labels on words. Both sides become sparse
+TF-IDF rows over word and character-trigram features, so the whole
+label x range similarity matrix is a single sparse matrix product, and each
+label gets its best candidate ranges on its own sheet (ranges already in use
+can be excluded). When the label rows are known, ranges whose cells lie on the
+label's row (found through the `RangeIndex` of their references) get a bonus.
+
+    python scripts/label_matcher.py [vsme-complete-structure.json]
+"""
+import json
+import math
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "numpy", "scipy"])
+    import numpy as np
+    from scipy import sparse
+
+from range_index import RangeIndex
+
+
+TOKEN_RE = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'if', 'in',
+    'is', 'it', 'of', 'on', 'or', 'per', 'the', 'to', 'with',
+    # reporting flags repeated on every header
+    'always', 'reported', 'applicable', 'may', 'optional',
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens; CamelCase and snake_case names are split too"""
+    return [t.lower() for t in TOKEN_RE.findall(text) if t.lower() not in STOPWORDS]
+
+
+def features(text: str) -> Counter:
+    """Word features plus character trigrams of each word"""
+    counts: Counter = Counter()
+    for word in tokenize(text):
+        counts['w:' + word] += 1
+        padded = f'#{word}#'
+        for i in range(len(padded) - 2):
+            counts['c:' + padded[i:i + 3]] += 1
+    return counts
+
+
+def document_frequencies(range_names: Iterable[str]) -> Tuple[Counter, int]:
+    """Feature -> number of range names having it (in first-seen order), and
+    the number of names; lets matchers over subsets of the ranges share the
+    weights of the whole set"""
+    frequency: Counter = Counter()
+    documents = 0
+    for name in range_names:
+        frequency.update(features(name).keys())
+        documents += 1
+    return frequency, documents
+
+
+class LabelMatcher:
+    """Scores labels against a fixed set of Named Ranges"""
+
+    def __init__(self, named_ranges: Dict[str, Dict], range_modules: Optional[Dict[str, str]] = None,
+                 module_bonus: float = 0.15, row_bonus: float = 0.15,
+                 frequencies: Optional[Tuple[Counter, int]] = None) -> None:
+        """With ``frequencies`` (`document_frequencies` of a larger set of
+        names), ``named_ranges`` can be a subset, e.g. one sheet's ranges:
+        labels then score exactly as against the whole set."""
+        self.range_names: List[str] = list(named_ranges)
+        self.range_index = RangeIndex.from_spec(named_ranges)
+        self.row_bonus = row_bonus
+        self.range_sheets = np.array([named_ranges[n].get('sheet', '') for n in self.range_names], dtype=object)
+        self.range_modules = np.array(
+            [(range_modules or {}).get(n) for n in self.range_names], dtype=object
+        )
+        self.module_bonus = module_bonus
+        self._column = {name: i for i, name in enumerate(self.range_names)}
+
+        range_features = [features(name) for name in self.range_names]
+        if frequencies is None:
+            frequencies = document_frequencies(self.range_names)
+        frequency, n_documents = frequencies
+        self.vocabulary: Dict[str, int] = {feature: j for j, feature in enumerate(frequency)}
+        document_frequency = np.fromiter(frequency.values(), dtype=np.float64, count=len(frequency))
+        n_documents = max(n_documents, 1)
+        self.idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+        self.range_matrix = self._matrix(range_features)
+
+    def _matrix(self, rows: Sequence[Counter]) -> 'sparse.csr_matrix':
+        """L2-normalised TF-IDF rows; features outside the range vocabulary
+        cannot contribute to a dot product and are dropped"""
+        indptr, indices, data = [0], [], []
+        for counts in rows:
+            columns = [(self.vocabulary[f], c) for f, c in counts.items() if f in self.vocabulary]
+            weights = [c * self.idf[j] for j, c in columns]
+            norm = math.sqrt(sum(w * w for w in weights)) or 1.0
+            indices.extend(j for j, _ in columns)
+            data.extend(w / norm for w in weights)
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.array(data), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(rows), len(self.vocabulary)),
+        )
+
+    def score(self, labels: Sequence[str], label_modules: Optional[Sequence[Optional[str]]] = None) -> 'np.ndarray':
+        """Cosine similarity of every label with every range (labels x ranges)"""
+        label_matrix = self._matrix([features(label) for label in labels])
+        scores = (label_matrix @ self.range_matrix.T).toarray()
+        if label_modules is not None and self.module_bonus:
+            modules = np.array(label_modules, dtype=object)[:, None]
+            same_module = (modules == self.range_modules[None, :]) & (modules != None)  # noqa: E711
+            scores += self.module_bonus * same_module
+        return scores
+
+    def _row_scores(self, scores: 'np.ndarray', sheets: Sequence[str], label_rows: Optional[Sequence[int]]) -> None:
+        """Add the row bonus for ranges crossing each label's row"""
+        if label_rows is None or not self.row_bonus:
+            return
+        for i, (sheet, row) in enumerate(zip(sheets, label_rows)):
+            columns = [self._column[name] for name in self.range_index.names_on_row(sheet, row)]
+            if columns:
+                scores[i, columns] += self.row_bonus
+
+    def _allowed(self, sheets: Sequence[str], used_ranges: Iterable[str]) -> 'np.ndarray':
+        allowed = np.array(sheets, dtype=object)[:, None] == self.range_sheets[None, :]
+        used = [self._column[name] for name in used_ranges if name in self._column]
+        if used:
+            allowed[:, used] = False
+        return allowed
+
+    def top_candidates(self, labels: Sequence[str], sheets: Sequence[str], k: int = 5,
+                       min_score: float = 0.1, used_ranges: Iterable[str] = (),
+                       label_modules: Optional[Sequence[Optional[str]]] = None,
+                       label_rows: Optional[Sequence[int]] = None) -> List[List[str]]:
+        """Best ``k`` ranges on the label's own sheet, best first"""
+        scores = self.score(labels, label_modules)
+        self._row_scores(scores, sheets, label_rows)
+        scores[~self._allowed(sheets, used_ranges)] = -1.0
+        k = min(k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in labels]
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        result = []
+        for i, columns in enumerate(best):
+            columns = columns[np.argsort(-scores[i, columns], kind='stable')]
+            result.append([self.range_names[j] for j in columns if scores[i, j] >= min_score])
+        return result
+
+
+def main() -> int:
+    path = sys.argv[1] if len(sys.argv) > 1 else 'docs/data-model/vsme-complete-structure.json'
+    with open(path, encoding='utf-8') as f:
+        structure = json.load(f)
+    fields = [field for sheet_fields in structure['detailedFields'].values() for field in sheet_fields]
+
+    started = time.perf_counter()
+    matcher = LabelMatcher(structure['namedRanges'])
+    labels = [field['label'] for field in fields]
+    sheets = [field['sheet'] for field in fields]
+    rows = [field['row'] for field in fields]
+    assignment = [candidates[0] if candidates else None
+                  for candidates in matcher.top_candidates(labels, sheets, k=1, label_rows=rows)]
+    elapsed = time.perf_counter() - started
+
+    matched = sum(1 for name in assignment if name)
+    print(f"Matched {matched}/{len(fields)} labels against {len(matcher.range_names)} named ranges "
+          f"in {elapsed * 1000:.1f} ms")
+    for field, name in list(zip(fields, assignment))[:25]:
+        print(f"  {field['sheet'][:12]:12} row {field['row']:3d}  {field['label'][:50]:50} -> {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
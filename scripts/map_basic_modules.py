@@ -4,6 +4,7 @@ Map all Basic Modules (B1-B11) with complete datapoint and Named Range mappings
 """
 import sys
 import json
+import argparse
 import re
 from collections import defaultdict
 
@@ -14,6 +15,17 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
     import openpyxl
 
+from data_model import DataModel
+from enumerations import INDEX_PATH, EnumerationIndex
+
+# Curated option labels; other enumeration codes are labelled with the code
+CURRENCY_LABELS = {
+    "EUR": {"en": "Euro (EUR)", "de": "Euro (EUR)"},
+    "USD": {"en": "US Dollar (USD)", "de": "US-Dollar (USD)"},
+    "GBP": {"en": "British Pound (GBP)", "de": "Britisches Pfund (GBP)"},
+    "CHF": {"en": "Swiss Franc (CHF)", "de": "Schweizer Franken (CHF)"},
+}
+
 
 def load_named_ranges(wb):
     """Load all named ranges"""
@@ -56,42 +68,16 @@ def create_datapoint_id(label):
     return result[:50]  # Limit length
 
 
-def find_best_named_range(label, row, sheet_name, named_ranges, used_ranges):
-    """Find the best matching named range for a field"""
-    # Extract key terms from label
-    label_lower = label.lower()
-    label_words = set(re.findall(r'\b\w{4,}\b', label_lower))
-    
-    best_match = None
-    best_score = 0
-    
-    for range_name, range_info in named_ranges.items():
-        if range_info['sheet'] != sheet_name:
-            continue
-        
-        if range_name in used_ranges:
-            continue
-        
-        range_name_lower = range_name.lower()
-        range_words = set(re.findall(r'\b\w{3,}\b', range_name_lower))
-        
-        # Calculate match score
-        common_words = label_words & range_words
-        score = len(common_words)
-        
-        # Boost score if range name contains module code
-        module_match = re.search(r'\b([BC]\d+)\b', label)
-        if module_match and module_match.group(1).lower() in range_name_lower:
-            score += 2
-        
-        if score > best_score:
-            best_score = score
-            best_match = range_name
-    
-    return best_match
+def enumeration_options(enumerations, list_name, labels=None):
+    """Select options in dropdown order from an 'Enumeration Lists' range"""
+    labels = labels or {}
+    return [
+        {"value": code, "label": labels.get(code, {"en": code, "de": code})}
+        for code in enumerations.values(list_name)
+    ]
 
 
-def map_module_b1(ws, named_ranges):
+def map_module_b1(ws, named_ranges, enumerations):
     """Map B1: Basis for Preparation"""
     module = {
         "moduleId": "module-b1",
@@ -127,13 +113,22 @@ def map_module_b1(ws, named_ranges):
                 "excelNamedRange": "NameOfReportingEntity",
                 "excelReference": "'General Information'!$D$3"
             },
+            {
+                "datapointId": "entityIdentifierScheme",
+                "label": {"en": "Identifier scheme of the reporting entity", "de": "Kennungsschema des berichterstattenden Unternehmens"},
+                "dataType": "select",
+                "required": True,
+                "excelNamedRange": "IdentifierSchemeOfReportingEntity",
+                "excelReference": "'General Information'!$D$4",
+                "options": enumeration_options(enumerations, "enum_ListIdentifier")
+            },
             {
                 "datapointId": "entityIdentifier",
                 "label": {"en": "Identifier of the reporting entity", "de": "Kennung des berichterstattenden Unternehmens"},
                 "dataType": "text",
                 "required": True,
                 "excelNamedRange": "IdentifierOfReportingEntity",
-                "excelReference": "'General Information'!$D$4"
+                "excelReference": "'General Information'!$E$4"
             },
             {
                 "datapointId": "currency",
@@ -142,12 +137,7 @@ def map_module_b1(ws, named_ranges):
                 "required": True,
                 "excelNamedRange": "CurrencyUsedInReport",
                 "excelReference": "'General Information'!$D$5",
-                "options": [
-                    {"value": "EUR", "label": {"en": "Euro (EUR)", "de": "Euro (EUR)"}},
-                    {"value": "USD", "label": {"en": "US Dollar (USD)", "de": "US-Dollar (USD)"}},
-                    {"value": "GBP", "label": {"en": "British Pound (GBP)", "de": "Britisches Pfund (GBP)"}},
-                    {"value": "CHF", "label": {"en": "Swiss Franc (CHF)", "de": "Schweizer Franken (CHF)"}}
-                ]
+                "options": enumeration_options(enumerations, "enum_ListOfCurrencies", CURRENCY_LABELS)
             },
             {
                 "datapointId": "reportingPeriodStartYear",
@@ -580,9 +570,9 @@ def map_module_b8(ws, named_ranges):
     return module
 
 
-def generate_basic_modules_mapping():
+def generate_basic_modules_mapping(excel_file="VSME-Digital-Template-1.1.0.xlsx", output_file='vsme-basic-modules-mapping.json',
+                                   enumerations_file=INDEX_PATH):
     """Generate complete mapping for all Basic modules"""
-    excel_file = "VSME-Digital-Template-1.1.0.xlsx"
     
     print("=" * 80)
     print("Mapping Basic Modules (B1-B11)")
@@ -590,8 +580,9 @@ def generate_basic_modules_mapping():
     
     wb = openpyxl.load_workbook(excel_file, data_only=True)
     named_ranges = load_named_ranges(wb)
+    enumerations = EnumerationIndex.load(enumerations_file)
     
-    print(f"\nLoaded {len(named_ranges)} named ranges")
+    print(f"\nLoaded {len(named_ranges)} named ranges, {len(enumerations)} enumeration lists")
     
     # Get worksheets
     ws_general = wb['General Information']
@@ -604,7 +595,7 @@ def generate_basic_modules_mapping():
     # Map detailed modules
     print("\nMapping modules...")
     print("  B1: Basis for Preparation")
-    basic_modules.append(map_module_b1(ws_general, named_ranges))
+    basic_modules.append(map_module_b1(ws_general, named_ranges, enumerations))
     
     print("  B3: Energy and GHG Emissions")
     basic_modules.append(map_module_b3(ws_env, named_ranges))
@@ -717,27 +708,27 @@ def generate_basic_modules_mapping():
         "basicModules": basic_modules
     }
     
-    output_file = 'vsme-basic-modules-mapping.json'
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
     
     print(f"\n✓ Basic modules mapping saved to {output_file}")
     
     # Statistics
-    total_disclosures = sum(len(m['disclosures']) for m in basic_modules)
-    total_datapoints = 0
-    for module in basic_modules:
-        for disclosure in module['disclosures']:
-            total_datapoints += len(disclosure.get('datapoints', []))
+    counts = DataModel.from_modules(basic_modules=basic_modules).counts
     
     print(f"\nStatistics:")
-    print(f"  Total modules: {len(basic_modules)}")
-    print(f"  Total disclosures: {total_disclosures}")
-    print(f"  Total datapoints: {total_datapoints}")
+    print(f"  Total modules: {counts['modules']}")
+    print(f"  Total disclosures: {counts['disclosures']}")
+    print(f"  Total datapoints: {counts['datapoints']}")
     
     wb.close()
 
 
 if __name__ == "__main__":
-    generate_basic_modules_mapping()
+    parser = argparse.ArgumentParser(description="Map the Basic Modules (B1-B11)")
+    parser.add_argument('--template', default="VSME-Digital-Template-1.1.0.xlsx", help="Excel template to read")
+    parser.add_argument('--output', default='vsme-basic-modules-mapping.json', help="JSON file to write")
+    parser.add_argument('--enumerations', default=INDEX_PATH, help="Enumeration index from enumerations.py")
+    args = parser.parse_args()
+    generate_basic_modules_mapping(args.template, args.output, args.enumerations)
 
@@ -4,6 +4,7 @@ Map all Comprehensive Modules (C1-C9) with complete datapoint and Named Range ma
 """
 import sys
 import json
+import argparse
 
 try:
     import openpyxl
@@ -12,6 +13,8 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
     import openpyxl
 
+from data_model import DataModel
+
 
 def load_named_ranges(wb):
     """Load all named ranges"""
@@ -556,7 +559,7 @@ def map_module_c9():
     }
 
 
-def generate_comprehensive_modules_mapping():
+def generate_comprehensive_modules_mapping(output_file='vsme-comprehensive-modules-mapping.json'):
     """Generate complete mapping for all Comprehensive modules"""
     print("=" * 80)
     print("Mapping Comprehensive Modules (C1-C9)")
@@ -604,25 +607,23 @@ def generate_comprehensive_modules_mapping():
         "comprehensiveModules": comprehensive_modules
     }
     
-    output_file = 'vsme-comprehensive-modules-mapping.json'
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
     
     print(f"\n✓ Comprehensive modules mapping saved to {output_file}")
     
     # Statistics
-    total_disclosures = sum(len(m['disclosures']) for m in comprehensive_modules)
-    total_datapoints = 0
-    for module in comprehensive_modules:
-        for disclosure in module['disclosures']:
-            total_datapoints += len(disclosure.get('datapoints', []))
+    counts = DataModel.from_modules(comprehensive_modules=comprehensive_modules).counts
     
     print(f"\nStatistics:")
-    print(f"  Total modules: {len(comprehensive_modules)}")
-    print(f"  Total disclosures: {total_disclosures}")
-    print(f"  Total datapoints: {total_datapoints}")
+    print(f"  Total modules: {counts['modules']}")
+    print(f"  Total disclosures: {counts['disclosures']}")
+    print(f"  Total datapoints: {counts['datapoints']}")
 
 
 if __name__ == "__main__":
-    generate_comprehensive_modules_mapping()
+    parser = argparse.ArgumentParser(description="Map the Comprehensive Modules (C1-C9)")
+    parser.add_argument('--output', default='vsme-comprehensive-modules-mapping.json', help="JSON file to write")
+    args = parser.parse_args()
+    generate_comprehensive_modules_mapping(args.output)
 
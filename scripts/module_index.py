@@ -0,0 +1,151 @@
+"""
+Row-interval index of module/disclosure spans in the disclosure sheets.
+
+Every disclosure block in the template starts with a bold section header such
+as "B3 - Total Energy Consumption (in MWh) from - to - [Always to be reported]"
+in column C. The index is built once from those headers (names canonicalised
+against the Table of Contents) and stores, per sheet, the sorted row spans
+between consecutive headers. Mapping a cell or Named Range to its module and
+disclosure is then a binary search instead of a regex over every label.
+
+A few headers sit to the right of column C (e.g. 'C3 - GHG reduction targets'
+in G16); they open a side span that only covers their own and later columns.
+"""
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from xlsx_parts import parse_cell, split_reference
+
+DISCLOSURE_SHEETS = [
+    'General Information',
+    'Environmental Disclosures',
+    'Social Disclosures',
+    'Governance Disclosures',
+]
+
+HEADER_RE = re.compile(r'^\s*([BC]\d+)\s*[-–]\s*(.+)$', re.S)
+LABEL_COLUMN = 3
+
+
+class ModuleSpan(NamedTuple):
+    sheet: str
+    first_row: int
+    last_row: int
+    first_col: int
+    module_code: str
+    disclosure_name: str
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '', text.lower())
+
+
+def header_disclosure_name(text: str) -> str:
+    """Strip the period placeholder and reporting flag from a header"""
+    name = re.split(r'\s+(?:from\s*-\s*to\s*-|at\s*-)', text, maxsplit=1)[0]
+    name = re.sub(r'\s*\[[^\]]*\]\s*$', '', name)
+    return name.strip()
+
+
+def toc_disclosures(toc_structure: Optional[Dict]) -> Dict[str, List[str]]:
+    """Module code -> disclosure names from extract_table_of_contents() output"""
+    if not toc_structure:
+        return {}
+    modules = toc_structure.get('basicModules', []) + toc_structure.get('comprehensiveModules', [])
+    return {
+        module['moduleCode']: [d['disclosureName'] for d in module.get('disclosures', [])]
+        for module in modules
+    }
+
+
+def canonical_disclosure(module_code: str, name: str, toc: Dict[str, List[str]]) -> str:
+    """Prefer the Table of Contents spelling of a disclosure name"""
+    key = _normalize(name)
+    for candidate in toc.get(module_code, []):
+        candidate_key = _normalize(candidate)
+        if candidate_key and (key.startswith(candidate_key) or candidate_key.startswith(key)):
+            return candidate
+    return name
+
+
+class ModuleSpanIndex:
+    """Sheet -> sorted row spans -> module/disclosure"""
+
+    def __init__(self, spans: Iterable[ModuleSpan]) -> None:
+        self._rows: Dict[str, Tuple[List[int], List[ModuleSpan]]] = {}
+        self._side: Dict[str, Tuple[List[int], List[ModuleSpan]]] = {}
+        grouped: Dict[Tuple[bool, str], List[ModuleSpan]] = {}
+        for span in spans:
+            grouped.setdefault((span.first_col > LABEL_COLUMN, span.sheet), []).append(span)
+        for (side, sheet), sheet_spans in grouped.items():
+            sheet_spans.sort(key=lambda s: (s.first_row, s.first_col))
+            target = self._side if side else self._rows
+            target[sheet] = ([s.first_row for s in sheet_spans], sheet_spans)
+
+    @classmethod
+    def from_workbook(cls, wb, toc_structure: Optional[Dict] = None,
+                      sheets: Iterable[str] = DISCLOSURE_SHEETS) -> 'ModuleSpanIndex':
+        toc = toc_disclosures(toc_structure)
+        spans: List[ModuleSpan] = []
+        for sheet_name in sheets:
+            if sheet_name not in wb.sheetnames:
+                continue
+            ws = wb[sheet_name]
+            headers = []
+            for row in ws.iter_rows(min_row=1, max_row=ws.max_row):
+                for cell in row:
+                    if not isinstance(cell.value, str) or cell.column < LABEL_COLUMN:
+                        continue
+                    match = HEADER_RE.match(cell.value)
+                    if match:
+                        name = header_disclosure_name(match.group(2))
+                        headers.append((cell.row, cell.column, match.group(1),
+                                        canonical_disclosure(match.group(1), name, toc)))
+            main_starts = [row for row, col, _, _ in headers if col == LABEL_COLUMN]
+            for row, col, code, name in headers:
+                later = [start for start in main_starts if start > row]
+                last_row = later[0] - 1 if later else ws.max_row
+                spans.append(ModuleSpan(sheet_name, row, last_row, col, code, name))
+        return cls(spans)
+
+    def lookup(self, sheet: str, row: int, col: int = LABEL_COLUMN) -> Optional[ModuleSpan]:
+        """Span containing a cell, or None for rows before the sheet's first header"""
+        side = self._side.get(sheet)
+        if side and col > LABEL_COLUMN:
+            starts, spans = side
+            for span in reversed(spans[:bisect_right(starts, row)]):
+                if row <= span.last_row and span.first_col <= col:
+                    return span
+        entry = self._rows.get(sheet)
+        if not entry:
+            return None
+        starts, spans = entry
+        i = bisect_right(starts, row)
+        if i == 0:
+            return None
+        span = spans[i - 1]
+        return span if row <= span.last_row else None
+
+    def lookup_reference(self, reference: str) -> Optional[ModuleSpan]:
+        """Span of a Named Range reference such as "'General Information'!$D$3:$D$5"
+        (its top-left cell decides); None for broken references like #REF!"""
+        sheet, cell_ref = split_reference(reference)
+        try:
+            row, col = parse_cell(cell_ref)
+        except ValueError:
+            return None
+        return self.lookup(sheet, row, col)
+
+    def module_for(self, sheet: str, row: int, col: int = LABEL_COLUMN) -> Optional[str]:
+        span = self.lookup(sheet, row, col)
+        return span.module_code if span else None
+
+    def spans(self, sheet: Optional[str] = None) -> List[ModuleSpan]:
+        """All spans (of one sheet), in sheet/row order"""
+        result = []
+        for table in (self._rows, self._side):
+            for name, (_, sheet_spans) in table.items():
+                if sheet is None or name == sheet:
+                    result.extend(sheet_spans)
+        return sorted(result, key=lambda s: (s.sheet, s.first_row, s.first_col))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Pre-normalized copy of the template for report generation.
+
+The backend's `ExcelUpdateService` calls clearAllCachedResultValues() and
+forces a recalculation on every request, although that work only depends on
+the template. This build step does it once:
+
+  * cached formula results (``<v>`` and the result ``t`` of cells with an
+    ``<f>``) are stripped from every worksheet;
+  * xl/calcChain.xml is dropped together with its relationship and content
+    type override (Excel rebuilds it on the next save);
+  * ``<calcPr>`` gets fullCalcOnLoad="1", so Excel recalculates on open;
+  * entries are written in a fixed order ([Content_Types].xml, package
+    relationships, then by name) with fixed timestamps and permissions, so
+    identical inputs give byte-identical output.
+
+A fill then only has to write the user's cells (`report_filler`). The
+fillers default to this copy (`fill_template_path`) once the build has made
+it, and to the original template before that.
+
+    python scripts/normalize_template.py [--template ...] [--output ...]
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import zipfile
+from typing import Dict, List, Tuple
+
+TEMPLATE_PATH = 'VSME-Digital-Template-1.1.0.xlsx'
+NORMALIZED_PATH = 'build/VSME-Digital-Template-1.1.0.normalized.xlsx'
+CALC_CHAIN_PART = 'xl/calcChain.xml'
+CONTENT_TYPES_PART = '[Content_Types].xml'
+FIRST_ENTRIES = (CONTENT_TYPES_PART, '_rels/.rels')
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# Non-empty cells; attribute values never contain '/' or '>'
+CELL_RE = re.compile(rb'<c\b([^>/]*)>(.*?)</c>', re.S)
+CACHED_VALUE_RE = re.compile(rb'<v>.*?</v>|<v/>', re.S)
+TYPE_ATTR_RE = re.compile(rb'\st="[^"]*"')
+CALC_PR_RE = re.compile(rb'<calcPr\b[^>]*?/>')
+CALC_CHAIN_REL_RE = re.compile(rb'<Relationship\b[^>]*?Target="[^"]*calcChain\.xml"[^>]*?/>')
+CALC_CHAIN_OVERRIDE_RE = re.compile(rb'<Override\b[^>]*?PartName="/xl/calcChain\.xml"[^>]*?/>')
+
+
+def fill_template_path() -> str:
+    """Template reports are filled from: the normalized copy when it exists"""
+    return NORMALIZED_PATH if os.path.exists(NORMALIZED_PATH) else TEMPLATE_PATH
+
+
+def strip_cached_values(xml: bytes) -> Tuple[bytes, int]:
+    """Worksheet XML without formula results, and the number of formula cells"""
+    count = 0
+
+    def strip(match: 're.Match') -> bytes:
+        nonlocal count
+        attributes, body = match.group(1), match.group(2)
+        if b'<f' not in body:
+            return match.group(0)
+        count += 1
+        return b'<c' + TYPE_ATTR_RE.sub(b'', attributes) + b'>' + CACHED_VALUE_RE.sub(b'', body) + b'</c>'
+
+    return CELL_RE.sub(strip, xml), count
+
+
+def set_full_calc_on_load(workbook: bytes) -> bytes:
+    def flag(match: 're.Match') -> bytes:
+        element = match.group(0)
+        if b'fullCalcOnLoad=' in element:
+            return re.sub(rb'fullCalcOnLoad="\w*"', b'fullCalcOnLoad="1"', element)
+        return element[:-2].rstrip() + b' fullCalcOnLoad="1"/>'
+
+    if CALC_PR_RE.search(workbook):
+        return CALC_PR_RE.sub(flag, workbook, count=1)
+    # <calcPr> follows <definedNames> (or <sheets>) in CT_Workbook
+    for anchor in (b'</definedNames>', b'</sheets>'):
+        if anchor in workbook:
+            return workbook.replace(anchor, anchor + b'<calcPr fullCalcOnLoad="1"/>', 1)
+    return workbook
+
+
+def entry_order(names: List[str]) -> List[str]:
+    first = [name for name in FIRST_ENTRIES if name in names]
+    return first + sorted(name for name in names if name not in FIRST_ENTRIES)
+
+
+def normalize_template(template_path: str, output_path: str) -> Dict[str, int]:
+    stats = {'formula_cells': 0, 'input_bytes': 0, 'output_bytes': 0}
+    with zipfile.ZipFile(template_path) as zf:
+        infos = {info.filename: info for info in zf.infolist()}
+        parts = {name: zf.read(name) for name in infos}
+    stats['input_bytes'] = sum(len(data) for data in parts.values())
+
+    if parts.pop(CALC_CHAIN_PART, None) is not None:
+        parts['xl/_rels/workbook.xml.rels'] = CALC_CHAIN_REL_RE.sub(b'', parts['xl/_rels/workbook.xml.rels'])
+        parts[CONTENT_TYPES_PART] = CALC_CHAIN_OVERRIDE_RE.sub(b'', parts[CONTENT_TYPES_PART])
+    parts['xl/workbook.xml'] = set_full_calc_on_load(parts['xl/workbook.xml'])
+    for name in parts:
+        if name.startswith('xl/worksheets/') and name.endswith('.xml'):
+            parts[name], count = strip_cached_values(parts[name])
+            stats['formula_cells'] += count
+    stats['output_bytes'] = sum(len(data) for data in parts.values())
+
+    with zipfile.ZipFile(output_path, 'w') as out:
+        for name in entry_order(list(parts)):
+            info = zipfile.ZipInfo(name, date_time=ZIP_EPOCH)
+            # Images are stored uncompressed in the template; keep that
+            info.compress_type = infos[name].compress_type
+            info.external_attr = 0o644 << 16
+            info.create_system = 0
+            out.writestr(info, parts[name], compresslevel=9 if info.compress_type == zipfile.ZIP_DEFLATED else None)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the pre-normalized report template")
+    parser.add_argument('--template', default=TEMPLATE_PATH, help="Excel template to normalize")
+    parser.add_argument('--output', default=NORMALIZED_PATH, help="Normalized template to write")
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    stats = normalize_template(args.template, args.output)
+    with open(args.output, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    print(f"✓ {stats['formula_cells']} formula results stripped, "
+          f"{stats['input_bytes'] / 1024:.0f} KB -> {stats['output_bytes'] / 1024:.0f} KB uncompressed")
+    print(f"  {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB, sha256 {digest[:12]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Module-selective report export.
+
+A company reporting the Basic Module only ("Basic Module Only" in the spec,
+"Option A (Basic Module only)" in the template dropdown and the wizard, for
+the B1 basis-for-preparation datapoint) has no use for the C1-C9 sections, yet the
+full template ships them on every disclosure sheet. This script builds a
+partial template for a set of modules and fills it:
+
+  * the section spans of `module_index.ModuleSpanIndex` decide which module
+    owns each cell of the disclosure sheets; cells of unselected modules are
+    removed, rows left empty are hidden, and merged ranges, data validations
+    and conditional formats lying entirely in hidden rows go with them;
+  * rows are hidden rather than deleted, so every formula, defined name and
+    cell address of the kept sections stays valid;
+  * the result is slimmed like `slim_template` (sheets the kept sections no
+    longer reach, unused formats and shared strings are dropped);
+  * datapoints and repeating rows of unselected modules are left out of the
+    payload before filling.
+
+Partial templates are written once per module selection under build/partial/
+and rebuilt when the template or spec is newer (the Basic Module variant is
+also a build_data_model stage).
+
+    python scripts/partial_export.py payload.json [--modules basic | B1 B3 ...] [--output VSME_Report.xlsx]
+    python scripts/partial_export.py --template-only [--modules basic]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from data_model import DataModel
+from import_filled_report import SPEC_PATH
+from module_index import LABEL_COLUMN, ModuleSpanIndex
+from normalize_template import NORMALIZED_PATH, TEMPLATE_PATH
+from report_filler import CELL_START_RE, ROW_START_RE, ReportFiller, _element_end
+from slim_template import DEFAULT_KEEP, read_parts, slim_parts, workbook_names, write_parts
+from xlsx_parts import column_index, parse_range
+
+PARTIAL_DIR = 'build/partial'
+BASIS_DATAPOINT = 'basisForPreparation'
+# Spec option value and template / wizard option text ("Option A (Basic
+# Module only)") both contain it; compared case-insensitively
+BASIC_ONLY = 'basic module only'
+
+SHEET_DATA_RE = re.compile(rb'(<sheetData\b[^>]*>)(.*?)(</sheetData>)', re.S)
+SQREF_RE = re.compile(rb'\b(?:sqref|ref)="([^"]*)"')
+# Range-bearing elements of the main namespace and their containers
+RANGE_ELEMENTS = (
+    (b'mergeCells', re.compile(rb'<mergeCell\b[^>]*/>')),
+    (b'dataValidations', re.compile(rb'<dataValidation\b[^>]*?(?:/>|>.*?</dataValidation>)', re.S)),
+)
+CONDITIONAL_FORMAT_RE = re.compile(rb'<conditionalFormatting\b[^>]*>.*?</conditionalFormatting>', re.S)
+
+
+class PartialResult(NamedTuple):
+    modules: List[str]
+    removed_cells: int
+    hidden_rows: int
+    removed_ranges: int
+    dropped_sheets: List[str]
+    input_bytes: int
+    output_bytes: int
+
+
+def module_codes(model: DataModel) -> List[str]:
+    return [code for code in model.modules if code != 'UNMAPPED']
+
+
+def resolve_modules(model: DataModel, requested: Iterable[str]) -> Set[str]:
+    """Module codes of a selection; 'basic' and 'comprehensive' expand to
+    the B and C modules"""
+    codes = module_codes(model)
+    selected: Set[str] = set()
+    for item in requested:
+        if item.lower() == 'basic':
+            selected.update(code for code in codes if code.startswith('B'))
+        elif item.lower() in ('comprehensive', 'all'):
+            selected.update(code for code in codes if item.lower() == 'all' or code.startswith('C'))
+        elif item.upper() in codes:
+            selected.add(item.upper())
+        else:
+            raise ValueError(f"Unknown module: {item}")
+    return selected
+
+
+def payload_modules(model: DataModel, datapoints: Iterable[Mapping]) -> Optional[Set[str]]:
+    """Basic modules when the payload's basis for preparation is the Basic
+    Module only option, else None (the full report)"""
+    basis = None
+    for datapoint in datapoints:
+        if datapoint.get('datapointId') == BASIS_DATAPOINT:
+            basis = datapoint.get('values')
+    if isinstance(basis, str) and BASIC_ONLY in ' '.join(basis.lower().split()):
+        return resolve_modules(model, ['basic'])
+    return None
+
+
+def selection_label(model: DataModel, modules: Set[str]) -> str:
+    if modules == resolve_modules(model, ['basic']):
+        return 'basic'
+    return '-'.join(sorted(modules, key=lambda code: (code[0], int(code[1:]) if code[1:].isdigit() else 0)))
+
+
+def _ranges_hidden(sqref: bytes, hidden: Set[int]) -> bool:
+    try:
+        ranges = [parse_range(item) for item in sqref.decode().split()]
+    except ValueError:
+        return False
+    return bool(ranges) and all(
+        all(row in hidden for row in range(first_row, last_row + 1))
+        for first_row, _, last_row, _ in ranges)
+
+
+def _drop_ranges(xml: bytes, hidden: Set[int]) -> Tuple[bytes, int]:
+    """Remove merged ranges, validations and conditional formats that lie
+    entirely in hidden rows; containers left empty are removed too"""
+    removed = 0
+
+    def keep(element: bytes) -> bool:
+        match = SQREF_RE.search(element)
+        return not (match and _ranges_hidden(match.group(1), hidden))
+
+    for container, element_re in RANGE_ELEMENTS:
+        match = re.search(rb'<' + container + rb'\b[^>]*>(.*?)</' + container + rb'>', xml, re.S)
+        if not match:
+            continue
+        elements = element_re.findall(match.group(1))
+        kept = [element for element in elements if keep(element)]
+        removed += len(elements) - len(kept)
+        if len(kept) == len(elements):
+            continue
+        if kept:
+            start = re.sub(rb'\bcount="\d+"', b'count="%d"' % len(kept), xml[match.start():match.start(1)])
+            replacement = start + b''.join(kept) + b'</' + container + b'>'
+        else:
+            replacement = b''
+        xml = xml[:match.start()] + replacement + xml[match.end():]
+
+    def conditional(match: 're.Match') -> bytes:
+        nonlocal removed
+        if keep(match.group(0)[:match.group(0).index(b'>') + 1]):
+            return match.group(0)
+        removed += 1
+        return b''
+
+    return CONDITIONAL_FORMAT_RE.sub(conditional, xml), removed
+
+
+def blank_sections(xml: bytes, sheet: str, index: ModuleSpanIndex, modules: Set[str]) -> Tuple[bytes, Dict[str, int]]:
+    """Worksheet XML without the cells of unselected modules, their emptied
+    rows hidden"""
+    stats = {'cells': 0, 'rows': 0, 'ranges': 0}
+    section = SHEET_DATA_RE.search(xml)
+    if section is None:
+        return xml, stats
+
+    def unselected(row: int, col: int = LABEL_COLUMN) -> bool:
+        code = index.module_for(sheet, row, col)
+        return code is not None and code not in modules
+
+    hidden_span_rows = set()
+    for span in index.spans(sheet):
+        if span.first_col <= LABEL_COLUMN and span.module_code not in modules:
+            hidden_span_rows.update(range(span.first_row, span.last_row + 1))
+
+    data = section.group(2)
+    rows: Dict[int, bytes] = {}
+    for match in ROW_START_RE.finditer(data):
+        row = int(match.group(1))
+        end = _element_end(data, match.end(), bool(match.group(2)), b'row')
+        if match.group(2):
+            rows[row] = b'' if row in hidden_span_rows else data[match.start():end]
+            continue
+        body_end = end - len(b'</row>')
+        kept = []
+        for cell in CELL_START_RE.finditer(data, match.end(), body_end):
+            cell_end = _element_end(data, cell.end(), bool(cell.group(3)), b'c')
+            if unselected(row, column_index(cell.group(1).decode())):
+                stats['cells'] += 1
+            else:
+                kept.append(data[cell.start():cell_end])
+        if kept or row not in hidden_span_rows:
+            rows[row] = data[match.start():match.end()] + b''.join(kept) + b'</row>'
+        else:
+            rows[row] = b''
+
+    hidden = set()
+    for row in hidden_span_rows:
+        if not rows.get(row):
+            rows[row] = b'<row r="%d" hidden="1"/>' % row
+            hidden.add(row)
+            stats['rows'] += 1
+    sheet_data = b''.join(rows[row] for row in sorted(rows))
+    xml = xml[:section.start(2)] + sheet_data + xml[section.end(2):]
+    xml, stats['ranges'] = _drop_ranges(xml, hidden)
+    return xml, stats
+
+
+def partial_template(template_path: str, output_path: str, modules: Set[str], index: ModuleSpanIndex,
+                     roots: Iterable[str]) -> PartialResult:
+    """Write the template reduced to ``modules``; ``roots`` are the sheets to
+    keep regardless of reachability"""
+    infos, parts = read_parts(template_path)
+    input_bytes = sum(len(data) for data in parts.values())
+    totals = {'cells': 0, 'rows': 0, 'ranges': 0}
+    spanned = {span.sheet for span in index.spans()}
+    for sheet, part in workbook_names(parts).sheets:
+        if sheet in spanned:
+            parts[part], stats = blank_sections(parts[part], sheet, index, modules)
+            for key, value in stats.items():
+                totals[key] += value
+    result = slim_parts(parts, roots)
+    write_parts(output_path, infos, parts)
+    return PartialResult(sorted(modules), totals['cells'], totals['rows'], totals['ranges'],
+                         result.dropped_sheets, input_bytes, sum(len(data) for data in parts.values()))
+
+
+def build_index(source_path: str = TEMPLATE_PATH) -> ModuleSpanIndex:
+    """Section spans from the original template (the headers are formula
+    results, which the normalized template no longer caches)"""
+    import openpyxl
+    from rebuild_vsme_data_model import build_module_index
+    wb = openpyxl.load_workbook(source_path, data_only=True)
+    try:
+        return build_module_index(wb)
+    finally:
+        wb.close()
+
+
+def partial_roots(model: DataModel, modules: Set[str]) -> Set[str]:
+    roots = set(DEFAULT_KEEP)
+    for code in modules:
+        roots.update(entry.module.get('sheet') for entry in model.iter_datapoints(code))
+        if model.module(code) and model.module(code).get('sheet'):
+            roots.add(model.module(code)['sheet'])
+    return roots
+
+
+class PartialExporter:
+    """Fills the partial template of one module selection"""
+
+    def __init__(self, modules: Set[str], template_path: str = NORMALIZED_PATH, spec_path: str = SPEC_PATH,
+                 source_path: str = TEMPLATE_PATH, directory: str = PARTIAL_DIR, rebuild: bool = False) -> None:
+        self.model = DataModel.load(spec_path)
+        self.modules = modules
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        self.template_path = os.path.join(directory, f'{stem}.{selection_label(self.model, modules)}.xlsx')
+        self.result: Optional[PartialResult] = None
+        if rebuild or self._stale(template_path, spec_path):
+            os.makedirs(directory, exist_ok=True)
+            self.result = partial_template(template_path, self.template_path, modules, build_index(source_path),
+                                           partial_roots(self.model, modules))
+        self.filler = ReportFiller(self.template_path, spec_path)
+
+    def _stale(self, *inputs: str) -> bool:
+        if not os.path.exists(self.template_path):
+            return True
+        built = os.path.getmtime(self.template_path)
+        return any(os.path.getmtime(path) > built for path in inputs)
+
+    def payload(self, datapoints: Iterable[Mapping],
+                tables: Optional[Mapping[str, List[Mapping]]] = None) -> Tuple[List[Mapping], Dict[str, List[Mapping]]]:
+        """Datapoints and repeating rows of the selected modules only"""
+        kept = []
+        for datapoint in datapoints:
+            entry = self.model.datapoint(datapoint.get('datapointId'))
+            if entry is None or entry.module.get('moduleCode') in self.modules:
+                kept.append(datapoint)
+        patterns = {p['patternId']: p.get('module') for p in self.model.spec.get('repeatingDataPatterns', [])}
+        kept_tables = {pattern_id: rows for pattern_id, rows in (tables or {}).items()
+                       if patterns.get(pattern_id) in self.modules}
+        return kept, kept_tables
+
+    def fill(self, datapoints: Iterable[Mapping], tables: Optional[Mapping[str, List[Mapping]]] = None) -> bytes:
+        return self.filler.fill(*self.payload(datapoints, tables))
+
+
+def load_payload(path: str) -> Tuple[List[Dict], Dict[str, List[Dict]]]:
+    """A datapoint list, or a record with "datapoints" and "tables" as in
+    synthetic_reports' payloads.jsonl"""
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    if isinstance(payload, dict):
+        return payload.get('datapoints', []), payload.get('tables', {})
+    return payload, {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a report with only the selected modules")
+    parser.add_argument('payload', nargs='?', help="Payload JSON ([{datapointId, values}] or {datapoints, tables})")
+    parser.add_argument('--modules', nargs='*',
+                        help="'basic', 'comprehensive' or module codes (default: from basisForPreparation)")
+    parser.add_argument('--output', default='VSME_Report.xlsx', help="Report to write")
+    parser.add_argument('--template-only', action='store_true', help="Only (re)build the partial template")
+    parser.add_argument('--template', default=NORMALIZED_PATH, help="Template to reduce (normally the normalized one)")
+    parser.add_argument('--source', default=TEMPLATE_PATH, help="Original template, for the section headers")
+    parser.add_argument('--spec', default=SPEC_PATH, help="Data model spec")
+    parser.add_argument('--directory', default=PARTIAL_DIR, help="Where partial templates are kept")
+    args = parser.parse_args(argv)
+    if not args.template_only and not args.payload:
+        parser.error("a payload is required unless --template-only is given")
+
+    model = DataModel.load(args.spec)
+    datapoints, tables = load_payload(args.payload) if args.payload else ([], {})
+    try:
+        modules = resolve_modules(model, args.modules) if args.modules else payload_modules(model, datapoints)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.template_only and modules is None:
+        modules = resolve_modules(model, ['basic'])
+    if modules is None:
+        print("⚠️  Payload is not Basic Module Only; use report_filler for the full report, or pass --modules")
+        return 1
+
+    exporter = PartialExporter(modules, args.template, args.spec, args.source, args.directory,
+                               rebuild=args.template_only)
+    result = exporter.result
+    if result is not None:
+        print(f"✓ Partial template for {', '.join(result.modules)}: {result.removed_cells} cells removed, "
+              f"{result.hidden_rows} rows hidden, {result.removed_ranges} ranges dropped")
+        if result.dropped_sheets:
+            print(f"  dropped sheets: {', '.join(result.dropped_sheets)}")
+        print(f"  {result.input_bytes / 1024:.0f} KB -> {result.output_bytes / 1024:.0f} KB uncompressed")
+    print(f"  {exporter.template_path} ({os.path.getsize(exporter.template_path) / 1024:.0f} KB)")
+    if args.template_only:
+        return 0
+
+    started = time.perf_counter()
+    content = exporter.fill(datapoints, tables)
+    with open(args.output, 'wb') as f:
+        f.write(content)
+    print(f"✓ {args.output} ({len(content) / 1024:.0f} KB) in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
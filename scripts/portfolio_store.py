@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Append-only columnar store of reported values across a portfolio.
+
+Every ingested report (a filled workbook read by `ReportImporter`, or a
+payload) becomes one row per datapoint value, keyed by entity identifier,
+reporting period and datapointId. The entity and period come from the
+report's XBRL block, as in `xbrl_export`. Rows are kept column by column:
+
+    report     uint32   ingestion sequence number (manifest ``reports``)
+    entity     uint32   code in the entity dictionary ("lei:529900...")
+    start/end  int32    reporting period, days since 1970-01-01
+    datapoint  uint16   code in the datapoint catalog, taken from the spec
+    number     float64  numeric value, NaN for text
+    text       uint32   1 + code in the string dictionary, 0 for numbers
+
+Each append writes a new immutable segment directory with one ``.npy`` file
+per column, adds new strings to strings.jsonl and then replaces manifest.json,
+which records the dictionaries, the reports and each segment's min/max per
+column. A query skips every segment whose statistics exclude its filters,
+memory-maps only the columns it needs from the others, and aggregates with
+vectorised NumPy. Re-ingesting an entity and period supersedes the earlier
+report: queries read the latest report of each (entity, period) only.
+
+    python scripts/portfolio_store.py append build/portfolio reports/*.xlsx payloads.jsonl
+    python scripts/portfolio_store.py query build/portfolio scope1Emissions --year 2025 [--agg sum] [--by entity]
+    python scripts/portfolio_store.py info build/portfolio
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "numpy"])
+    import numpy as np
+
+from data_model import DataModel
+from import_filled_report import SKIPPED_TYPES, SPEC_PATH, ReportImporter
+from report_filler import numeric_value, payload_values
+from xbrl_concepts import CONCEPTS_PATH
+from xbrl_export import XbrlExporter, iter_payloads
+
+STORE_VERSION = 1
+MANIFEST = 'manifest.json'
+STRINGS = 'strings.jsonl'
+COLUMNS = {
+    'report': np.uint32,
+    'entity': np.uint32,
+    'start': np.int32,
+    'end': np.int32,
+    'datapoint': np.uint16,
+    'number': np.float64,
+    'text': np.uint32,
+}
+STATS_COLUMNS = ('report', 'entity', 'start', 'end', 'datapoint', 'number')
+AGGREGATES = ('sum', 'mean', 'min', 'max', 'count')
+GROUPS = ('entity', 'period', 'datapoint')
+EPOCH = date(1970, 1, 1)
+
+
+class AppendResult(NamedTuple):
+    reports: int
+    rows: int
+    skipped: List[Tuple[str, str]]
+
+
+def _days(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def _date(days: int) -> date:
+    return date.fromordinal(EPOCH.toordinal() + int(days))
+
+
+def _write_json(path: str, data: Dict) -> None:
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+class PortfolioStore:
+    """A store directory: manifest, string dictionary and column segments"""
+
+    def __init__(self, directory: str, spec_path: str = SPEC_PATH, concepts_path: str = CONCEPTS_PATH) -> None:
+        self.directory = directory
+        self.spec_path = spec_path
+        self.concepts_path = concepts_path
+        path = os.path.join(directory, MANIFEST)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            if self.manifest.get('version') != STORE_VERSION:
+                raise ValueError(f"{directory}: unsupported store version {self.manifest.get('version')}")
+        else:
+            self.manifest = {'version': STORE_VERSION, 'catalog': [], 'entities': [], 'strings': 0,
+                             'reports': [], 'superseded': [], 'segments': []}
+        self.catalog: Dict[str, int] = {entry['datapointId']: i for i, entry in enumerate(self.manifest['catalog'])}
+        self.entities: Dict[str, int] = {entity: i for i, entity in enumerate(self.manifest['entities'])}
+        # Loaded by the first append; queries never need the texts
+        self.strings: Optional[List[str]] = None
+        self.string_codes: Dict[str, int] = {}
+        self._strings_tail = False
+        self._current: Optional['np.ndarray'] = None
+
+    # -- ingestion -------------------------------------------------------
+
+    def _load_strings(self) -> None:
+        self.strings = []
+        path = os.path.join(self.directory, STRINGS)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if len(self.strings) == self.manifest['strings']:
+                        # Written by an interrupted append; dropped by this one
+                        self._strings_tail = True
+                        break
+                    self.strings.append(json.loads(line))
+        self.string_codes = {text: i for i, text in enumerate(self.strings)}
+
+    def _extend_catalog(self) -> None:
+        """Add datapoints of the spec the catalog does not know yet; existing
+        codes never change"""
+        for entry in DataModel.load(self.spec_path).iter_datapoints():
+            datapoint = entry.datapoint
+            if datapoint.get('dataType') in SKIPPED_TYPES or datapoint['datapointId'] in self.catalog:
+                continue
+            self.catalog[datapoint['datapointId']] = len(self.manifest['catalog'])
+            self.manifest['catalog'].append({
+                'datapointId': datapoint['datapointId'],
+                'dataType': datapoint.get('dataType'),
+                'unit': datapoint.get('unit'),
+                'module': entry.module.get('moduleCode'),
+            })
+
+    def _code(self, codes: Dict[str, int], values: List[str], key: str) -> int:
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(values)
+            values.append(key)
+        return code
+
+    def append(self, reports: Iterable[Tuple[str, List[Dict]]]) -> AppendResult:
+        """Ingest (source, datapoint payload) pairs as one new segment"""
+        if self.strings is None:
+            self._load_strings()
+        self._extend_catalog()
+        latest = {(r['entity'], r['start'], r['end']): i for i, r in enumerate(self.manifest['reports'])}
+        exporter = XbrlExporter(self.concepts_path)
+        columns: Dict[str, List] = {name: [] for name in COLUMNS}
+        new_strings = len(self.strings)
+        skipped: List[Tuple[str, str]] = []
+        added = 0
+        for source, datapoints in reports:
+            values = payload_values(datapoints)
+            try:
+                document = exporter.document(values)
+            except ValueError as e:
+                skipped.append((source, str(e)))
+                continue
+            report = len(self.manifest['reports'])
+            entity = self._code(self.entities, self.manifest['entities'], document.entity)
+            start, end = _days(document.start), _days(document.end)
+            self.manifest['reports'].append({'source': source, 'entity': entity, 'start': start, 'end': end})
+            previous = latest.get((entity, start, end))
+            if previous is not None:
+                self.manifest['superseded'].append(previous)
+            latest[(entity, start, end)] = report
+            added += 1
+            for datapoint_id, text in values.items():
+                code = self.catalog.get(datapoint_id)
+                if code is None or not text.strip():
+                    continue
+                number = numeric_value(text) if self.manifest['catalog'][code]['dataType'] == 'number' else None
+                columns['report'].append(report)
+                columns['entity'].append(entity)
+                columns['start'].append(start)
+                columns['end'].append(end)
+                columns['datapoint'].append(code)
+                columns['number'].append(float(number) if number is not None else np.nan)
+                columns['text'].append(0 if number is not None else
+                                       1 + self._code(self.string_codes, self.strings, text.strip()))
+
+        rows = len(columns['report'])
+        if rows:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"segment-{len(self.manifest['segments']) + 1:06d}"
+            segment_dir = os.path.join(self.directory, name)
+            os.makedirs(segment_dir, exist_ok=True)
+            stats = {}
+            for column, dtype in COLUMNS.items():
+                array = np.asarray(columns[column], dtype=dtype)
+                np.save(os.path.join(segment_dir, column + '.npy'), array)
+                if column in STATS_COLUMNS:
+                    present = array[~np.isnan(array)] if array.dtype.kind == 'f' else array
+                    stats[column] = [present.min().item(), present.max().item()] if len(present) else None
+            if self._strings_tail:
+                new_strings, self._strings_tail = 0, False
+            with open(os.path.join(self.directory, STRINGS), 'w' if new_strings == 0 else 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(text, ensure_ascii=False) + '\n' for text in self.strings[new_strings:])
+            self.manifest['segments'].append({'name': name, 'rows': rows, 'stats': stats})
+        if added:
+            os.makedirs(self.directory, exist_ok=True)
+            self.manifest['strings'] = len(self.strings)
+            _write_json(os.path.join(self.directory, MANIFEST), self.manifest)
+            self._current = None
+        return AppendResult(added, rows, skipped)
+
+    # -- queries ---------------------------------------------------------
+
+    @property
+    def current(self) -> 'np.ndarray':
+        """report code -> whether it is the latest report of its entity and period"""
+        if self._current is None:
+            self._current = np.ones(len(self.manifest['reports']), dtype=bool)
+            self._current[self.manifest['superseded']] = False
+        return self._current
+
+    def datapoint_codes(self, datapoint_ids: Sequence[str]) -> List[int]:
+        unknown = [d for d in datapoint_ids if d not in self.catalog]
+        if unknown:
+            raise ValueError(f"Unknown datapoint(s): {', '.join(unknown)}")
+        return [self.catalog[d] for d in datapoint_ids]
+
+    def _bounds(self, datapoints: List[int], entities: Optional[List[int]], year: Optional[int],
+                minimum: Optional[float], maximum: Optional[float]) -> Dict[str, Tuple[float, float]]:
+        bounds = {'datapoint': (min(datapoints), max(datapoints))}
+        if entities is not None:
+            bounds['entity'] = (min(entities), max(entities)) if entities else (1, 0)
+        if year is not None:
+            bounds['end'] = (_days(date(year, 1, 1)), _days(date(year, 12, 31)))
+        if minimum is not None or maximum is not None:
+            bounds['number'] = (-np.inf if minimum is None else minimum, np.inf if maximum is None else maximum)
+        return bounds
+
+    def segments(self, bounds: Dict[str, Tuple[float, float]]) -> Iterator[Dict]:
+        """Segments whose min/max statistics overlap every bound"""
+        for segment in self.manifest['segments']:
+            stats = segment['stats']
+            if all(stats.get(column) is not None and stats[column][0] <= high and low <= stats[column][1]
+                   for column, (low, high) in bounds.items()):
+                yield segment
+
+    def query(self, datapoint_ids: Sequence[str], agg: str = 'sum', year: Optional[int] = None,
+              entities: Optional[Sequence[str]] = None, group_by: Optional[str] = None,
+              minimum: Optional[float] = None, maximum: Optional[float] = None,
+              latest: bool = True) -> Dict[str, float]:
+        """Aggregate of the values of ``datapoint_ids``, per group (or under
+        the key 'all'). ``year`` selects reporting periods ending in that year;
+        ``minimum``/``maximum`` bound the numeric values. Numeric aggregates
+        ignore text values; 'count' counts both."""
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate {agg}; expected one of {', '.join(AGGREGATES)}")
+        if group_by not in (None,) + GROUPS:
+            raise ValueError(f"Cannot group by {group_by}; expected one of {', '.join(GROUPS)}")
+        codes = self.datapoint_codes(datapoint_ids)
+        entity_codes = None if entities is None else [self.entities[e] for e in entities if e in self.entities]
+        bounds = self._bounds(codes, entity_codes, year, minimum, maximum)
+        needed = {'datapoint', 'report', 'number'} | set(bounds)
+        if group_by == 'period':
+            needed |= {'start', 'end'}
+        elif group_by:
+            needed.add(group_by)
+
+        values, keys = [], []
+        for segment in self.segments(bounds):
+            path = os.path.join(self.directory, segment['name'])
+            data = {column: np.load(os.path.join(path, column + '.npy'), mmap_mode='r') for column in needed}
+            mask = np.isin(data['datapoint'], codes)
+            if latest:
+                mask &= self.current[data['report']]
+            for column, (low, high) in bounds.items():
+                if column != 'datapoint':
+                    mask &= (data[column] >= low) & (data[column] <= high)
+            if entity_codes is not None:
+                mask &= np.isin(data['entity'], entity_codes)
+            if agg != 'count':
+                mask &= ~np.isnan(data['number'])
+            values.append(np.asarray(data['number'][mask]))
+            if group_by == 'period':
+                keys.append(np.asarray(data['start'][mask]).astype(np.int64) << 32 | np.asarray(data['end'][mask]))
+            elif group_by:
+                keys.append(np.asarray(data[group_by][mask]))
+
+        numbers = np.concatenate(values) if values else np.empty(0)
+        if not group_by:
+            return {'all': self._aggregate(numbers, agg)}
+        groups, inverse = np.unique(np.concatenate(keys) if keys else np.empty(0, np.int64), return_inverse=True)
+        result = {}
+        for i, key in enumerate(groups):
+            result[self._label(group_by, int(key))] = self._aggregate(numbers[inverse == i], agg)
+        return result
+
+    @staticmethod
+    def _aggregate(numbers: 'np.ndarray', agg: str) -> float:
+        if agg == 'count':
+            return float(len(numbers))
+        if not len(numbers):
+            return float('nan')
+        return float(getattr(np, agg)(numbers))
+
+    def _label(self, group_by: str, key: int) -> str:
+        if group_by == 'entity':
+            return self.manifest['entities'][key]
+        if group_by == 'datapoint':
+            return self.manifest['catalog'][key]['datapointId']
+        return f'{_date(key >> 32).isoformat()}/{_date(key & 0xFFFFFFFF).isoformat()}'
+
+
+def iter_reports(paths: Iterable[str], importer: Optional[ReportImporter] = None) -> Iterator[Tuple[str, List[Dict]]]:
+    """(source, datapoints) of filled workbooks and payload files"""
+    for path in paths:
+        if path.endswith('.xlsx'):
+            importer = importer or ReportImporter()
+            yield path, importer.import_report(path)
+        else:
+            for report_id, datapoints, _ in iter_payloads(path):
+                yield f'{path}#{report_id}', datapoints
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar store of reported values across a portfolio")
+    commands = parser.add_subparsers(dest='command', required=True)
+    append = commands.add_parser('append', help="Ingest filled workbooks and payload files as a new segment")
+    append.add_argument('store', help="Store directory")
+    append.add_argument('inputs', nargs='+', help=".xlsx reports, payload .json or payloads.jsonl files")
+    append.add_argument('--spec', default=SPEC_PATH, help="Data model spec (datapoint catalog, cell addresses)")
+    append.add_argument('--concepts', default=CONCEPTS_PATH, help="Concept map with the XBRL block datapoints")
+    query = commands.add_parser('query', help="Aggregate values across the portfolio")
+    query.add_argument('store', help="Store directory")
+    query.add_argument('datapoints', nargs='+', help="Datapoint ids")
+    query.add_argument('--agg', choices=AGGREGATES, default='sum', help="Aggregate")
+    query.add_argument('--year', type=int, help="Only reporting periods ending in this year")
+    query.add_argument('--entity', nargs='+', help="Only these entities (e.g. lei:529900T8BM49AURSDO55)")
+    query.add_argument('--by', choices=GROUPS, help="Group the aggregate")
+    query.add_argument('--min', type=float, help="Only values >= this")
+    query.add_argument('--max', type=float, help="Only values <= this")
+    query.add_argument('--all-versions', action='store_true', help="Include superseded reports")
+    info = commands.add_parser('info', help="Show store contents")
+    info.add_argument('store', help="Store directory")
+    args = parser.parse_args(argv)
+
+    if args.command == 'append':
+        store = PortfolioStore(args.store, args.spec, args.concepts)
+        started = time.perf_counter()
+        result = store.append(iter_reports(args.inputs, ReportImporter(args.spec)))
+        elapsed = time.perf_counter() - started
+        for source, reason in result.skipped:
+            print(f"⚠️  {source}: {reason}", file=sys.stderr)
+        print(f"✓ {result.reports} reports, {result.rows} values appended in {elapsed:.1f} s -> {args.store}")
+        return 1 if result.skipped and not result.reports else 0
+
+    store = PortfolioStore(args.store)
+    if args.command == 'info':
+        manifest = store.manifest
+        rows = sum(segment['rows'] for segment in manifest['segments'])
+        print(f"{args.store}: {len(manifest['reports'])} reports ({int(store.current.sum())} current), "
+              f"{len(manifest['entities'])} entities, {rows} values in {len(manifest['segments'])} segments, "
+              f"{len(manifest['catalog'])} datapoints, {manifest['strings']} distinct texts")
+        return 0
+
+    started = time.perf_counter()
+    try:
+        result = store.query(args.datapoints, args.agg, args.year, args.entity, args.by, args.min, args.max,
+                             latest=not args.all_versions)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    for key, value in result.items():
+        print(f"{key}\t{value:.10g}")
+    print(f"{len(result)} group(s) in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
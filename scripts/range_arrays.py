@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Multi-cell Named Ranges of filled reports as NumPy arrays.
+
+The importer reads one cell per datapoint. The energy, emissions, workforce
+and waste tables of the disclosure sheets are blocks, though
+(``AmountOfEmissionToAir`` is G80:I119, ``WasteGeneratedTable`` D189:L203).
+`RangeArrayReader` resolves every destination of the requested ranges to its
+full rectangle and fills all of them in a single streaming pass per sheet:
+each cell is routed to its ranges through a `RangeIndex`, and the pass stops
+after the last row any range needs.
+
+Each range comes back as a 2-D array in sheet layout (rows x columns, merged
+and empty cells blank). Types come from the spec and the template, never
+from a report's contents, so they are the same for every report. Each column
+is typed by, in order: the dataType of a repeatingDataPatterns property on
+that column, a decimal/whole/date validation on its cells, or their number
+format ('0.00' -> number), unless the cell is a lookup formula showing
+values from elsewhere; a column inside a merged cell takes the type of the
+merge's first column. The range's dtype is the owning datapoint's
+dataType, else the one type all its columns share:
+
+  * float64, NaN for blanks, for number (text that is not a number reads as
+    NaN too);
+  * datetime64[D], NaT for blanks, for date;
+  * object (str / bool / float, None for blanks) for everything else.
+
+Formula cells caching an empty string count as blank. Mixed tables (a label
+column next to amounts) are object arrays; `RangeArrayReader.records` turns
+one into a structured array typed per column, with fields named after the
+sheet columns. Formula cells contribute their cached results,
+so computed totals are there too. A range with several destinations of the
+same width is stacked row-wise.
+`stack_reports` puts one range of many reports into a single
+(reports x rows x columns) array for portfolio analytics.
+
+    python scripts/range_arrays.py report.xlsx [more.xlsx ...] [--names AmountOfEmissionToAir ...]
+"""
+import argparse
+import re
+import sys
+import time
+import zipfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "numpy"])
+    import numpy as np
+
+from data_model import DataModel
+from import_filled_report import EXCEL_EPOCH, SPEC_PATH, UNREPORTED_PREFIXES
+from range_index import Destination, RangeIndex
+from normalize_template import TEMPLATE_PATH
+from xlsx_parts import (CellValue, column_index, column_letters, iter_cells, read_shared_strings, sheet_layout,
+                        sheet_parts, style_kinds)
+
+
+# Formulas that copy values from another range: their cell's number format
+# says nothing about what they show
+LOOKUP_RE = re.compile(r'\b(?:[VHX]?LOOKUP|INDEX)\(', re.I)
+
+
+def _raw(value: CellValue) -> object:
+    """Python value of a cell; shared strings stay as ('s', index) until the
+    strings are read"""
+    if value.type == 's':
+        return ('s', int(value.raw))
+    if value.type in ('str', 'inlineStr'):
+        return value.raw or None
+    if value.type == 'b':
+        return value.raw == '1'
+    if value.type == 'e':
+        return None
+    try:
+        return float(value.raw)
+    except ValueError:
+        return value.raw
+
+
+def _number(value: object) -> float:
+    if isinstance(value, float):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return np.nan
+
+
+def typed_array(values: 'np.ndarray', data_type: Optional[str] = None) -> 'np.ndarray':
+    """An object array of cell values as the array type of ``data_type``
+    (a spec dataType): float64 for 'number', datetime64[D] for 'date', object
+    otherwise. Empty strings are blanks."""
+    values = np.where(values == '', None, values)
+    if data_type not in ('number', 'date'):
+        return values
+    numbers = np.array([_number(v) for v in values.flat], dtype=np.float64).reshape(values.shape)
+    if data_type == 'date':
+        epoch = np.datetime64(EXCEL_EPOCH, 'D')
+        days = np.where(np.isnan(numbers), 0, numbers).astype(np.int64).astype('timedelta64[D]')
+        return np.where(np.isnan(numbers), np.datetime64('NaT', 'D'), epoch + days)
+    return numbers
+
+
+class RangeArrayReader:
+    """Reads Named Ranges of filled reports into 2-D arrays"""
+
+    def __init__(self, spec_path: str = SPEC_PATH, names: Optional[Iterable[str]] = None,
+                 template_path: str = TEMPLATE_PATH) -> None:
+        model = DataModel.load(spec_path)
+        if names is None:
+            # Every reportable block: single cells are the importer's job
+            candidates = {name: info.get('reference') or '' for name, info in model.named_ranges.items()
+                          if not name.startswith(UNREPORTED_PREFIXES)}
+            index = RangeIndex(candidates)
+            names = [name for name, destinations in index.destinations.items()
+                     if sum(d.area for d in destinations) > 1]
+        else:
+            names = list(names)
+            missing = [name for name in names if name not in model.named_ranges]
+            if missing:
+                raise ValueError(f"Unknown Named Range(s): {', '.join(missing)}")
+
+        self.index = RangeIndex({name: model.named_ranges[name].get('reference') or '' for name in names})
+        self.destinations: Dict[str, List[Destination]] = self.index.destinations
+        self.shapes: Dict[str, Tuple[int, int]] = {}
+        # name -> row offset of each destination in the stacked array
+        self._offsets: Dict[str, List[int]] = {}
+        for name, destinations in self.destinations.items():
+            widths = {d.last_col - d.first_col + 1 for d in destinations}
+            if len(widths) > 1:
+                raise ValueError(f"{name}: destinations of different widths cannot be stacked")
+            offsets, rows = [], 0
+            for d in destinations:
+                offsets.append(rows)
+                rows += d.last_row - d.first_row + 1
+            self._offsets[name] = offsets
+            self.shapes[name] = (rows, widths.pop())
+        # name -> dataType of each column, and of the whole array (None: object)
+        self.column_types = column_types(self.destinations, model.spec.get('repeatingDataPatterns', []),
+                                         template_path)
+        self.types: Dict[str, Optional[str]] = {}
+        for name in self.destinations:
+            owner = model.owner_of_named_range(name)
+            kinds = set(self.column_types[name])
+            if owner:
+                self.types[name] = owner.datapoint.get('dataType')
+            else:
+                self.types[name] = kinds.pop() if len(kinds) == 1 else None
+        self.last_rows: Dict[str, int] = {}
+        for destinations in self.destinations.values():
+            for d in destinations:
+                self.last_rows[d.sheet] = max(self.last_rows.get(d.sheet, 0), d.last_row)
+
+    def read(self, path: str) -> Dict[str, 'np.ndarray']:
+        """Every range of one report, keyed by Named Range"""
+        blocks = {name: np.full(shape, None, dtype=object) for name, shape in self.shapes.items()}
+        strings: List[Tuple['np.ndarray', Tuple[int, int], int]] = []
+        with zipfile.ZipFile(path) as zf:
+            parts = sheet_parts(zf)
+            for sheet, last_row in self.last_rows.items():
+                if sheet not in parts:
+                    continue
+                for cell, value in iter_cells(zf, parts[sheet]):
+                    if cell[0] > last_row:
+                        break
+                    names = self.index.names_at(sheet, cell)
+                    if not names:
+                        continue
+                    raw = _raw(value)
+                    for name in names:
+                        for d, offset in zip(self.destinations[name], self._offsets[name]):
+                            if (d.sheet == sheet and d.first_row <= cell[0] <= d.last_row
+                                    and d.first_col <= cell[1] <= d.last_col):
+                                position = (offset + cell[0] - d.first_row, cell[1] - d.first_col)
+                                if isinstance(raw, tuple):
+                                    strings.append((blocks[name], position, raw[1]))
+                                else:
+                                    blocks[name][position] = raw
+            shared = read_shared_strings(zf, {index for *_, index in strings})
+        for block, position, index in strings:
+            block[position] = shared.get(index)
+        return {name: typed_array(block, self.types[name]) for name, block in blocks.items()}
+
+    def records(self, name: str, block: 'np.ndarray') -> 'np.ndarray':
+        """Rows of a range as a structured array, one field per sheet column;
+        in an object range each column is typed by `column_types`"""
+        first_col = self.destinations[name][0].first_col
+        if block.dtype != object:
+            columns = [block[:, j] for j in range(block.shape[1])]
+        else:
+            columns = [typed_array(block[:, [j]], kind)[:, 0] for j, kind in enumerate(self.column_types[name])]
+        dtype = [(column_letters(first_col + j), column.dtype) for j, column in enumerate(columns)]
+        rows = np.empty(block.shape[0], dtype=dtype)
+        for (field, _), column in zip(dtype, columns):
+            rows[field] = column
+        return rows
+
+
+def column_types(destinations: Dict[str, List[Destination]], patterns: Iterable[Dict],
+                 template_path: str = TEMPLATE_PATH) -> Dict[str, List[Optional[str]]]:
+    """name -> dataType ('number', 'date', 'text' or None) of each column of
+    its ranges, from the spec's repeatingDataPatterns and the template"""
+    # (sheet, column) -> (first row, last row, dataType) of pattern properties
+    properties: Dict[Tuple[str, int], List[Tuple[int, int, str]]] = {}
+    for pattern in patterns:
+        first_row = pattern.get('excelStartRow') or 0
+        last_row = pattern.get('excelEndRow') or first_row + (pattern.get('maxRows') or 1) - 1
+        items = pattern.get('structure', {}).get('items', {}).get('properties', {})
+        for prop in items.values():
+            if prop.get('excelColumn') and prop.get('dataType'):
+                key = (pattern.get('excelSheet'), column_index(prop['excelColumn']))
+                properties.setdefault(key, []).append((first_row, last_row, prop['dataType']))
+
+    sheets = {d.sheet for ds in destinations.values() for d in ds}
+    with zipfile.ZipFile(template_path) as zf:
+        parts = sheet_parts(zf)
+        kinds = style_kinds(zf)
+        layouts = {sheet: sheet_layout(zf, parts[sheet]) for sheet in sheets if sheet in parts}
+
+    def cell_type(sheet: str, row: int, col: int) -> Optional[str]:
+        for first_row, last_row, data_type in properties.get((sheet, col), []):
+            if first_row <= row <= last_row:
+                return data_type
+        layout = layouts.get(sheet)
+        if layout is None:
+            return None
+        for r1, c1, r2, c2 in layout.merged:
+            if r1 <= row <= r2 and c1 <= col <= c2:
+                row, col = r1, c1
+                break
+        for kind, ranges in layout.validations:
+            if any(r1 <= row <= r2 and c1 <= col <= c2 for r1, c1, r2, c2 in ranges):
+                return kind
+        if LOOKUP_RE.search(layout.formulas.get((row, col), '')):
+            return None
+        style = layout.styles.get((row, col), 0)
+        return kinds[style] if style < len(kinds) else None
+
+    types: Dict[str, List[Optional[str]]] = {}
+    for name, ds in destinations.items():
+        columns: List[Optional[str]] = []
+        for j in range(ds[0].last_col - ds[0].first_col + 1):
+            # A column is typed only when every destination agrees on its first row
+            found = {cell_type(d.sheet, d.first_row, d.first_col + j) for d in ds}
+            columns.append(found.pop() if len(found) == 1 else None)
+        types[name] = [kind if kind in ('number', 'date') else None for kind in columns]
+    return types
+
+
+def stack_reports(reader: RangeArrayReader, paths: Sequence[str], name: str) -> 'np.ndarray':
+    """One range of many reports as a (reports x rows x columns) array"""
+    if name not in reader.shapes:
+        raise ValueError(f"{name} is not read by this reader")
+    arrays = [reader.read(path)[name] for path in paths]
+    if arrays and all(a.dtype == np.float64 for a in arrays):
+        return np.stack(arrays)
+    return np.stack([a.astype(object) for a in arrays]) if arrays else np.empty((0,) + reader.shapes[name])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read multi-cell Named Ranges of filled reports as arrays")
+    parser.add_argument('files', nargs='+', help="Filled .xlsx reports")
+    parser.add_argument('--names', nargs='+', help="Named Ranges to read (default: every multi-cell range)")
+    parser.add_argument('--spec', default=SPEC_PATH, help="Data model spec with the Named Ranges")
+    parser.add_argument('--template', default=TEMPLATE_PATH, help="Template, for the column types")
+    args = parser.parse_args(argv)
+
+    try:
+        reader = RangeArrayReader(args.spec, args.names, args.template)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    reports = [reader.read(path) for path in args.files]
+    elapsed = time.perf_counter() - started
+    print(f"Read {len(reader.shapes)} ranges from {len(reports)} report(s) in {elapsed * 1000:.1f} ms "
+          f"({elapsed * 1000 / len(reports):.1f} ms/report)")
+    for name in sorted(reader.shapes):
+        arrays = [report[name] for report in reports]
+        numeric = all(a.dtype == np.float64 for a in arrays)
+        filled = sum(int(np.count_nonzero(~np.isnan(a))) if a.dtype == np.float64
+                     else int(np.count_nonzero(a != None)) if a.dtype == object  # noqa: E711
+                     else int(np.count_nonzero(~np.isnat(a))) for a in arrays)
+        summary = f"  {name:55} {str(reader.shapes[name]):9} {arrays[0].dtype!s:14} {filled:5} filled"
+        if numeric and filled:
+            summary += f"  sum {np.nansum(np.stack(arrays)):.6g}"
+        print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Reverse lookup from cells to the defined names that cover them.
+
+Defined names go from a name to one or more rectangles
+(``'Sheet'!$D$80:$K$119,'Sheet'!$M$80``). Answering "which names cover D72"
+from that direction means scanning every name. `RangeIndex` turns every
+destination, single cells and blocks alike, into a per-sheet slab
+decomposition:
+
+  * the sheet is cut into row slabs at every first row and every row after a
+    last row, so within a slab the set of covering rectangles is constant;
+  * each row slab is cut the same way into column slabs, each holding the
+    names that cover it, smallest rectangle first.
+
+A lookup is then two binary searches (O(log n)); `names_on_row` returns the
+whole row slab. Building is O(n log n) plus the size of the slabs, which
+stays small for the template's ~800 names.
+
+    index = RangeIndex.load('VSME-Digital-Template-1.1.0.xlsx')
+    index.names_at('Environmental Disclosures', parse_cell('G80'))
+"""
+import re
+import zipfile
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from xlsx_parts import Cell, defined_names, parse_range, split_reference
+
+# Destinations are separated by commas outside quoted sheet names
+DESTINATION_RE = re.compile(r"((?:'(?:[^']|'')*'|[^,'])+)")
+
+
+class Destination(NamedTuple):
+    sheet: str
+    first_row: int
+    first_col: int
+    last_row: int
+    last_col: int
+
+    @property
+    def area(self) -> int:
+        return (self.last_row - self.first_row + 1) * (self.last_col - self.first_col + 1)
+
+
+def iter_destinations(reference: str) -> Iterator[Destination]:
+    """Every rectangle of a defined name's reference text; constants,
+    formulas and #REF! destinations are skipped"""
+    for part in DESTINATION_RE.findall(reference.lstrip('=')):
+        if '!' not in part or '#REF' in part:
+            continue
+        sheet, cell_ref = split_reference(part.strip())
+        try:
+            first_row, first_col, last_row, last_col = parse_range(cell_ref)
+        except ValueError:
+            continue
+        yield Destination(sheet, min(first_row, last_row), min(first_col, last_col),
+                          max(first_row, last_row), max(first_col, last_col))
+
+
+class _RowSlab(NamedTuple):
+    names: Tuple[str, ...]
+    col_bounds: List[int]
+    columns: List[Tuple[str, ...]]
+
+
+def _bounds(intervals: Iterable[Tuple[int, int]]) -> List[int]:
+    points = set()
+    for first, last in intervals:
+        points.add(first)
+        points.add(last + 1)
+    return sorted(points)
+
+
+class RangeIndex:
+    """Cell -> covering defined names, for every destination of every name"""
+
+    def __init__(self, references: Dict[str, str]) -> None:
+        self.destinations: Dict[str, List[Destination]] = {}
+        by_sheet: Dict[str, List[Tuple[Destination, str]]] = {}
+        for name, reference in references.items():
+            for destination in iter_destinations(reference or ''):
+                self.destinations.setdefault(name, []).append(destination)
+                by_sheet.setdefault(destination.sheet, []).append((destination, name))
+        self._row_bounds: Dict[str, List[int]] = {}
+        self._rows: Dict[str, List[_RowSlab]] = {}
+        for sheet, rectangles in by_sheet.items():
+            # Smallest first, so the innermost name leads every slab
+            rectangles.sort(key=lambda item: (item[0].area, item[1]))
+            bounds = _bounds((d.first_row, d.last_row) for d, _ in rectangles)
+            slabs = []
+            for start in bounds[:-1]:
+                active = [(d, name) for d, name in rectangles if d.first_row <= start <= d.last_row]
+                col_bounds = _bounds((d.first_col, d.last_col) for d, _ in active)
+                columns = [tuple(dict.fromkeys(name for d, name in active if d.first_col <= col <= d.last_col))
+                           for col in col_bounds[:-1]]
+                slabs.append(_RowSlab(tuple(dict.fromkeys(name for _, name in active)), col_bounds, columns))
+            self._row_bounds[sheet] = bounds
+            self._rows[sheet] = slabs
+
+    @classmethod
+    def from_spec(cls, named_ranges: Dict[str, Dict]) -> 'RangeIndex':
+        """Index over the spec's namedRanges (name -> {reference, ...})"""
+        return cls({name: info.get('reference') or '' for name, info in named_ranges.items()})
+
+    @classmethod
+    def from_workbook(cls, zf: zipfile.ZipFile) -> 'RangeIndex':
+        return cls(defined_names(zf))
+
+    @classmethod
+    def load(cls, path: str) -> 'RangeIndex':
+        with zipfile.ZipFile(path) as zf:
+            return cls.from_workbook(zf)
+
+    def _row_slab(self, sheet: str, row: int) -> Optional[_RowSlab]:
+        bounds = self._row_bounds.get(sheet)
+        if not bounds:
+            return None
+        i = bisect_right(bounds, row) - 1
+        return self._rows[sheet][i] if 0 <= i < len(self._rows[sheet]) else None
+
+    def names_at(self, sheet: str, cell: Cell) -> Tuple[str, ...]:
+        """Names covering ``cell`` (row, col), smallest rectangle first"""
+        slab = self._row_slab(sheet, cell[0])
+        if slab is None:
+            return ()
+        j = bisect_right(slab.col_bounds, cell[1]) - 1
+        return slab.columns[j] if 0 <= j < len(slab.columns) else ()
+
+    def name_at(self, sheet: str, cell: Cell) -> Optional[str]:
+        """Innermost name covering ``cell``"""
+        names = self.names_at(sheet, cell)
+        return names[0] if names else None
+
+    def names_on_row(self, sheet: str, row: int) -> Tuple[str, ...]:
+        """Names with a destination crossing ``row`` of ``sheet``, smallest first"""
+        slab = self._row_slab(sheet, row)
+        return slab.names if slab else ()
+
+    def __len__(self) -> int:
+        return len(self.destinations)
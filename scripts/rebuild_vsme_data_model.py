@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 """
 Rebuild vsme-data-model-spec.json by auto-extracting all Named Ranges from the
-Excel template and distributing them into modules based on sheet → module
-heuristics. This is a stopgap to get all ~797 datapoints represented until a
-curated model is available.
+Excel template and distributing them into modules by the section span
+(module_index.ModuleSpanIndex) containing each range's top-left cell. This is
+a stopgap to get all ~797 datapoints represented until a curated model is
+available.
 """
+import argparse
 import json
 import re
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 try:
     import openpyxl  # type: ignore
@@ -18,6 +20,10 @@ except ImportError:  # pragma: no cover - helper install for local runs
     subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
     import openpyxl  # type: ignore
 
+from data_model import DataModel
+from extract_complete_vsme_structure import extract_table_of_contents
+from module_index import ModuleSpanIndex
+
 
 ROOT = Path(__file__).resolve().parents[1]
 EXCEL_PATH = ROOT / "VSME-Digital-Template-1.1.0.xlsx"
@@ -68,9 +74,8 @@ def guess_data_type(name: str) -> str:
     return "text"
 
 
-def extract_named_ranges() -> Dict[str, Dict[str, str]]:
-    """Extract Named Ranges from Excel."""
-    wb = openpyxl.load_workbook(EXCEL_PATH, data_only=True)
+def named_ranges_from_workbook(wb) -> Dict[str, Dict[str, str]]:
+    """Collect Named Ranges of an open workbook."""
     named_ranges: Dict[str, Dict[str, str]] = {}
     for name_str, definition in wb.defined_names.items():
         destinations = list(definition.destinations)
@@ -83,27 +88,60 @@ def extract_named_ranges() -> Dict[str, Dict[str, str]]:
             "sheet": sheet_name,
             "cellRef": cell_ref,
         }
+    return named_ranges
+
+
+def extract_named_ranges(excel_path: Path = EXCEL_PATH) -> Dict[str, Dict[str, str]]:
+    """Extract Named Ranges from Excel."""
+    wb = openpyxl.load_workbook(excel_path, data_only=True)
+    named_ranges = named_ranges_from_workbook(wb)
     wb.close()
     return named_ranges
 
 
-def load_spec() -> Dict:
-    if not SPEC_PATH.exists():
-        raise SystemExit(f"Spec file not found: {SPEC_PATH}")
-    return json.loads(SPEC_PATH.read_text())
+def build_module_index(wb) -> ModuleSpanIndex:
+    """Row spans of every module/disclosure section, from the TOC and headers."""
+    return ModuleSpanIndex.from_workbook(wb, extract_table_of_contents(wb))
+
+
+def load_spec(spec_path: Path = SPEC_PATH) -> Dict:
+    if not spec_path.exists():
+        raise SystemExit(f"Spec file not found: {spec_path}")
+    return json.loads(spec_path.read_text())
 
 
-def ensure_module_map(spec: Dict) -> Dict[str, Dict]:
-    modules = {}
+def ensure_module_map(spec: Dict) -> DataModel:
+    """Indexed model of the spec; every module gets a disclosures list."""
     for group in ("basicModules", "comprehensiveModules"):
         for module in spec.get("coreReport", {}).get(group, []):
-            modules[module["moduleCode"]] = module
             module.setdefault("disclosures", [])
-    return modules
+    return DataModel(spec)
+
+
+def _disclosure_key(name) -> str:
+    if isinstance(name, dict):
+        name = name.get("en", "")
+    return re.sub(r"[^a-z0-9]+", "", str(name or "").lower())
 
 
-def get_or_create_disclosure(module: Dict) -> Dict:
-    """Use/ensure a single autogenerated disclosure container."""
+def get_or_create_disclosure(module: Dict, disclosure_name: Optional[str] = None) -> Dict:
+    """Disclosure of ``module`` named ``disclosure_name`` (created if the spec
+    lacks it); without a name, a single autogenerated disclosure container."""
+    if disclosure_name:
+        key = _disclosure_key(disclosure_name)
+        slug = re.sub(r"[^a-z0-9]+", "-", disclosure_name.lower()).strip("-")
+        disclosure_id = f"{module['moduleCode'].lower()}-{slug}"
+        for disclosure in module.get("disclosures", []):
+            if (_disclosure_key(disclosure.get("disclosureName")) == key
+                    or disclosure.get("disclosureId") == disclosure_id):
+                return disclosure
+        disclosure = {
+            "disclosureId": disclosure_id,
+            "disclosureName": {"en": disclosure_name, "de": disclosure_name},
+            "datapoints": [],
+        }
+        module["disclosures"].append(disclosure)
+        return disclosure
     if module.get("disclosures"):
         # Reuse first disclosure to avoid exploding the structure
         return module["disclosures"][0]
@@ -116,52 +154,63 @@ def get_or_create_disclosure(module: Dict) -> Dict:
     return disclosure
 
 
-def assign_module(sheet: str) -> str:
+def assign_module(info: Dict[str, str], module_index: Optional[ModuleSpanIndex] = None) -> Tuple[str, Optional[str]]:
+    """Module and disclosure owning a Named Range: the section span containing
+    its top-left cell, else the sheet's first module (e.g. the XBRL block above
+    B1) with no particular disclosure."""
+    if module_index is not None and info.get("reference"):
+        span = module_index.lookup_reference(info["reference"])
+        if span is not None:
+            return span.module_code, span.disclosure_name or None
+    sheet = info.get("sheet", "")
     for key, modules in SHEET_TO_MODULES.items():
         if sheet == key:
-            return modules[0]
+            return modules[0], None
     # Fallback bucket
-    return "UNMAPPED"
+    return "UNMAPPED", None
 
 
-def rebuild() -> Tuple[Dict, int]:
-    spec = load_spec()
-    named_ranges = extract_named_ranges()
+def rebuild(excel_path: Path = EXCEL_PATH, spec_path: Path = SPEC_PATH,
+            output_path: Optional[Path] = None) -> Tuple[Dict, int]:
+    """Add a datapoint for every Named Range the spec lacks; the result is
+    written to ``output_path`` (default: the spec itself)"""
+    spec = load_spec(spec_path)
+    wb = openpyxl.load_workbook(excel_path, data_only=True)
+    named_ranges = named_ranges_from_workbook(wb)
+    module_index = build_module_index(wb)
+    wb.close()
 
     # Preserve existing namedRanges block for reference
     spec["namedRanges"] = named_ranges
 
-    modules = ensure_module_map(spec)
+    model = ensure_module_map(spec)
     # Add fallback module if needed
-    if "UNMAPPED" not in modules:
-        modules["UNMAPPED"] = {
-            "moduleId": "unmapped",
-            "moduleCode": "UNMAPPED",
-            "moduleName": "Unmapped Named Ranges",
-            "moduleType": "aux",
-            "sheet": "N/A",
-            "disclosures": [],
-        }
-        spec.setdefault("coreReport", {}).setdefault("basicModules", []).append(
-            modules["UNMAPPED"]
+    if model.module("UNMAPPED") is None:
+        model.add_module(
+            {
+                "moduleId": "unmapped",
+                "moduleCode": "UNMAPPED",
+                "moduleName": "Unmapped Named Ranges",
+                "moduleType": "aux",
+                "sheet": "N/A",
+                "disclosures": [],
+            }
         )
 
-    existing_ids = set()
-    for module in modules.values():
-        for disclosure in module.get("disclosures", []):
-            for dp in disclosure.get("datapoints", []):
-                existing_ids.add(dp["datapointId"])
-
     added = 0
     for range_name, info in named_ranges.items():
         dp_id = camel_case(range_name)
-        if dp_id in existing_ids:
+        if model.datapoint(dp_id) is not None:
             continue
         data_type = guess_data_type(range_name)
-        target_module_code = assign_module(info.get("sheet", ""))
-        module = modules.get(target_module_code, modules["UNMAPPED"])
-        disclosure = get_or_create_disclosure(module)
-        disclosure.setdefault("datapoints", []).append(
+        target_module_code, disclosure_name = assign_module(info, module_index)
+        module = model.module(target_module_code)
+        if module is None:
+            module, disclosure_name = model.module("UNMAPPED"), None
+        disclosure = get_or_create_disclosure(module, disclosure_name)
+        model.add_datapoint(
+            module,
+            disclosure,
             {
                 "datapointId": dp_id,
                 "label": {
@@ -172,26 +221,28 @@ def rebuild() -> Tuple[Dict, int]:
                 "required": False,
                 "excelNamedRange": range_name,
                 "excelReference": info.get("reference"),
-            }
+            },
         )
-        existing_ids.add(dp_id)
         added += 1
 
     # Write updated spec
-    SPEC_PATH.write_text(json.dumps(spec, indent=2, ensure_ascii=False))
+    output_path = output_path or spec_path
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(spec, indent=2, ensure_ascii=False))
     return spec, added
 
 
 def main() -> int:
-    spec, added = rebuild()
-    total = sum(
-        len(d.get("datapoints", []))
-        for group in ("basicModules", "comprehensiveModules")
-        for m in spec.get("coreReport", {}).get(group, [])
-        for d in m.get("disclosures", [])
-    )
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--template", type=Path, default=EXCEL_PATH, help="Excel template to read")
+    parser.add_argument("--spec", type=Path, default=SPEC_PATH, help="Spec file to start from")
+    parser.add_argument("--output", type=Path, help="File to write (default: update --spec in place)")
+    args = parser.parse_args()
+
+    spec, added = rebuild(args.template, args.spec, args.output)
+    total = DataModel(spec).counts["datapoints"]
     print(f"Added {added} datapoints. Total datapoints now: {total}")
-    print(f"Spec updated at {SPEC_PATH}")
+    print(f"Spec written to {args.output or args.spec}")
     return 0
 
 
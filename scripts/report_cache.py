@@ -0,0 +1,227 @@
+"""
+Cache of generated reports, keyed by payload, template and spec.
+
+A report depends only on the template, on the spec's cell mapping and on the
+normalised payload, so the key is a hash of `payload_key` (order-independent,
+last value of an id wins) and the sha256 of the template and the spec:
+re-downloading the same report from the ConfirmationStep is a dictionary
+lookup, and a new template version or a rebuilt spec never serves stale
+output.
+
+Entries live in an LRU dictionary bounded by total bytes and evicted after
+``ttl`` seconds. With a directory, entries are also written to disk (and
+outlive the process); a memory miss that hits the disk tier is promoted back
+into memory with the file's own age, so it expires when the file does. The
+disk tier is bounded by ``max_disk_bytes``: when a write goes over it,
+expired files and then the oldest ones are deleted.
+
+`get` and `put` consult both tiers. An event loop should call the memory
+tier itself (`get_memory`, `put_memory`) and only hand the disk tier
+(`get_disk`, `put_disk`) to a thread, since that does file I/O; the
+bookkeeping is behind a lock so both can run at once. A lookup ends in
+exactly one of hits, diskHits or misses.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from report_filler import payload_key
+
+ENTRY_SUFFIX = '.xlsx'
+
+
+def report_key(datapoints: Iterable[Mapping], template_sha256: str, spec_sha256: str = '') -> str:
+    return hashlib.sha256(f'{template_sha256}:{spec_sha256}:{payload_key(datapoints)}'.encode()).hexdigest()
+
+
+class ReportCache:
+    """Byte-bounded LRU with TTL and an optional on-disk tier"""
+
+    def __init__(self, max_bytes: int = 256 << 20, ttl: float = 3600.0, directory: Optional[str] = None,
+                 clock: Callable[[], float] = time.time, max_disk_bytes: int = 1 << 30) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.directory = directory
+        self.clock = clock
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: 'OrderedDict[str, Tuple[bytes, float]]' = OrderedDict()
+        self.bytes = 0
+        self.disk_bytes = 0
+        self.counters = {'hits': 0, 'diskHits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0,
+                         'diskEvictions': 0}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            # Files of earlier runs count against the cap; expired ones go now
+            self._sweep_disk(0)
+
+    def get(self, key: str) -> Optional[bytes]:
+        content = self.get_memory(key)
+        if content is None and self.directory:
+            content = self.get_disk(key)
+        return content
+
+    def get_memory(self, key: str) -> Optional[bytes]:
+        """Memory tier only; no I/O"""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                content, stored = entry
+                if now - stored < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    return content
+                self._remove(key)
+                self.counters['expirations'] += 1
+            if not self.directory:
+                self.counters['misses'] += 1
+        return None
+
+    def get_disk(self, key: str) -> Optional[bytes]:
+        """Disk tier only (blocking); a hit is promoted into memory"""
+        found = self._read_disk(key, self.clock())
+        with self._lock:
+            if found is None:
+                self.counters['misses'] += 1
+                return None
+            content, stored = found
+            self.counters['diskHits'] += 1
+            self._store(key, content, stored)
+        return content
+
+    def put(self, key: str, content: bytes) -> None:
+        self.put_memory(key, content)
+        if self.directory:
+            self.put_disk(key, content)
+
+    def put_memory(self, key: str, content: bytes) -> None:
+        now = self.clock()
+        with self._lock:
+            self._store(key, content, now)
+
+    def put_disk(self, key: str, content: bytes) -> None:
+        """Blocking; a no-op without a directory"""
+        if self.directory:
+            self._write_disk(key, content)
+
+    def metrics(self) -> Dict:
+        lookups = self.counters['hits'] + self.counters['diskHits'] + self.counters['misses']
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'maxBytes': self.max_bytes,
+            'diskBytes': self.disk_bytes if self.directory else None,
+            **self.counters,
+            'hitRate': round((lookups - self.counters['misses']) / lookups, 4) if lookups else None,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: str, content: bytes, now: float) -> None:
+        # An older entry under the key goes even when the new one is too big
+        # to keep, so it cannot be served in its place
+        if key in self._entries:
+            self._remove(key)
+        if len(content) > self.max_bytes:
+            return
+        self._entries[key] = (content, now)
+        self.bytes += len(content)
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.counters['evictions'] += 1
+
+    def _remove(self, key: str) -> None:
+        content, _ = self._entries.pop(key)
+        self.bytes -= len(content)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[bytes, float]]:
+        """Content and write time of a disk entry that has not expired"""
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            stored = os.path.getmtime(path)
+            if now - stored >= self.ttl:
+                if self._remove_file(path):
+                    with self._lock:
+                        self.counters['expirations'] += 1
+                return None
+            with open(path, 'rb') as f:
+                return f.read(), stored
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, content: bytes) -> None:
+        path = self._path(key)
+        if len(content) > self.max_disk_bytes:
+            self._remove_file(path)
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        # Written under a temporary name and renamed, so readers never see a
+        # partial file
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temporary, path)
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+        with self._lock:
+            self.disk_bytes += len(content) - size
+            over = self.disk_bytes > self.max_disk_bytes
+        if over:
+            # Some headroom, so the next writes do not rescan the directory
+            self._sweep_disk(self.max_disk_bytes * 9 // 10)
+
+    def _remove_file(self, path: str) -> bool:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return False
+        with self._lock:
+            self.disk_bytes -= size
+        return True
+
+    def _sweep_disk(self, target: int) -> None:
+        """Delete expired entries, then the oldest until the directory holds
+        at most ``target`` bytes (a ``target`` of 0 only recounts and expires)"""
+        now = self.clock()
+        files: List[Tuple[float, int, str]] = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    info = entry.stat()
+                except OSError:
+                    continue
+                files.append((info.st_mtime, info.st_size, entry.path))
+        with self._lock:
+            self.disk_bytes = sum(size for _, size, _ in files)
+        files.sort()
+        for stored, _, path in files:
+            if now - stored >= self.ttl:
+                counter = 'expirations'
+            elif target and self.disk_bytes > target:
+                counter = 'diskEvictions'
+            else:
+                continue
+            if self._remove_file(path):
+                with self._lock:
+                    self.counters[counter] += 1
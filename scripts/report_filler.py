@@ -0,0 +1,438 @@
+"""
+Fill the VSME template with a datapoint payload without a spreadsheet library.
+
+The template is read once: the entries are kept as their compressed bytes,
+only the parts a payload can patch are inflated, the spec's cell addresses
+are resolved up front, and each worksheet holding mapped cells is compiled
+into static byte segments around those cells (`CompiledSheet`). Filling a report then only rewrites the parts that can
+change (those worksheets, sharedStrings.xml and workbook.xml) by joining the
+segments with the new cell elements, without scanning the XML again. `stream` yields
+the workbook as zip chunks (`zip_stream`): every other entry is copied with its
+original compressed bytes before the payload is even looked at, the patched
+parts follow. The result follows the backend `ExcelUpdateService` contract:
+
+  * unknown datapoint ids and empty values are ignored, the last value of a
+    repeated id wins;
+  * datapoints mapped to formula cells (labels, values the template derives
+    from other cells) are ignored too (`ReportFiller.derived`), so formulas,
+    shared-formula groups and calcChain.xml stay intact;
+  * values of `number` datapoints that parse as numbers are written as
+    numbers, everything else as text: appended to sharedStrings.xml, or with
+    ``inline_strings`` as inline strings in the cell itself, so the (large)
+    shared-string part is copied compressed like any other untouched entry;
+  * the cell keeps its template style, and the workbook is flagged for a full
+    recalculation when it is opened (cached formula results are stale).
+
+Rows of the spec's repeatingDataPatterns (sites, subsidiaries, ...) can be
+passed separately as ``{patternId: [{property: value}, ...]}``; they are
+written to consecutive rows from the pattern's start row, up to its capacity.
+"""
+import hashlib
+import io
+import json
+import math
+import re
+import zipfile
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from import_filled_report import SKIPPED_TYPES, SPEC_PATH, datapoint_reference, iter_datapoints
+from normalize_template import fill_template_path, set_full_calc_on_load
+from xlsx_parts import Cell, SI_START_RE, cell_name, column_index, parse_cell, parse_range, sheet_parts, split_reference
+from zip_stream import Entry, NewEntry, RawEntry, compress_entry, read_entries, stream_zip
+
+SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+WORKBOOK_PART = 'xl/workbook.xml'
+
+ROW_START_RE = re.compile(rb'<row\b[^>]*?\br="(\d+)"[^>]*?(/?)>')
+CELL_START_RE = re.compile(rb'<c\b[^>]*?\br="([A-Z]+)(\d+)"[^>]*?(/?)>')
+STYLE_RE = re.compile(rb'\bs="(\d+)"')
+SST_COUNT_RE = re.compile(rb'\b(count|uniqueCount)="(\d+)"')
+# XML 1.0 forbids most control characters even when escaped
+INVALID_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f￾￿]')
+
+
+class FillTarget(NamedTuple):
+    datapoint_id: str
+    data_type: str
+    part: str
+    cell: Cell
+
+
+class TableColumn(NamedTuple):
+    """One property of a repeating pattern: rows first_row..last_row of col"""
+    name: str
+    data_type: str
+    part: str
+    first_row: int
+    last_row: int
+    col: int
+
+
+def payload_values(datapoints: Iterable[Mapping]) -> Dict[str, str]:
+    """datapointId -> value, last occurrence wins (like the backend's map)"""
+    values: Dict[str, str] = {}
+    for datapoint in datapoints:
+        datapoint_id = datapoint.get('datapointId')
+        value = datapoint.get('values')
+        if isinstance(datapoint_id, str) and value is not None:
+            values[datapoint_id] = value if isinstance(value, str) else str(value)
+    return values
+
+
+def payload_key(datapoints: Iterable[Mapping]) -> str:
+    """Canonical hash of a payload: independent of datapoint order and of
+    values overwritten by a later occurrence of the same id"""
+    values = payload_values(datapoints)
+    canonical = json.dumps(sorted(values.items()), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def numeric_value(text: str) -> Optional[str]:
+    """Text as an xlsx number, or None when it is not a finite number"""
+    try:
+        number = float(text.strip())
+    except ValueError:
+        return None
+    if not math.isfinite(number):
+        return None
+    return str(int(number)) if number.is_integer() and abs(number) < 1e15 else repr(number)
+
+
+def xml_text(text: str) -> bytes:
+    text = INVALID_XML_RE.sub('', text)
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').encode('utf-8')
+
+
+class SharedStringTable:
+    """Appends new ``<si>`` items to a copy of the template's sharedStrings.xml"""
+
+    def __init__(self, data: bytes, unique_count: int) -> None:
+        self.data = data
+        self.unique_count = unique_count
+        self.items: List[bytes] = []
+        self.added = 0
+
+    def add(self, text: str) -> int:
+        self.items.append(b'<si><t xml:space="preserve">' + xml_text(text) + b'</t></si>')
+        self.added += 1
+        return self.unique_count + self.added - 1
+
+    def to_bytes(self) -> bytes:
+        if not self.items:
+            return self.data
+        data = self.data
+        end = data.rindex(b'</sst>')
+        header_end = data.index(b'>', data.index(b'<sst')) + 1
+
+        def bump(match: 're.Match') -> bytes:
+            return match.group(1) + b'="' + str(int(match.group(2)) + self.added).encode() + b'"'
+
+        header = SST_COUNT_RE.sub(bump, data[:header_end])
+        return header + data[header_end:end] + b''.join(self.items) + data[end:]
+
+
+class ReportFiller:
+    """Template held in memory, filled with one payload at a time.
+
+    Each instance parses the spec and compiles its own sheets, so a pool of
+    workers holds one compiled copy per process; only the compressed
+    template bytes can be shared (``template``)."""
+
+    def __init__(self, template_path: Optional[str] = None, spec_path: str = SPEC_PATH,
+                 template: Optional[memoryview] = None, inline_strings: bool = False) -> None:
+        """``template_path`` defaults to the normalized template when it has
+        been built. With ``template`` (the template's bytes, e.g. in shared
+        memory) the file is not read, and unchanged entries are streamed from
+        that buffer. With ``inline_strings`` text is written as
+        ``t="inlineStr"`` cells."""
+        self.inline_strings = inline_strings
+        if template is None:
+            with open(template_path or fill_template_path(), 'rb') as f:
+                template = memoryview(f.read())
+        self.template_sha256 = hashlib.sha256(template).hexdigest()
+        self.entries: List[RawEntry] = read_entries(template, copy=False)
+        archive = zipfile.ZipFile(io.BytesIO(template))
+        parts = sheet_parts(archive)
+
+        with open(spec_path, encoding='utf-8') as f:
+            spec = json.load(f)
+        named_ranges = spec.get('namedRanges', {})
+        self.targets: Dict[str, FillTarget] = {}
+        self.unresolved: List[str] = []
+        for datapoint in iter_datapoints(spec):
+            if datapoint.get('dataType') in SKIPPED_TYPES:
+                continue
+            reference = datapoint_reference(datapoint, named_ranges)
+            sheet, cell_ref = split_reference(reference or '')
+            try:
+                cell = parse_cell(cell_ref)
+            except ValueError:
+                self.unresolved.append(datapoint['datapointId'])
+                continue
+            if sheet not in parts:
+                self.unresolved.append(datapoint['datapointId'])
+                continue
+            self.targets[datapoint['datapointId']] = FillTarget(
+                datapoint['datapointId'], datapoint.get('dataType', 'text'), parts[sheet], cell)
+        self.tables = resolve_tables(spec.get('repeatingDataPatterns', []), named_ranges, parts)
+
+        writable: Dict[str, List[Cell]] = defaultdict(list)
+        for target in self.targets.values():
+            writable[target.part].append(target.cell)
+        for columns in self.tables.values():
+            for column in columns:
+                writable[column.part] += [(row, column.col) for row in range(column.first_row, column.last_row + 1)]
+
+        # Inflated parts: the mapped worksheets, workbook.xml and the shared
+        # strings; every other entry stays a compressed view (self.entries)
+        inflate = [*writable, WORKBOOK_PART]
+        if not inline_strings:
+            inflate.append(SHARED_STRINGS_PART)
+        names = set(archive.namelist())
+        with archive:
+            self.data: Dict[str, bytes] = {name: archive.read(name) for name in inflate if name in names}
+        self.shared_string_count = len(SI_START_RE.findall(self.data.get(SHARED_STRINGS_PART, b'')))
+        self.workbook = set_full_calc_on_load(self.data[WORKBOOK_PART])
+        self.sheets: Dict[str, CompiledSheet] = {part: CompiledSheet(self.data[part], cells)
+                                                 for part, cells in writable.items()}
+        # Datapoints on formula cells (labels, derived values) are not
+        # written: the formula, a shared-formula group it anchors and the
+        # calcChain.xml entry pointing at it would all be left dangling
+        self.derived: List[str] = [target.datapoint_id for target in self.targets.values()
+                                   if target.cell in self.sheets[target.part].formulas]
+        for datapoint_id in self.derived:
+            del self.targets[datapoint_id]
+
+        # Parts a payload can touch; all others are streamed untouched
+        self.patchable = {target.part for target in self.targets.values()}
+        self.patchable.update(column.part for columns in self.tables.values() for column in columns)
+        if not inline_strings:
+            self.patchable.add(SHARED_STRINGS_PART)
+        if self.workbook != self.data[WORKBOOK_PART]:
+            self.patchable.add(WORKBOOK_PART)
+
+    def cell_updates(self, datapoints: Iterable[Mapping], strings: SharedStringTable,
+                     tables: Optional[Mapping[str, List[Mapping]]] = None) -> Dict[str, Dict[Cell, Tuple[bytes, bytes]]]:
+        """part -> cell -> (type attribute, cell content) for the payload"""
+        updates: Dict[str, Dict[Cell, Tuple[bytes, bytes]]] = defaultdict(dict)
+
+        def put(part: str, cell: Cell, text: str, data_type: str) -> None:
+            if cell in self.sheets[part].formulas:
+                return
+            number = numeric_value(text) if data_type == 'number' else None
+            if number is not None:
+                updates[part][cell] = (b'', b'<v>' + number.encode() + b'</v>')
+            elif self.inline_strings:
+                inline = b'<is><t xml:space="preserve">' + xml_text(text) + b'</t></is>'
+                updates[part][cell] = (b' t="inlineStr"', inline)
+            else:
+                updates[part][cell] = (b' t="s"', b'<v>%d</v>' % strings.add(text))
+
+        for datapoint_id, text in payload_values(datapoints).items():
+            target = self.targets.get(datapoint_id)
+            if target is not None and text.strip():
+                put(target.part, target.cell, text, target.data_type)
+        for pattern_id, rows in (tables or {}).items():
+            for column in self.tables.get(pattern_id, []):
+                for row, item in zip(range(column.first_row, column.last_row + 1), rows):
+                    value = item.get(column.name)
+                    if value is not None and str(value).strip():
+                        put(column.part, (row, column.col), str(value), column.data_type)
+        return updates
+
+    def stream(self, datapoints: Iterable[Mapping],
+               tables: Optional[Mapping[str, List[Mapping]]] = None) -> Iterator[bytes]:
+        """The filled workbook as a stream of zip chunks: template entries the
+        payload cannot change first, then the patched parts"""
+        yield from stream_zip(self._entries(datapoints, tables))
+
+    def fill(self, datapoints: Iterable[Mapping], tables: Optional[Mapping[str, List[Mapping]]] = None) -> bytes:
+        """The filled workbook as xlsx bytes"""
+        return b''.join(self.stream(datapoints, tables))
+
+    def patched_parts(self, datapoints: Iterable[Mapping],
+                      tables: Optional[Mapping[str, List[Mapping]]] = None) -> Dict[str, bytes]:
+        """Content of the patchable parts the payload changes; the others
+        are copied from the template"""
+        strings = SharedStringTable(self.data.get(SHARED_STRINGS_PART, b''), self.shared_string_count)
+        patched = {part: self.sheets[part].render(cells)
+                   for part, cells in self.cell_updates(datapoints, strings, tables).items()}
+        patched[WORKBOOK_PART] = self.workbook
+        if strings.added:
+            patched[SHARED_STRINGS_PART] = strings.to_bytes()
+        return patched
+
+    def compressed_parts(self, datapoints: Iterable[Mapping],
+                         tables: Optional[Mapping[str, List[Mapping]]] = None) -> Dict[str, RawEntry]:
+        """`patched_parts` compressed into entries, for a process that streams
+        the template's other entries itself (`report_service`)"""
+        infos = {entry.info.filename: entry.info for entry in self.entries}
+        return {name: compress_entry(infos[name], data)
+                for name, data in self.patched_parts(datapoints, tables).items() if name in self.patchable}
+
+    def _entries(self, datapoints: Iterable[Mapping],
+                 tables: Optional[Mapping[str, List[Mapping]]]) -> Iterator[Entry]:
+        for entry in self.entries:
+            if entry.info.filename not in self.patchable:
+                yield entry
+
+        patched = self.patched_parts(datapoints, tables)
+        for entry in self.entries:
+            name = entry.info.filename
+            if name in self.patchable:
+                yield NewEntry(entry.info, patched[name]) if name in patched else entry
+
+
+def resolve_tables(patterns: Iterable[Mapping], named_ranges: Mapping[str, Mapping],
+                   parts: Mapping[str, str]) -> Dict[str, List[TableColumn]]:
+    """patternId -> its writable columns. A property's column is its
+    excelColumn, else the column of a single-column Named Range; properties
+    without one, or sharing a column with an earlier property, are skipped."""
+    tables: Dict[str, List[TableColumn]] = {}
+    for pattern in patterns:
+        sheet = pattern.get('excelSheet')
+        first_row = pattern.get('excelStartRow')
+        if sheet not in parts or not first_row:
+            continue
+        last_row = pattern.get('excelEndRow') or first_row + pattern.get('maxRows', 1) - 1
+        if pattern.get('maxRows'):
+            last_row = min(last_row, first_row + pattern['maxRows'] - 1)
+        columns: List[TableColumn] = []
+        used = set()
+        properties = pattern.get('structure', {}).get('items', {}).get('properties', {})
+        for name, prop in properties.items():
+            col = column_index(prop['excelColumn']) if prop.get('excelColumn') else None
+            named_range = named_ranges.get(prop.get('excelNamedRange') or '')
+            if col is None and named_range:
+                _, first_col, _, last_col = parse_range(split_reference(named_range['reference'])[1])
+                col = first_col if first_col == last_col else None
+            if col is None or col in used:
+                continue
+            used.add(col)
+            columns.append(TableColumn(name, prop.get('dataType', 'text'), parts[sheet], first_row, last_row, col))
+        if columns:
+            tables[pattern['patternId']] = columns
+    return tables
+
+
+def _cell_xml(row: int, col: int, style: bytes, cell_type: bytes, content: bytes) -> bytes:
+    return b'<c r="%s"%s%s>%s</c>' % (cell_name(row, col).encode(), style, cell_type, content)
+
+
+def _element_end(data: bytes, start_tag_end: int, self_closing: bool, tag: bytes) -> int:
+    if self_closing:
+        return start_tag_end
+    return data.index(b'</' + tag + b'>', start_tag_end) + len(tag) + 3
+
+
+class CompiledSheet:
+    """A worksheet part cut once around the cells a payload can write.
+
+    ``pieces`` alternates static byte segments of the template with one slot
+    per writable cell, holding the template's own ``<c>`` element (or nothing
+    where the cell is missing). Rows the template lacks, and ``<row .../>``
+    elements without cells, are a single slot that stays unchanged unless one
+    of its cells is written. Filling copies the list, overwrites the slots of
+    the written cells and joins it: no XML is scanned per report.
+
+    Cells whose template element holds a formula are collected in
+    ``formulas``; callers must not write them.
+    """
+
+    def __init__(self, data: bytes, cells: Iterable[Cell]) -> None:
+        by_row: Dict[int, List[int]] = defaultdict(list)
+        for row, col in set(cells):
+            by_row[row].append(col)
+        # Static segments at even indexes, slots at odd ones
+        self.pieces: List[bytes] = [b'']
+        # cell -> (slot, style attribute); the style is None for row slots
+        self.slots: Dict[Cell, Tuple[int, Optional[bytes]]] = {}
+        # row slot -> opening tag of the row
+        self.row_tags: Dict[int, bytes] = {}
+        self.formulas: Set[Cell] = set()
+
+        pos = 0
+        rows = iter(ROW_START_RE.finditer(data))
+        current = next(rows, None)
+        for row in sorted(by_row):
+            while current is not None and int(current.group(1)) < row:
+                current = next(rows, None)
+            cols = sorted(by_row[row])
+            if current is None or int(current.group(1)) > row:
+                insert_at = current.start() if current is not None else data.index(b'</sheetData>')
+                self._row_slot(data[pos:insert_at], row, cols, b'<row r="%d">' % row, b'')
+                pos = insert_at
+                continue
+
+            if current.group(2):
+                # <row .../> has no cells yet
+                self._row_slot(data[pos:current.start()], row, cols,
+                               data[current.start():current.end() - 2] + b'>', current.group(0))
+                pos = current.end()
+                current = next(rows, None)
+                continue
+
+            row_end = data.index(b'</row>', current.end())
+            existing = {column_index(match.group(1).decode()): match
+                        for match in CELL_START_RE.finditer(data, current.end(), row_end)}
+            cursor = current.end()
+            self.pieces[-1] += data[pos:cursor]
+            for col in cols:
+                match = existing.get(col)
+                if match is None:
+                    following = [m for c, m in existing.items() if c > col and m.start() >= cursor]
+                    insert_at = min((m.start() for m in following), default=row_end)
+                    self.pieces[-1] += data[cursor:insert_at]
+                    self._cell_slot(row, col, b'', b'')
+                    cursor = insert_at
+                    continue
+                style = STYLE_RE.search(match.group(0))
+                end = _element_end(data, match.end(), bool(match.group(3)), b'c')
+                if b'<f' in data[match.end():end]:
+                    self.formulas.add((row, col))
+                self.pieces[-1] += data[cursor:match.start()]
+                self._cell_slot(row, col, b' s="%s"' % style.group(1) if style else b'', data[match.start():end])
+                cursor = end
+            pos = cursor
+            current = next(rows, None)
+        self.pieces[-1] += data[pos:]
+
+    def _cell_slot(self, row: int, col: int, style: bytes, original: bytes) -> None:
+        self.slots[(row, col)] = (len(self.pieces), style)
+        self.pieces += [original, b'']
+
+    def _row_slot(self, segment: bytes, row: int, cols: List[int], tag: bytes, original: bytes) -> None:
+        self.pieces[-1] += segment
+        slot = len(self.pieces)
+        self.row_tags[slot] = tag
+        for col in cols:
+            self.slots[(row, col)] = (slot, None)
+        self.pieces += [original, b'']
+
+    def render(self, cells: Mapping[Cell, Tuple[bytes, bytes]]) -> bytes:
+        """The part with ``cells`` (cell -> (type attribute, ``<v>`` or ``<is>``
+        element)) written; every cell must be one the sheet was compiled for"""
+        pieces = self.pieces.copy()
+        new_rows: Dict[int, List[Tuple[int, int, bytes, bytes]]] = defaultdict(list)
+        for (row, col), (cell_type, value) in cells.items():
+            slot, style = self.slots[(row, col)]
+            if style is None:
+                new_rows[slot].append((col, row, cell_type, value))
+            else:
+                pieces[slot] = _cell_xml(row, col, style, cell_type, value)
+        for slot, items in new_rows.items():
+            pieces[slot] = (self.row_tags[slot]
+                            + b''.join(_cell_xml(row, col, b'', t, v) for col, row, t, v in sorted(items))
+                            + b'</row>')
+        return b''.join(pieces)
+
+
+def patch_sheet(data: bytes, cells: Mapping[Cell, Tuple[bytes, bytes]]) -> bytes:
+    """Worksheet XML with the given cells replaced or inserted.
+
+    A cell keeps its ``s`` (style) attribute, and missing rows and cells are
+    inserted in sheet order. Compiling is the expensive step: callers filling
+    the same part repeatedly keep the `CompiledSheet`.
+    """
+    return CompiledSheet(data, cells).render(cells)
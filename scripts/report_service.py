@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Report-generation HTTP service with the same contract as the backend's
+`ExcelUpdateController`:
+
+    POST /excel-update   [{"datapointId": ..., "values": "..."}]  ->  VSME_Report.xlsx
+
+The event loop only parses requests and writes responses. Fills run in a
+process pool whose workers each load the template once (`report_filler`) and
+are started before the port is opened, so the first request does not pay for
+the template either.
+
+A filled report is streamed with chunked transfer encoding: the template
+entries a payload cannot change are sent from the event loop while a worker
+patches and deflates the others (`ReportFiller.compressed_parts`), which are
+then copied into the same zip stream (`zip_stream.ZipWriter`). Cached and
+coalesced reports are sent whole, with a Content-Length. A fill that fails
+after the headers went out can only be reported by closing the connection
+before the final chunk. Around the pool:
+
+  * caching      - finished reports are kept in a `ReportCache` (memory,
+                   optionally --cache-dir on disk), so repeat downloads skip
+                   the pool entirely; the disk tier is read and written on
+                   threads, never on the event loop
+  * coalescing   - identical payloads that arrive while one is being filled
+                   share its result (payloads are compared by `payload_key`)
+  * backpressure - at most --max-pending fills are queued or running; further
+                   requests get 503 with Retry-After instead of piling up
+  * limits       - request bodies over --max-body bytes get 413, idle
+                   connections are closed after --timeout seconds
+
+GET /health and GET /metrics report the pool and counters. Only the standard
+library is needed; the frontend can point VITE_API_BASE_URL at it.
+
+    python scripts/report_service.py [--port 8080] [--workers 4] [--max-pending 32]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+
+from import_filled_report import SPEC_PATH
+from report_cache import ReportCache, report_key
+from normalize_template import fill_template_path
+from report_filler import ReportFiller
+from zip_stream import RawEntry, ZipWriter, read_entries
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+REPORT_FILENAME = 'VSME_Report.xlsx'
+# Same origins as the backend's @CrossOrigin
+ALLOWED_ORIGINS = ('http://localhost:5173', 'http://localhost:5174', 'http://localhost:5175')
+MAX_HEADER_LINES = 100
+# Seconds to wait for every pool worker to load the template at start-up
+WARM_UP_TIMEOUT = 120
+
+REASONS = {
+    200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    408: 'Request Timeout', 413: 'Payload Too Large', 500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+# Per worker process, set by _init_worker
+_filler: Optional[ReportFiller] = None
+_started: Optional[multiprocessing.synchronize.Barrier] = None
+
+
+def _init_worker(template_path: str, spec_path: str, inline_strings: bool = False,
+                 started: Optional[multiprocessing.synchronize.Barrier] = None) -> None:
+    global _filler, _started
+    _filler = ReportFiller(template_path, spec_path, inline_strings=inline_strings)
+    _started = started
+
+
+def _warm_up() -> List[str]:
+    """The parts a payload can change"""
+    # Each call holds its worker until all workers are in the barrier, so
+    # every call runs on a process of its own and the whole pool is started
+    if _started is not None:
+        _started.wait(WARM_UP_TIMEOUT)
+    return sorted(_filler.patchable)
+
+
+def _fill(datapoints: List[Dict]) -> Tuple[Dict[str, RawEntry], float]:
+    started = time.perf_counter()
+    return _filler.compressed_parts(datapoints), time.perf_counter() - started
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def parse_payload(body: bytes) -> List[Dict]:
+    """The datapoint list, validated like the backend's `Datapoint` record"""
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise HttpError(400, f"Invalid JSON: {e}")
+    if not isinstance(payload, list):
+        raise HttpError(400, "Expected a JSON array of datapoints")
+    for i, datapoint in enumerate(payload):
+        if not isinstance(datapoint, dict) or not isinstance(datapoint.get('datapointId'), str):
+            raise HttpError(400, f"Datapoint {i} needs a string 'datapointId'")
+        value = datapoint.get('values')
+        if value is not None and not isinstance(value, (str, int, float, bool)):
+            raise HttpError(400, f"Datapoint '{datapoint['datapointId']}' has a non-scalar 'values'")
+    return payload
+
+
+class ReportService:
+    """Process pool with coalescing and bounded admission"""
+
+    def __init__(self, workers: int, max_pending: int, template_path: Optional[str] = None,
+                 spec_path: str = SPEC_PATH, cache: Optional[ReportCache] = None,
+                 inline_strings: bool = False) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.template_path = template_path = template_path or fill_template_path()
+        self.spec_path = spec_path
+        self.cache = cache
+        self.inline_strings = inline_strings
+        with open(template_path, 'rb') as f:
+            template = f.read()
+        # Entries the service streams itself; the workers send the patched ones
+        self.entries: List[RawEntry] = read_entries(template, copy=False)
+        self.patchable: List[str] = []
+        digest = hashlib.sha256(template)
+        if inline_strings:
+            # Same payload, different workbook bytes: keep cached reports apart
+            digest.update(b':inlineStr')
+        self.template_sha256 = digest.hexdigest()
+        with open(spec_path, 'rb') as f:
+            # A rebuilt spec moves cells: reports cached under the old one are stale
+            self.spec_sha256 = hashlib.sha256(f.read()).hexdigest()
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.producers: Set[asyncio.Task] = set()
+        self.pending = 0
+        self.counters = {'requests': 0, 'fills': 0, 'coalesced': 0, 'rejected': 0, 'errors': 0}
+        self.fill_seconds = 0.0
+
+    async def start(self) -> None:
+        context = multiprocessing.get_context('spawn')
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.template_path, self.spec_path, self.inline_strings, context.Barrier(self.workers)),
+        )
+        loop = asyncio.get_running_loop()
+        patchable = await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_up) for _ in range(self.workers)))
+        self.patchable = patchable[0]
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+    async def generate(self, datapoints: List[Dict]) -> bytes:
+        """The filled report as one block"""
+        content = await self.generate_stream(datapoints)
+        if isinstance(content, bytes):
+            return content
+        return b''.join([chunk async for chunk in content])
+
+    async def generate_stream(self, datapoints: List[Dict]) -> Union[bytes, AsyncIterator[bytes]]:
+        """A cached or coalesced report as bytes; otherwise a fill is started
+        and its chunks are returned as they become available"""
+        key = report_key(datapoints, self.template_sha256, self.spec_sha256)
+        if self.cache is not None:
+            cached = self.cache.get_memory(key)
+            if cached is None and self.cache.directory:
+                cached = await asyncio.to_thread(self.cache.get_disk, key)
+            if cached is not None:
+                return cached
+        shared = self.in_flight.get(key)
+        if shared is not None:
+            self.counters['coalesced'] += 1
+            return await asyncio.shield(shared)
+        if self.pending >= self.max_pending:
+            self.counters['rejected'] += 1
+            raise HttpError(503, "Report service is busy, retry shortly", {'Retry-After': '1'})
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.in_flight[key] = future
+        self.pending += 1
+        queue: asyncio.Queue = asyncio.Queue()
+        # The fill finishes (and is cached, and serves coalesced requests)
+        # even if this client goes away
+        fill = loop.run_in_executor(self.pool, _fill, datapoints)
+        task = loop.create_task(self._produce(key, future, fill, queue))
+        # The loop only keeps weak references to tasks
+        self.producers.add(task)
+        task.add_done_callback(self.producers.discard)
+        return self._consume(queue)
+
+    async def _produce(self, key: str, future: asyncio.Future, fill: asyncio.Future,
+                       queue: asyncio.Queue) -> None:
+        """Queue the report's chunks, then None; an exception instead of None
+        when the fill fails"""
+        chunks: List[bytes] = []
+
+        def send(entry: RawEntry) -> None:
+            for chunk in writer.add(entry):
+                chunks.append(chunk)
+                queue.put_nowait(chunk)
+
+        writer = ZipWriter()
+        try:
+            patchable = set(self.patchable)
+            for entry in self.entries:
+                if entry.info.filename not in patchable:
+                    send(entry)
+            parts, seconds = await fill
+            for entry in self.entries:
+                if entry.info.filename in patchable:
+                    send(parts.get(entry.info.filename, entry))
+            for chunk in writer.finish():
+                chunks.append(chunk)
+                queue.put_nowait(chunk)
+            content = b''.join(chunks)
+            self.counters['fills'] += 1
+            self.fill_seconds += seconds
+            if self.cache is not None:
+                self.cache.put_memory(key, content)
+            future.set_result(content)
+        except Exception as e:
+            self.counters['errors'] += 1
+            future.set_exception(e)
+            # Retrieved here so waiters-less failures are not reported as unhandled
+            future.exception()
+            queue.put_nowait(e)
+            return
+        finally:
+            self.pending -= 1
+            del self.in_flight[key]
+        queue.put_nowait(None)
+        if self.cache is not None and self.cache.directory:
+            await asyncio.to_thread(self.cache.put_disk, key, content)
+
+    @staticmethod
+    async def _consume(queue: asyncio.Queue) -> AsyncIterator[bytes]:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def metrics(self) -> Dict:
+        fills = self.counters['fills']
+        return {
+            'workers': self.workers,
+            'pending': self.pending,
+            'maxPending': self.max_pending,
+            **self.counters,
+            'meanFillMs': round(self.fill_seconds / fills * 1000, 2) if fills else None,
+            'cache': self.cache.metrics() if self.cache is not None else None,
+        }
+
+    async def handle_request(self, method: str, path: str,
+                             body: bytes) -> Tuple[int, Dict[str, str], Union[bytes, AsyncIterator[bytes]]]:
+        path = path.split('?', 1)[0]
+        if path == '/excel-update':
+            if method != 'POST':
+                raise HttpError(405, "Use POST")
+            self.counters['requests'] += 1
+            content = await self.generate_stream(parse_payload(body))
+            return 200, {
+                'Content-Type': XLSX_MEDIA_TYPE,
+                'Content-Disposition': f'attachment; filename={REPORT_FILENAME}',
+            }, content
+        if path in ('/health', '/metrics') and method == 'GET':
+            data = {'status': 'UP'} if path == '/health' else self.metrics()
+            return 200, {'Content-Type': 'application/json'}, json.dumps(data).encode()
+        raise HttpError(404, f"No route for {method} {path}")
+
+
+async def read_request(reader: asyncio.StreamReader, max_body: int) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """(method, path, headers, body), or None when the client closed the connection"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+    headers: Dict[str, str] = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HttpError(400, "Too many headers")
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise HttpError(400, "Chunked request bodies are not supported")
+    try:
+        length = int(headers.get('content-length', '0'))
+    except ValueError:
+        raise HttpError(400, "Invalid Content-Length")
+    if length > max_body:
+        raise HttpError(413, f"Request body exceeds {max_body} bytes")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path, headers, body
+
+
+def format_head(status: int, headers: Dict[str, str], keep_alive: bool) -> bytes:
+    lines = [f'HTTP/1.1 {status} {REASONS.get(status, "")}']
+    headers = {**headers, 'Connection': 'keep-alive' if keep_alive else 'close'}
+    lines += [f'{name}: {value}' for name, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def format_response(status: int, headers: Dict[str, str], body: bytes, keep_alive: bool) -> bytes:
+    return format_head(status, {**headers, 'Content-Length': str(len(body))}, keep_alive) + body
+
+
+async def write_chunked(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str],
+                        chunks: AsyncIterator[bytes], keep_alive: bool) -> bool:
+    """Send ``chunks`` as a chunked body; False when they failed after the
+    headers were sent (the body is left unterminated, so the client sees an
+    incomplete response)"""
+    writer.write(format_head(status, {**headers, 'Transfer-Encoding': 'chunked'}, keep_alive))
+    try:
+        async for chunk in chunks:
+            if chunk:
+                writer.write(b'%x\r\n' % len(chunk))
+                writer.write(chunk)
+                writer.write(b'\r\n')
+                await writer.drain()
+    except ConnectionError:
+        raise
+    except Exception:
+        return False
+    writer.write(b'0\r\n\r\n')
+    await writer.drain()
+    return True
+
+
+def cors_headers(origin: Optional[str]) -> Dict[str, str]:
+    if origin not in ALLOWED_ORIGINS:
+        return {}
+    return {
+        'Access-Control-Allow-Origin': origin,
+        'Access-Control-Allow-Methods': 'POST, GET, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type, Accept',
+        'Access-Control-Expose-Headers': 'Content-Disposition',
+        'Vary': 'Origin',
+    }
+
+
+def make_handler(service: ReportService, max_body: int, timeout: float):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                keep_alive = True
+                origin = None
+                try:
+                    request = await asyncio.wait_for(read_request(reader, max_body), timeout)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    origin = headers.get('origin')
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    if method == 'OPTIONS':
+                        status, response_headers, content = 204, {}, b''
+                    else:
+                        status, response_headers, content = await service.handle_request(method, path, body)
+                except asyncio.TimeoutError:
+                    status, response_headers, keep_alive = 408, {}, False
+                    content = json.dumps({'message': "Request not received in time"}).encode()
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as e:
+                    status, response_headers = e.status, {**e.headers, 'Content-Type': 'application/json'}
+                    content = json.dumps({'message': str(e)}).encode()
+                    # The body of a rejected request may not have been read
+                    keep_alive = keep_alive and e.status not in (400, 413)
+                except Exception as e:
+                    status, response_headers = 500, {'Content-Type': 'application/json'}
+                    content = json.dumps({'message': f"Report generation failed: {e}"}).encode()
+                response_headers = {**response_headers, **cors_headers(origin)}
+                if isinstance(content, bytes):
+                    writer.write(format_response(status, response_headers, content, keep_alive))
+                    await writer.drain()
+                elif not await write_chunked(writer, status, response_headers, content, keep_alive):
+                    break
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    return handle
+
+
+async def serve(args: argparse.Namespace) -> None:
+    cache = None
+    if args.cache_mb > 0:
+        cache = ReportCache(args.cache_mb << 20, args.cache_ttl, args.cache_dir,
+                            max_disk_bytes=args.cache_dir_mb << 20)
+    service = ReportService(args.workers, args.max_pending, args.template, args.spec, cache, args.inline_strings)
+    started = time.perf_counter()
+    await service.start()
+    print(f"✓ {args.workers} workers ready in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    server = await asyncio.start_server(make_handler(service, args.max_body, args.timeout),
+                                        args.host, args.port, backlog=args.backlog)
+    print(f"Listening on http://{args.host}:{args.port}/excel-update", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve report generation over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=8080, help="Port (the frontend defaults to 8080)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Fill processes")
+    parser.add_argument('--max-pending', type=int, default=32, help="Fills queued or running before 503")
+    parser.add_argument('--max-body', type=int, default=1 << 20, help="Largest accepted request body in bytes")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Seconds to wait for a request")
+    parser.add_argument('--backlog', type=int, default=128, help="Listen backlog for pending connections")
+    parser.add_argument('--cache-mb', type=int, default=256, help="Memory for cached reports (0 disables the cache)")
+    parser.add_argument('--cache-ttl', type=float, default=3600.0, help="Seconds a cached report stays valid")
+    parser.add_argument('--cache-dir', help="Also keep cached reports in this directory")
+    parser.add_argument('--cache-dir-mb', type=int, default=1024, help="Disk space for --cache-dir")
+    parser.add_argument('--template', default=fill_template_path(),
+                        help="Excel template to fill (the normalized one once built)")
+    parser.add_argument('--spec', default=SPEC_PATH, help="Data model spec with the cell addresses")
+    parser.add_argument('--inline-strings', action='store_true',
+                        help="Write text as inline strings; sharedStrings.xml is copied untouched")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Slim variant of the report template, with only what the disclosures reach.
+
+Reachability starts from the sheets holding datapoints of the spec (plus the
+sheets given with --keep) and follows every reference a kept sheet makes:
+cell formulas, data validations, conditional formats, internal hyperlinks and
+the defined names they use (recursively). Whatever is not reached is removed:
+
+  * unreachable sheets, with their defined names, drawings, images and
+    printer settings (any part no longer linked from the package);
+  * duplicate and unused cell formats, fonts, fills, borders and
+    differential formats in styles.xml (cells, rows and columns are
+    renumbered to the surviving formats);
+  * shared strings used only by removed sheets;
+  * the sheet and named-range listing of docProps/app.xml, which Excel
+    rewrites on save anyway.
+
+Every kept cell has the same value, formula and resolved format as before.
+With --compare the part sizes, download size and fill time of both templates
+are printed side by side.
+
+    python scripts/slim_template.py [--template ...] [--output ...] [--keep SHEET ...] [--compare]
+"""
+import argparse
+import html
+import json
+import os
+import posixpath
+import re
+import statistics
+import sys
+import time
+import zipfile
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from import_filled_report import SPEC_PATH, datapoint_reference, iter_datapoints
+from normalize_template import (CALC_CHAIN_OVERRIDE_RE, CALC_CHAIN_PART, CALC_CHAIN_REL_RE, CONTENT_TYPES_PART,
+                                NORMALIZED_PATH, ZIP_EPOCH, entry_order)
+from xlsx_parts import split_reference
+
+SLIM_PATH = 'build/VSME-Digital-Template-1.1.0.slim.xlsx'
+# Not referenced by the disclosures, but part of what users are given
+DEFAULT_KEEP = ('Table of Contents & Validation', 'Licence', 'Unit Of Measurement Converter')
+STYLES_PART = 'xl/styles.xml'
+SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+APP_PART = 'docProps/app.xml'
+SAMPLE_REPORT = 'VSME_Report_2025-11-21.xlsx'
+
+FORMULA_TEXT_RES = (
+    re.compile(r'<f\b[^>]*>(.*?)</f>', re.S),
+    re.compile(r'<formula\d?>(.*?)</formula\d?>', re.S),
+    re.compile(r'<xm:f>(.*?)</xm:f>', re.S),
+    re.compile(r'<hyperlink\b[^>]*?\blocation="([^"]*)"'),
+)
+SHEET_REF_RE = re.compile(r"'((?:[^']|'')+)'!|\b([A-Za-z_][\w.]*)!")
+IDENTIFIER_RE = re.compile(r'[A-Za-z_\\][\w.]*')
+STRING_LITERAL_RE = re.compile(r'"(?:[^"]|"")*"')
+DEFINED_NAME_RE = re.compile(r'<definedName\b([^>]*)>(.*?)</definedName>', re.S)
+NAME_ATTR_RE = re.compile(r'\bname="([^"]*)"')
+LOCAL_SHEET_RE = re.compile(r'\blocalSheetId="(\d+)"')
+SHEET_ELEMENT_RE = re.compile(r'<sheet\b[^>]*?/>')
+RELATIONSHIP_RE = re.compile(rb'<Relationship\b[^>]*?/>')
+TAG_RE = re.compile(rb'<(/?)([\w:]+)[^>]*?(/?)>')
+
+CELL_STYLE_RE = re.compile(rb'(<c\b[^>]*?\bs=")(\d+)(")')
+ROW_STYLE_RE = re.compile(rb'(<row\b[^>]*?\bs=")(\d+)(")')
+COL_STYLE_RE = re.compile(rb'(<col\b[^>]*?\bstyle=")(\d+)(")')
+DXF_ID_RE = re.compile(rb'(\bdxfId=")(\d+)(")')
+SHARED_STRING_CELL_RE = re.compile(rb'(<c\b[^>]*?\bt="s"[^>]*>\s*<v>)(\d+)(</v>)')
+
+
+def _attr(element: str, name: str) -> Optional[str]:
+    match = re.search(r'\b%s="([^"]*)"' % re.escape(name), element)
+    return html.unescape(match.group(1)) if match else None
+
+
+def _resolve(source: str, target: str) -> str:
+    """Part path of a relationship target, relative to the source part"""
+    if target.startswith('/'):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source), target)).lstrip('/')
+
+
+def _rels_path(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, '_rels', name + '.rels')
+
+
+def relationships(parts: Dict[str, bytes], part: str) -> List[Tuple[bytes, str]]:
+    """(Relationship element, target part) of a part's internal relationships;
+    '' is the package itself"""
+    rels = parts.get(_rels_path(part) if part else '_rels/.rels')
+    if rels is None:
+        return []
+    found = []
+    for element in RELATIONSHIP_RE.findall(rels):
+        text = element.decode('utf-8')
+        if _attr(text, 'TargetMode') == 'External':
+            continue
+        found.append((element, _resolve(part, _attr(text, 'Target'))))
+    return found
+
+
+def linked_parts(parts: Dict[str, bytes]) -> Set[str]:
+    """Every part reachable through relationships from the package root"""
+    seen: Set[str] = set()
+    stack = ['']
+    while stack:
+        for _, target in relationships(parts, stack.pop()):
+            if target not in seen and target in parts:
+                seen.add(target)
+                stack.append(target)
+    return seen
+
+
+# --- reachability -----------------------------------------------------------
+
+class WorkbookNames(NamedTuple):
+    sheets: List[Tuple[str, str]]            # (name, part) in workbook order
+    names: Dict[str, List[str]]              # defined name -> definitions
+
+
+def workbook_names(parts: Dict[str, bytes]) -> WorkbookNames:
+    workbook = parts['xl/workbook.xml'].decode('utf-8')
+    targets = {_attr(e.decode('utf-8'), 'Id'): target for e, target in relationships(parts, 'xl/workbook.xml')}
+    sheets = [(_attr(e, 'name'), targets[_attr(e, 'r:id')]) for e in SHEET_ELEMENT_RE.findall(workbook)]
+    names: Dict[str, List[str]] = defaultdict(list)
+    for attributes, definition in DEFINED_NAME_RE.findall(workbook):
+        names[html.unescape(NAME_ATTR_RE.search(attributes).group(1))].append(html.unescape(definition))
+    return WorkbookNames(sheets, dict(names))
+
+
+def referenced_sheets(text: str, names: Dict[str, List[str]], seen: Optional[Set[str]] = None) -> Set[str]:
+    """Sheets a formula refers to, directly or through defined names"""
+    seen = set() if seen is None else seen
+    sheets = {quoted.replace("''", "'") if quoted else plain for quoted, plain in SHEET_REF_RE.findall(text)}
+    for identifier in set(IDENTIFIER_RE.findall(STRING_LITERAL_RE.sub('', text))):
+        if identifier in names and identifier not in seen:
+            seen.add(identifier)
+            for definition in names[identifier]:
+                sheets |= referenced_sheets(definition, names, seen)
+    return sheets
+
+
+def sheet_graph(parts: Dict[str, bytes], workbook: WorkbookNames) -> Dict[str, Set[str]]:
+    """Sheet -> the other sheets its formulas, validations, conditional formats
+    and hyperlinks refer to"""
+    sheet_names = {name for name, _ in workbook.sheets}
+    graph = {}
+    for name, part in workbook.sheets:
+        xml = parts[part].decode('utf-8')
+        text = '\n'.join(html.unescape(t) for pattern in FORMULA_TEXT_RES for t in pattern.findall(xml))
+        graph[name] = (referenced_sheets(text, workbook.names) & sheet_names) - {name}
+    return graph
+
+
+def reachable_sheets(graph: Dict[str, Set[str]], roots: Iterable[str]) -> Set[str]:
+    seen = set()
+    stack = [root for root in roots if root in graph]
+    while stack:
+        sheet = stack.pop()
+        if sheet not in seen:
+            seen.add(sheet)
+            stack.extend(graph[sheet] - seen)
+    return seen
+
+
+def datapoint_sheets(spec_path: str) -> Set[str]:
+    with open(spec_path, encoding='utf-8') as f:
+        spec = json.load(f)
+    named_ranges = spec.get('namedRanges', {})
+    sheets = set()
+    for datapoint in iter_datapoints(spec):
+        reference = datapoint_reference(datapoint, named_ranges)
+        if reference:
+            sheets.add(split_reference(reference)[0])
+    return sheets
+
+
+# --- styles -----------------------------------------------------------------
+
+def child_elements(xml: bytes) -> List[bytes]:
+    """Top-level elements of an XML fragment"""
+    children = []
+    depth = 0
+    start = 0
+    for match in TAG_RE.finditer(xml):
+        closing, self_closing = match.group(1), match.group(3)
+        if closing:
+            depth -= 1
+            if depth == 0:
+                children.append(xml[start:match.end()])
+        elif self_closing:
+            if depth == 0:
+                children.append(match.group(0))
+        else:
+            if depth == 0:
+                start = match.start()
+            depth += 1
+    return children
+
+
+def _section(xml: bytes, tag: bytes) -> Optional[re.Match]:
+    return re.search(rb'(<' + tag + rb'\b[^>]*?>)(.*?)(</' + tag + rb'>)', xml, re.S)
+
+
+def _set_count(start_tag: bytes, count: int) -> bytes:
+    return re.sub(rb'\bcount="\d+"', b'count="%d"' % count, start_tag)
+
+
+def _remap_attr(element: bytes, attribute: bytes, mapping: Dict[int, int]) -> bytes:
+    return re.sub(rb'(\b' + attribute + rb'=")(\d+)(")',
+                  lambda m: m.group(1) + str(mapping[int(m.group(2))]).encode() + m.group(3), element)
+
+
+def dedupe(items: List[bytes], used: Optional[Set[int]] = None) -> Tuple[List[bytes], Dict[int, int]]:
+    """Distinct items (first occurrence wins, index 0 always kept) and the
+    old -> new index map; unused items are dropped when ``used`` is given"""
+    kept: List[bytes] = []
+    position: Dict[bytes, int] = {}
+    mapping: Dict[int, int] = {}
+    for index, item in enumerate(items):
+        if used is not None and index != 0 and index not in used:
+            continue
+        if item not in position:
+            position[item] = len(kept)
+            kept.append(item)
+        mapping[index] = position[item]
+    return kept, mapping
+
+
+def prune_styles(styles: bytes, used_xfs: Set[int], used_dxfs: Set[int]) -> Tuple[bytes, Dict[int, int], Dict[int, int]]:
+    """styles.xml without duplicate or unused formats, with the cell format
+    and differential format index maps"""
+    replacements: List[Tuple[re.Match, bytes]] = []
+
+    def replace(match: re.Match, items: List[bytes], count: bool = True) -> None:
+        start = _set_count(match.group(1), len(items)) if count else match.group(1)
+        replacements.append((match, start + b''.join(items) + match.group(3)))
+
+    component_maps: Dict[bytes, Dict[int, int]] = {}
+    for tag, attribute in ((b'fonts', b'fontId'), (b'fills', b'fillId'), (b'borders', b'borderId')):
+        match = _section(styles, tag)
+        if match:
+            kept, component_maps[attribute] = dedupe(child_elements(match.group(2)))
+            replace(match, kept)
+
+    def remap_xf(xf: bytes) -> bytes:
+        for attribute, mapping in component_maps.items():
+            xf = _remap_attr(xf, attribute, mapping)
+        return xf
+
+    match = _section(styles, b'cellStyleXfs')
+    if match:
+        replace(match, [remap_xf(xf) for xf in child_elements(match.group(2))], count=False)
+
+    xf_map: Dict[int, int] = {}
+    match = _section(styles, b'cellXfs')
+    if match:
+        kept, xf_map = dedupe([remap_xf(xf) for xf in child_elements(match.group(2))], used_xfs)
+        replace(match, kept)
+
+    dxf_map: Dict[int, int] = {}
+    match = _section(styles, b'dxfs')
+    if match:
+        kept, dxf_map = dedupe(child_elements(match.group(2)), used_dxfs)
+        replace(match, kept)
+
+    out = []
+    pos = 0
+    for match, text in sorted(replacements, key=lambda r: r[0].start()):
+        out += [styles[pos:match.start()], text]
+        pos = match.end()
+    out.append(styles[pos:])
+    return b''.join(out), xf_map, dxf_map
+
+
+def _remap(pattern: re.Pattern, xml: bytes, mapping: Dict[int, int]) -> bytes:
+    return pattern.sub(lambda m: m.group(1) + str(mapping[int(m.group(2))]).encode() + m.group(3), xml)
+
+
+# --- workbook ---------------------------------------------------------------
+
+class SlimResult(NamedTuple):
+    kept_sheets: List[str]
+    dropped_sheets: List[str]
+    dropped_parts: List[str]
+    formats: Tuple[int, int]
+    differential_formats: Tuple[int, int]
+    shared_strings: Tuple[int, int]
+
+
+def _drop_sheets(parts: Dict[str, bytes], workbook: WorkbookNames, dropped: Set[str]) -> None:
+    """Remove sheets from workbook.xml and its relationships, fixing defined
+    names (localSheetId) and the active tab"""
+    xml = parts['xl/workbook.xml'].decode('utf-8')
+    order = [name for name, _ in workbook.sheets]
+    kept = [name for name in order if name not in dropped]
+    new_index = {order.index(name): i for i, name in enumerate(kept)}
+    dropped_parts = {part for name, part in workbook.sheets if name in dropped}
+    dropped_ids = set()
+    rels = parts['xl/_rels/workbook.xml.rels']
+    for element, target in relationships(parts, 'xl/workbook.xml'):
+        if target in dropped_parts:
+            dropped_ids.add(_attr(element.decode('utf-8'), 'Id'))
+            rels = rels.replace(element, b'')
+    parts['xl/_rels/workbook.xml.rels'] = rels
+
+    xml = SHEET_ELEMENT_RE.sub(lambda m: '' if _attr(m.group(0), 'r:id') in dropped_ids else m.group(0), xml)
+
+    def defined_name(match: re.Match) -> str:
+        attributes, definition = match.group(1), html.unescape(match.group(2))
+        local = LOCAL_SHEET_RE.search(attributes)
+        if local and int(local.group(1)) not in new_index:
+            return ''
+        if referenced_sheets(definition, {}) & dropped:
+            return ''
+        if local:
+            attributes = LOCAL_SHEET_RE.sub(f'localSheetId="{new_index[int(local.group(1))]}"', attributes)
+        return f'<definedName{attributes}>{match.group(2)}</definedName>'
+
+    xml = DEFINED_NAME_RE.sub(defined_name, xml)
+    xml = re.sub(r'\b(activeTab|firstSheet)="(\d+)"',
+                 lambda m: f'{m.group(1)}="{new_index.get(int(m.group(2)), 0)}"', xml)
+    parts['xl/workbook.xml'] = xml.encode('utf-8')
+
+
+def _remove_unlinked_parts(parts: Dict[str, bytes]) -> List[str]:
+    linked = linked_parts(parts)
+    removed = []
+    for part in list(parts):
+        if part == CONTENT_TYPES_PART or '/_rels/' in '/' + part:
+            continue
+        if part not in linked:
+            del parts[part]
+            removed.append(part)
+    for part in list(parts):
+        if '/_rels/' in '/' + part and part != '_rels/.rels':
+            directory, name = posixpath.split(part)
+            source = posixpath.join(posixpath.dirname(directory), name[:-len('.rels')])
+            if source not in parts:
+                del parts[part]
+                removed.append(part)
+    content_types = parts[CONTENT_TYPES_PART]
+    for part in removed:
+        content_types = re.sub(rb'<Override\b[^>]*?PartName="/' + re.escape(part.encode()) + rb'"[^>]*?/>',
+                               b'', content_types)
+    parts[CONTENT_TYPES_PART] = content_types
+    return sorted(removed)
+
+
+def read_parts(template_path: str) -> Tuple[Dict[str, zipfile.ZipInfo], Dict[str, bytes]]:
+    with zipfile.ZipFile(template_path) as zf:
+        infos = {info.filename: info for info in zf.infolist()}
+        return infos, {name: zf.read(name) for name in infos}
+
+
+def write_parts(output_path: str, infos: Dict[str, zipfile.ZipInfo], parts: Dict[str, bytes]) -> None:
+    """Deterministic zip of ``parts``, keeping each entry's compression"""
+    with zipfile.ZipFile(output_path, 'w') as out:
+        for name in entry_order(list(parts)):
+            info = zipfile.ZipInfo(name, date_time=ZIP_EPOCH)
+            info.compress_type = infos[name].compress_type
+            info.external_attr = 0o644 << 16
+            out.writestr(info, parts[name], compresslevel=9 if info.compress_type == zipfile.ZIP_DEFLATED else None)
+
+
+def slim_template(template_path: str, output_path: str, roots: Iterable[str]) -> SlimResult:
+    infos, parts = read_parts(template_path)
+    result = slim_parts(parts, roots)
+    write_parts(output_path, infos, parts)
+    return result
+
+
+def slim_parts(parts: Dict[str, bytes], roots: Iterable[str]) -> SlimResult:
+    """Slim the package ``parts`` in place"""
+    if parts.pop(CALC_CHAIN_PART, None) is not None:
+        # Its cell list would have to follow the removed sheets; Excel rebuilds it
+        parts['xl/_rels/workbook.xml.rels'] = CALC_CHAIN_REL_RE.sub(b'', parts['xl/_rels/workbook.xml.rels'])
+        parts[CONTENT_TYPES_PART] = CALC_CHAIN_OVERRIDE_RE.sub(b'', parts[CONTENT_TYPES_PART])
+
+    workbook = workbook_names(parts)
+    kept = reachable_sheets(sheet_graph(parts, workbook), roots)
+    dropped = {name for name, _ in workbook.sheets if name not in kept}
+    if dropped:
+        _drop_sheets(parts, workbook, dropped)
+    if APP_PART in parts:
+        parts[APP_PART] = re.sub(rb'<HeadingPairs>.*?</HeadingPairs>|<TitlesOfParts>.*?</TitlesOfParts>',
+                                 b'', parts[APP_PART], flags=re.S)
+    dropped_parts = _remove_unlinked_parts(parts)
+    sheet_xml = [part for name, part in workbook.sheets if name in kept]
+
+    used_xfs: Set[int] = set()
+    used_dxfs: Set[int] = set()
+    used_strings: Set[int] = set()
+    for part in sheet_xml:
+        xml = parts[part]
+        for pattern, used in ((CELL_STYLE_RE, used_xfs), (ROW_STYLE_RE, used_xfs), (COL_STYLE_RE, used_xfs),
+                              (DXF_ID_RE, used_dxfs), (SHARED_STRING_CELL_RE, used_strings)):
+            used.update(int(m.group(2)) for m in pattern.finditer(xml))
+
+    xf_count = dxf_count = 0
+    xf_map, dxf_map = {}, {}
+    if STYLES_PART in parts:
+        styles = parts[STYLES_PART]
+        xf_count = len(child_elements(_section(styles, b'cellXfs').group(2)))
+        dxfs = _section(styles, b'dxfs')
+        dxf_count = len(child_elements(dxfs.group(2))) if dxfs else 0
+        parts[STYLES_PART], xf_map, dxf_map = prune_styles(styles, used_xfs, used_dxfs)
+
+    string_map: Dict[int, int] = {}
+    string_counts = (0, 0)
+    if SHARED_STRINGS_PART in parts:
+        table = _section(parts[SHARED_STRINGS_PART], b'sst')
+        items = child_elements(table.group(2))
+        kept_items = [items[i] for i in sorted(used_strings)]
+        string_map = {old: new for new, old in enumerate(sorted(used_strings))}
+        start = re.sub(rb'\buniqueCount="\d+"', b'uniqueCount="%d"' % len(kept_items), table.group(1))
+        total = sum(len(SHARED_STRING_CELL_RE.findall(parts[part])) for part in sheet_xml)
+        start = re.sub(rb'\bcount="\d+"', b'count="%d"' % total, start)
+        data = parts[SHARED_STRINGS_PART]
+        parts[SHARED_STRINGS_PART] = data[:table.start()] + start + b''.join(kept_items) + table.group(3) \
+            + data[table.end():]
+        string_counts = (len(items), len(kept_items))
+
+    for part in sheet_xml:
+        xml = parts[part]
+        for pattern in (CELL_STYLE_RE, ROW_STYLE_RE, COL_STYLE_RE):
+            xml = _remap(pattern, xml, xf_map)
+        xml = _remap(DXF_ID_RE, xml, dxf_map)
+        parts[part] = _remap(SHARED_STRING_CELL_RE, xml, string_map)
+
+    return SlimResult(
+        kept_sheets=[name for name, _ in workbook.sheets if name in kept],
+        dropped_sheets=[name for name, _ in workbook.sheets if name in dropped],
+        dropped_parts=dropped_parts,
+        formats=(xf_count, len(set(xf_map.values()))),
+        differential_formats=(dxf_count, len(set(dxf_map.values()))),
+        shared_strings=string_counts,
+    )
+
+
+# --- comparison -------------------------------------------------------------
+
+def part_sizes(path: str) -> Dict[str, Tuple[int, int]]:
+    with zipfile.ZipFile(path) as zf:
+        return {info.filename: (info.file_size, info.compress_size) for info in zf.infolist()}
+
+
+def fill_time(template_path: str, spec_path: str, payload: List[Dict], runs: int = 15) -> float:
+    """Median seconds of one `ReportFiller.fill` of ``payload``"""
+    from report_filler import ReportFiller
+    filler = ReportFiller(template_path, spec_path)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        filler.fill(payload)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def comparison_report(original: str, slim: str, spec_path: str, payload: List[Dict]) -> str:
+    before, after = part_sizes(original), part_sizes(slim)
+    lines = ['| Part | Before (KB) | After (KB) |', '|---|---:|---:|']
+    for part in sorted(before, key=lambda p: -before[p][0]):
+        if part not in after or after[part][0] != before[part][0]:
+            size = f'{after[part][0] / 1024:.1f}' if part in after else 'removed'
+            lines.append(f'| {part} | {before[part][0] / 1024:.1f} | {size} |')
+    lines.append(f"| **uncompressed total** | {sum(s for s, _ in before.values()) / 1024:.0f} "
+                 f"| {sum(s for s, _ in after.values()) / 1024:.0f} |")
+    lines.append(f'| **xlsx file** | {os.path.getsize(original) / 1024:.0f} | {os.path.getsize(slim) / 1024:.0f} |')
+    fill_before = fill_time(original, spec_path, payload)
+    fill_after = fill_time(slim, spec_path, payload)
+    lines.append(f'| **fill time (ms)** | {fill_before * 1000:.1f} | {fill_after * 1000:.1f} |')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a slimmed report template")
+    parser.add_argument('--template', default=NORMALIZED_PATH, help="Template to slim (normally the normalized one)")
+    parser.add_argument('--output', default=SLIM_PATH, help="Slim template to write")
+    parser.add_argument('--spec', default=SPEC_PATH, help="Data model spec; its sheets are the reachability roots")
+    parser.add_argument('--keep', nargs='*', default=list(DEFAULT_KEEP), help="Further sheets to keep")
+    parser.add_argument('--compare', action='store_true', help="Print sizes and fill times of both templates")
+    parser.add_argument('--sample', default=SAMPLE_REPORT, help="Filled report whose payload --compare fills")
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    roots = datapoint_sheets(args.spec) | set(args.keep)
+    result = slim_template(args.template, args.output, roots)
+    print(f"✓ {len(result.kept_sheets)} sheets kept, dropped: {', '.join(result.dropped_sheets) or 'none'}")
+    print(f"  cell formats {result.formats[0]} -> {result.formats[1]}, "
+          f"differential formats {result.differential_formats[0]} -> {result.differential_formats[1]}, "
+          f"shared strings {result.shared_strings[0]} -> {result.shared_strings[1]}")
+    if result.dropped_parts:
+        print(f"  removed parts: {', '.join(result.dropped_parts)}")
+    print(f"  wrote {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+    if args.compare:
+        from import_filled_report import ReportImporter
+        payload = ReportImporter(args.spec).import_report(args.sample)
+        print()
+        print(comparison_report(args.template, args.output, args.spec, payload))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Synthetic VSME reports for load tests and throughput benchmarks.
+
+Payloads are generated from vsme-data-model-spec.json: every datapoint gets a
+value that matches its type, options and unit (plausible numeric ranges,
+consistent reporting periods and headcounts), optional datapoints are filled
+with --fill-rate, and the repeatingDataPatterns tables (sites, subsidiaries,
+pollutants, ...) get a random number of rows between their minRows and
+maxRows. Cells under a dropdown in the template only get one of its values
+(inline lists and enum_* lists, through the enumeration index); datapoints on
+formula cells are derived by the template and never filled.
+
+Report ``i`` depends only on (--seed, i), so any slice of a run can be
+regenerated exactly. Reports are streamed to --output as they are produced:
+
+    payloads.jsonl          {"reportId", "datapoints", "tables"} per line
+    report-000001.xlsx ...  filled workbooks, with --workbooks
+
+    python scripts/synthetic_reports.py --count 1000 --seed 42 [--workbooks] [--jobs 4]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import string
+import sys
+import time
+import zipfile
+from datetime import date, timedelta
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from enumerations import INDEX_PATH, EnumerationIndex
+from import_filled_report import SPEC_PATH, datapoint_reference, iter_datapoints
+from normalize_template import fill_template_path
+from report_filler import ReportFiller, resolve_tables
+from xlsx_parts import Cell, formula_cells, list_validations, parse_cell, sheet_parts, split_reference
+
+WORDS = (
+    'alpine baltic carbon delta eastern field green harbor iron lumen metro nordic ocean pacific '
+    'quartz river solar terra urban valley west'
+).split()
+NOUNS = 'logistics foods systems textiles energy works tools plastics media farms labs metals'.split()
+SUFFIXES = ('GmbH', 'S.A.', 'Ltd', 'B.V.', 'AB', 'Oy', 'S.r.l.', 'SAS', 'UAB', 'Sp. z o.o.')
+CITIES = 'Vilnius Warsaw Porto Madrid Lyon Ghent Aarhus Brno Graz Turku Tartu Bilbao Leipzig'.split()
+SENTENCE_WORDS = (
+    'the undertaking reduces energy use across its sites and sources renewable electricity while '
+    'monitoring suppliers training employees and reporting progress annually to stakeholders with '
+    'clear targets for emissions waste water and safety in line with applicable regulation'
+).split()
+
+# Enumeration lists backing free-text datapoints of the spec whose cells
+# have no dropdown
+ENUM_SOURCES = {
+    'legalForm': 'enum_ListLegalForms',
+    'naceSectorCode': 'enum_ListNACECode',
+    'primaryCountry': 'enum_ListCountriesName',
+    'subsidiaryCountry': 'enum_ListCountriesName',
+    'siteCountry': 'enum_ListCountriesName',
+    'country': 'enum_ListCountriesName',
+    'pollutantName': 'enum_ListPollutants',
+}
+
+
+def cell_constraints(template_path: str, spec: Dict,
+                     enumerations: EnumerationIndex) -> Tuple[Set[str], Dict[str, tuple]]:
+    """What the template allows in the cell of each datapoint id and of each
+    table column (keyed ``patternId.property``): the keys of formula cells,
+    and the dropdown values of cells under a list validation (empty when the
+    list's source is not an enumeration, e.g. a range on a report sheet)"""
+    named_ranges = spec.get('namedRanges', {})
+    cells: Dict[str, Tuple[str, Cell]] = {}
+    with zipfile.ZipFile(template_path) as zf:
+        parts = sheet_parts(zf)
+        for datapoint in iter_datapoints(spec):
+            sheet, cell_ref = split_reference(datapoint_reference(datapoint, named_ranges) or '')
+            try:
+                cell = parse_cell(cell_ref)
+            except ValueError:
+                continue
+            if sheet in parts:
+                cells[datapoint['datapointId']] = (parts[sheet], cell)
+        for pattern_id, columns in resolve_tables(spec.get('repeatingDataPatterns', []), named_ranges, parts).items():
+            for column in columns:
+                cells[f'{pattern_id}.{column.name}'] = (column.part, (column.first_row, column.col))
+        used = {part for part, _ in cells.values()}
+        formulas = {part: formula_cells(zf, part) for part in used}
+        validations = {part: list_validations(zf, part) for part in used}
+
+    derived = {key for key, (part, cell) in cells.items() if cell in formulas[part]}
+    allowed: Dict[str, tuple] = {}
+    for key, (part, cell) in cells.items():
+        validation = next((v for v in validations[part] if v.covers(cell)), None)
+        if validation is not None:
+            allowed[key] = enumerations.validation_values(validation.formula, named_ranges) or ()
+    return derived, allowed
+
+
+class PayloadGenerator:
+    """Deterministic random payloads for the spec's datapoints and tables"""
+
+    def __init__(self, spec_path: str = SPEC_PATH, enumerations_path: str = INDEX_PATH,
+                 fill_rate: float = 0.7, template_path: Optional[str] = None) -> None:
+        with open(spec_path, encoding='utf-8') as f:
+            spec = json.load(f)
+        self.enumerations = EnumerationIndex.load(enumerations_path)
+        self.derived, self.allowed = cell_constraints(template_path or fill_template_path(), spec,
+                                                      self.enumerations)
+        self.datapoints = [dp for dp in iter_datapoints(spec)
+                           if dp.get('dataType') != 'table' and dp['datapointId'] not in self.derived]
+        self.patterns = spec.get('repeatingDataPatterns', [])
+        self.fill_rate = fill_rate
+
+    def report(self, seed: int, index: int) -> Dict:
+        rng = random.Random(f'{seed}:{index}')
+        context = self._context(rng)
+        datapoints = []
+        for datapoint in self.datapoints:
+            if not datapoint.get('required') and rng.random() >= self.fill_rate:
+                continue
+            value = self._value(rng, datapoint, context, allowed=self.allowed.get(datapoint['datapointId']))
+            if value is not None:
+                datapoints.append({'datapointId': datapoint['datapointId'], 'values': value})
+        tables = {}
+        for pattern in self.patterns:
+            rows = self._row_count(rng, pattern)
+            if rows:
+                pattern_id = pattern['patternId']
+                properties = {name: prop for name, prop in
+                              pattern.get('structure', {}).get('items', {}).get('properties', {}).items()
+                              if f'{pattern_id}.{name}' not in self.derived}
+                tables[pattern_id] = [
+                    {name: self._value(rng, {'datapointId': name, **prop}, context, row,
+                                       self.allowed.get(f'{pattern_id}.{name}'))
+                     for name, prop in properties.items()}
+                    for row in range(rows)
+                ]
+        return {'reportId': f'synthetic-{seed}-{index:06d}', 'datapoints': datapoints, 'tables': tables}
+
+    def _context(self, rng: random.Random) -> Dict:
+        """Values other datapoints have to agree with"""
+        start = date(rng.randint(2021, 2025), rng.choice((1, 1, 1, 4, 7)), 1)
+        end = date(start.year + 1, start.month, 1) - timedelta(days=1)
+        employees = max(1, int(rng.lognormvariate(3.5, 1.0)))
+        temporary = rng.randint(0, employees // 4)
+        other = rng.randint(0, 1) if employees > 20 else 0
+        male = rng.randint(0, employees - other)
+        return {
+            'start': start, 'end': end,
+            'numberOfEmployees': employees,
+            'permanentEmployees': employees - temporary, 'temporaryEmployees': temporary,
+            'maleEmployees': male, 'femaleEmployees': employees - other - male, 'otherGenderEmployees': other,
+            'turnover': int(round(employees * rng.uniform(60_000, 250_000), -3)),
+            'name': f"{rng.choice(WORDS).title()} {rng.choice(NOUNS).title()} {rng.choice(SUFFIXES)}",
+        }
+
+    def _row_count(self, rng: random.Random, pattern: Dict) -> int:
+        low, high = pattern.get('minRows', 0), pattern.get('maxRows', 0)
+        if high <= low:
+            return low
+        # Most undertakings have a few rows; a long tail uses the full table
+        return min(high, low + int(rng.expovariate(1 / max(1.0, (high - low) / 5))))
+
+    def _value(self, rng: random.Random, datapoint: Dict, context: Dict, row: Optional[int] = None,
+               allowed: Optional[tuple] = None) -> Optional[str]:
+        """Value of a datapoint, or of a table property when ``row`` is given;
+        under a dropdown one of its ``allowed`` values (None when they are
+        unknown)"""
+        value = self._typed_value(rng, datapoint, context, row)
+        if allowed is None or value in allowed:
+            return value
+        return rng.choice(allowed) if allowed else None
+
+    def _typed_value(self, rng: random.Random, datapoint: Dict, context: Dict, row: Optional[int]) -> Optional[str]:
+        datapoint_id = datapoint['datapointId']
+        data_type = datapoint.get('dataType', 'text')
+        start, end = context['start'], context['end']
+        if row is None and isinstance(context.get(datapoint_id), int):
+            return str(context[datapoint_id])
+        if datapoint_id.startswith('reportingPeriod'):
+            period = start if 'Start' in datapoint_id else end
+            part = next(p for p in ('Year', 'Month', 'Day') if datapoint_id.endswith(p))
+            return str(getattr(period, part.lower()))
+        if datapoint_id in ENUM_SOURCES and ENUM_SOURCES[datapoint_id] in self.enumerations:
+            return rng.choice(self.enumerations.values(ENUM_SOURCES[datapoint_id]))
+
+        options = datapoint.get('options')
+        if data_type == 'select' and options:
+            option = rng.choice(options)
+            return option['value'] if isinstance(option, dict) else option
+        if data_type == 'boolean':
+            return rng.choice(('true', 'false'))
+        if data_type == 'date':
+            return (start + timedelta(days=rng.randint(0, (end - start).days))).isoformat()
+        if data_type == 'number':
+            return self._number(rng, datapoint, context)
+        if data_type == 'textarea':
+            return self._sentences(rng, rng.randint(1, 4))
+        return self._text(rng, datapoint_id, context, row)
+
+    def _number(self, rng: random.Random, datapoint: Dict, context: Dict) -> str:
+        datapoint_id = datapoint['datapointId']
+        unit = datapoint.get('unit') or ''
+        size = context['numberOfEmployees']
+        if datapoint_id.endswith('Year'):
+            return str(rng.randint(context['start'].year - 5, context['start'].year)
+                       if 'Baseline' in datapoint_id else rng.randint(2030, 2050))
+        if unit == '%' or datapoint_id.endswith(('Ratio', 'Percentage', 'Rate')):
+            return f'{rng.uniform(0, 100):.1f}'
+        if unit == 'currency':
+            return str(int(context['turnover'] * rng.uniform(0, 0.05)))
+        if unit == 'MWh':
+            return f'{size * rng.lognormvariate(2.5, 0.8):.1f}'
+        if unit.startswith('tCO2e'):
+            return f'{size * rng.lognormvariate(1.0, 1.0):.2f}'
+        if unit in ('kg', 'tonnes'):
+            return f'{rng.lognormvariate(3.0, 1.5):.2f}'
+        if 'hectares' in unit:
+            return f'{rng.lognormvariate(1.0, 1.2):.2f}'
+        if 'Members' in datapoint_id:
+            return str(rng.randint(0, 6))
+        if 'Incidents' in datapoint_id:
+            return str(min(rng.randint(0, 3), rng.randint(0, 3)))
+        return str(rng.randint(0, size))
+
+    def _text(self, rng: random.Random, datapoint_id: str, context: Dict, row: Optional[int]) -> str:
+        if datapoint_id == 'entityName':
+            return context['name']
+        if datapoint_id.endswith('Identifier') or datapoint_id in ('entityIdentifier', 'siteId'):
+            if datapoint_id == 'siteId':
+                return f'SITE-{(row or 0) + 1:03d}'
+            return ''.join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(20))
+        if datapoint_id == 'siteCity':
+            return rng.choice(CITIES)
+        if 'Name' in datapoint_id or datapoint_id.endswith('Type'):
+            return f"{rng.choice(WORDS).title()} {rng.choice(NOUNS)}"
+        return self._sentences(rng, 1)
+
+    def _sentences(self, rng: random.Random, count: int) -> str:
+        sentences = []
+        for _ in range(count):
+            words = rng.choices(SENTENCE_WORDS, k=rng.randint(8, 20))
+            sentences.append(' '.join(words).capitalize() + '.')
+        return ' '.join(sentences)
+
+
+# Per worker process, set by _init_worker
+_generator: Optional[PayloadGenerator] = None
+_filler: Optional[ReportFiller] = None
+
+
+def _init_worker(spec_path: str, enumerations_path: str, fill_rate: float, template_path: str,
+                 workbooks: bool) -> None:
+    global _generator, _filler
+    _generator = PayloadGenerator(spec_path, enumerations_path, fill_rate, template_path)
+    if workbooks:
+        _filler = ReportFiller(template_path, spec_path)
+
+
+def _produce(job: Tuple[int, int, Optional[str]]) -> Tuple[str, int]:
+    """Generate report ``index``; with a workbook path, also fill and write it"""
+    seed, index, workbook_path = job
+    report = _generator.report(seed, index)
+    size = 0
+    if workbook_path:
+        content = _filler.fill(report['datapoints'], report['tables'])
+        with open(workbook_path, 'wb') as f:
+            f.write(content)
+        size = len(content)
+    return json.dumps(report, ensure_ascii=False, separators=(',', ':')), size
+
+
+def generate(output_dir: str, count: int, seed: int, start: int = 0, workbooks: bool = False, jobs: int = 1,
+             spec_path: str = SPEC_PATH, enumerations_path: str = INDEX_PATH, fill_rate: float = 0.7,
+             template_path: Optional[str] = None) -> Iterator[Tuple[int, int]]:
+    """Write reports start..start+count-1 to ``output_dir``; yields (index,
+    workbook bytes) as each one is written, in order"""
+    template_path = template_path or fill_template_path()
+    os.makedirs(output_dir, exist_ok=True)
+    initargs = (spec_path, enumerations_path, fill_rate, template_path, workbooks)
+    jobs_iter = (
+        (seed, index, os.path.join(output_dir, f'report-{index:06d}.xlsx') if workbooks else None)
+        for index in range(start, start + count)
+    )
+    with open(os.path.join(output_dir, 'payloads.jsonl'), 'w', encoding='utf-8') as payloads:
+        if jobs > 1:
+            with multiprocessing.get_context('spawn').Pool(jobs, _init_worker, initargs) as pool:
+                # imap keeps the output ordered and streams results as they finish
+                for index, (line, size) in enumerate(pool.imap(_produce, jobs_iter, chunksize=8), start):
+                    payloads.write(line + '\n')
+                    yield index, size
+        else:
+            _init_worker(*initargs)
+            for index, job in enumerate(jobs_iter, start):
+                line, size = _produce(job)
+                payloads.write(line + '\n')
+                yield index, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic VSME payloads and workbooks")
+    parser.add_argument('--count', type=int, default=100, help="Number of reports")
+    parser.add_argument('--seed', type=int, default=0, help="Seed; report i is the same for the same seed")
+    parser.add_argument('--start', type=int, default=0, help="Index of the first report")
+    parser.add_argument('--output', default='build/synthetic', help="Directory to write to")
+    parser.add_argument('--workbooks', action='store_true', help="Also write filled .xlsx files")
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes")
+    parser.add_argument('--fill-rate', type=float, default=0.7, help="Share of optional datapoints filled in")
+    parser.add_argument('--spec', default=SPEC_PATH, help="Data model spec")
+    parser.add_argument('--enumerations', default=INDEX_PATH, help="Enumeration index for dropdown values")
+    parser.add_argument('--template', default=fill_template_path(),
+                        help="Template (dropdowns, formula cells, --workbooks); the normalized one once built")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    total_bytes = 0
+    written = 0
+    for index, size in generate(args.output, args.count, args.seed, args.start, args.workbooks, args.jobs,
+                                args.spec, args.enumerations, args.fill_rate, args.template):
+        written += 1
+        total_bytes += size
+        if written % 100 == 0 or written == args.count:
+            elapsed = time.perf_counter() - started
+            print(f"\r  {written}/{args.count} reports, {written / elapsed:.0f}/s", end='', file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    print(file=sys.stderr)
+    print(f"✓ {written} reports (seed {args.seed}) in {elapsed:.1f} s -> {args.output}"
+          + (f", {total_bytes / 1024 / 1024:.1f} MB of workbooks" if args.workbooks else ''))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Per-language label catalog from the template's 'Translations' sheet.
+
+Every label in the template is a template_label_* Named Range pointing at
+column B of 'Translations', which picks one of the official translations in
+columns C:G (en, lt, pl, pt, es) by the display language. `extract_translations`
+reads them once and `write_catalog` writes one shard per language plus a
+small index:
+
+    frontend/src/locales/template/index.json   languages, Named Range -> label name
+    frontend/src/locales/template/<lang>.json  label name -> text
+
+Data Named Ranges (e.g. template_reporting_entity_name) are linked to the label
+shown next to them in column C, so labels can be looked up by either name.
+Only ranges one row high (a cell or merged input cell) or one column wide (a
+list) are linked; table blocks and the xBRL dimension ranges (...Axis,
+...Table, ...Member, ...Hypercube) merely start on a labelled row.
+`LabelCatalog` reads a shard only when its language is first requested; the
+frontend gets the same lazy behaviour from `loadTemplateLabels` in
+src/lib/i18n.tsx (one chunk per language).
+
+    python scripts/translations.py [--template ...] [--output-dir ...]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from xlsx_parts import parse_range, split_reference
+
+TRANSLATIONS_SHEET = 'Translations'
+CATALOG_DIR = 'frontend/src/locales/template'
+LABEL_PREFIX = 'template_label_'
+LANGUAGE_NAME_ROW = 1
+LANGUAGE_CODE_ROW = 2
+FIRST_LANGUAGE_COLUMN = 3  # C; column B holds the selected-language formula
+LABEL_COLUMN = 3
+
+LABEL_FORMULA_RE = re.compile(r'^=\s*(template_label_\w+)\s*$')
+DIMENSION_RE = re.compile(r'(Axis|Table|Member|Hypercube|Domain)$')
+
+
+def extract_translations(excel_file: str) -> Tuple[Dict[str, str], Dict[str, Dict[str, str]], Dict[str, str]]:
+    """(language code -> name, language -> label name -> text,
+    data Named Range -> label name)"""
+    try:
+        import openpyxl
+    except ImportError:
+        import subprocess
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
+        import openpyxl
+
+    wb = openpyxl.load_workbook(excel_file, read_only=True)
+    ws = wb[TRANSLATIONS_SHEET]
+    rows = {i: row for i, row in enumerate(ws.iter_rows(values_only=True), start=1)}
+    first = FIRST_LANGUAGE_COLUMN - 1
+    codes = [code for code in rows[LANGUAGE_CODE_ROW][first:] if code]
+    languages = {
+        code: (rows[LANGUAGE_NAME_ROW][first + i] or code).split(' - ')[0]
+        for i, code in enumerate(codes)
+    }
+
+    labels: Dict[str, Dict[str, str]] = {code: {} for code in codes}
+    data_ranges: Dict[str, Tuple[str, int, int]] = {}
+    for name, definition in sorted(wb.defined_names.items()):
+        sheet, cell_ref = split_reference(definition.attr_text or '')
+        try:
+            row, col, last_row, last_col = parse_range(cell_ref)
+        except ValueError:
+            continue  # Translations!#REF! and similar broken names
+        if name.startswith(LABEL_PREFIX):
+            if sheet != TRANSLATIONS_SHEET or row not in rows:
+                continue
+            for i, code in enumerate(codes):
+                text = rows[row][first + i]
+                if isinstance(text, str) and text.strip():
+                    labels[code][name] = text
+        elif (not name.startswith('enum_') and not DIMENSION_RE.search(name) and sheet in wb.sheetnames
+              and (row == last_row or col == last_col) and col >= LABEL_COLUMN):
+            data_ranges[name] = (sheet, row, col)
+
+    range_labels: Dict[str, str] = {}
+    by_sheet: Dict[str, List[Tuple[str, int]]] = {}
+    for name, (sheet, row, _) in data_ranges.items():
+        by_sheet.setdefault(sheet, []).append((name, row))
+    for sheet, names in by_sheet.items():
+        ws = wb[sheet]
+        wanted = {row for _, row in names}
+        label_cells = {}
+        for row in ws.iter_rows(min_row=min(wanted), max_row=max(wanted),
+                                min_col=LABEL_COLUMN, max_col=LABEL_COLUMN):
+            cell = row[0]
+            if getattr(cell, 'row', None) in wanted and isinstance(cell.value, str):
+                match = LABEL_FORMULA_RE.match(cell.value)
+                if match:
+                    label_cells[cell.row] = match.group(1)
+        for name, row in names:
+            if row in label_cells:
+                range_labels[name] = label_cells[row]
+    wb.close()
+    return languages, labels, range_labels
+
+
+def write_catalog(directory: str, languages: Dict[str, str], labels: Dict[str, Dict[str, str]],
+                  range_labels: Dict[str, str], source: str = '') -> List[str]:
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for code, texts in labels.items():
+        path = os.path.join(directory, f'{code}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(texts.items())), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        written.append(path)
+    index = {
+        'source': source,
+        'languages': languages,
+        'labelCounts': {code: len(texts) for code, texts in labels.items()},
+        'namedRanges': dict(sorted(range_labels.items())),
+    }
+    path = os.path.join(directory, 'index.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    written.append(path)
+    return written
+
+
+class LabelCatalog:
+    """Official template labels; each language shard is read on first use"""
+
+    def __init__(self, directory: str = CATALOG_DIR, fallback: str = 'en') -> None:
+        self.directory = directory
+        self.fallback = fallback
+        with open(os.path.join(directory, 'index.json'), encoding='utf-8') as f:
+            index = json.load(f)
+        self.languages: Dict[str, str] = index['languages']
+        self.range_labels: Dict[str, str] = index['namedRanges']
+        self._shards: Dict[str, Dict[str, str]] = {}
+
+    def shard(self, language: str) -> Dict[str, str]:
+        if language not in self._shards:
+            if language not in self.languages:
+                raise KeyError(f"No template translations for '{language}' "
+                               f"(available: {', '.join(self.languages)})")
+            with open(os.path.join(self.directory, f'{language}.json'), encoding='utf-8') as f:
+                self._shards[language] = json.load(f)
+        return self._shards[language]
+
+    def loaded(self) -> List[str]:
+        return list(self._shards)
+
+    def label(self, name: str, language: str = 'en') -> Optional[str]:
+        """Text of a template_label_* name or of the label next to a data
+        Named Range; falls back to the fallback language"""
+        key = name if name.startswith(LABEL_PREFIX) else self.range_labels.get(name)
+        if key is None:
+            return None
+        text = self.shard(language).get(key)
+        if text is None and language != self.fallback:
+            text = self.shard(self.fallback).get(key)
+        return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract the per-language label catalog")
+    parser.add_argument('--template', default="VSME-Digital-Template-1.1.0.xlsx", help="Excel template to read")
+    parser.add_argument('--output-dir', default=CATALOG_DIR, help="Directory for the language shards")
+    args = parser.parse_args(argv)
+
+    languages, labels, range_labels = extract_translations(args.template)
+    written = write_catalog(args.output_dir, languages, labels, range_labels,
+                            source=os.path.basename(args.template))
+    print(f"✓ {len(languages)} languages, {len(range_labels)} Named Ranges linked to labels")
+    for code, name in languages.items():
+        print(f"  {code}  {name:12} {len(labels[code]):4d} labels")
+    print(f"  wrote {len(written)} files to {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Unit-of-measurement conversion matrix compiled from the template.
+
+The 'Unit Of Measurement Converter' sheet converts one value at a time, with
+factors spread over nested IF formulas (mass D6, volume D10, energy D14) and
+two lookup tables on 'Fuel Conversion Parameters' (density K1:S9, NCV
+U1:AK13). `UnitConverter.from_workbook` collects all of them into a single
+unit x unit factor matrix (NaN between units of different dimensions), and
+`convert` then normalises whole arrays of values with one gather and one
+multiply.
+
+The factors are not copied pair by pair: every unit gets one scale relative
+to its dimension's base unit (g, L, J), parsed from its symbol ("MWh/t" ->
+3.6e9 / 1e6) or, for symbols not in UNIT_SCALES, derived from the template's
+own pairs. matrix[a, b] = scale[a] / scale[b] is then reciprocal and
+transitive by construction. Template entries that disagree with the scales
+(the NCV table has several off by 1000, e.g. J/t -> KJ/t = 1) are kept in
+`inconsistent` and reported by the CLI.
+
+Incompatible conversions (e.g. kg -> MWh) are rejected for the whole batch
+before anything is computed.
+
+    python scripts/unit_converter.py [values.csv --to UNIT] [--template ...]
+
+The CSV needs the columns value and unit. Without a CSV the compiled units
+are listed per dimension.
+"""
+import argparse
+import csv
+import re
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "numpy"])
+    import numpy as np
+
+try:
+    import openpyxl
+except ImportError:
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
+    import openpyxl
+
+
+CONVERTER_SHEET = 'Unit Of Measurement Converter'
+PARAMETERS_SHEET = 'Fuel Conversion Parameters'
+
+# Dimension -> result cell whose IF chain holds the factors
+FORMULA_TABLES = {
+    'mass': 'D6',
+    'volume': 'D10',
+    'energy': 'D14',
+}
+# Dimension -> (row labels, column labels, factors) on the parameters sheet
+MATRIX_TABLES = {
+    'density': ('K2:K9', 'L1:S1', 'L2:S9'),
+    'ncv': ('U2:U13', 'V1:AK1', 'V2:AK13'),
+}
+
+# Symbol (casefolded) -> size in its dimension's base unit (g, L, J)
+UNIT_SCALES = {
+    'g': 1.0, 'kg': 1e3, 't': 1e6, 'gg': 1e9,
+    'l': 1.0, 'm³': 1e3,
+    'j': 1.0, 'kj': 1e3, 'tj': 1e12, 'mwh': 3.6e9,
+}
+# Relative difference a template factor may have from the derived one; the
+# template rounds 1/3.6 to 0.278 and 0.2777777778
+TOLERANCE = 1e-2
+
+PAIR_RE = re.compile(
+    r'AND\(\s*B\d+\s*=\s*"([^"]+)"\s*,\s*D\d+\s*=\s*"([^"]+)"\s*\)\s*,\s*B\d+\s*([*/])\s*([0-9.]+(?:[eE][-+]?\d+)?)'
+)
+
+
+def unit_label(unit: str) -> str:
+    """Unit labels appear with both '-' and '–' ("Gg – Gigagram")"""
+    return ' '.join(str(unit).replace('–', '-').split())
+
+
+def normalize_unit(unit: str) -> str:
+    """Lookup key of a unit label: 'kg', 'KG' and 'Kg - Kilogram' all match"""
+    return unit_label(unit).casefold()
+
+
+def symbol_scale(unit: str) -> Optional[float]:
+    """Scale of a unit from its symbol ("Kg - Kilogram" -> 1e3, "MWh/t" ->
+    3.6e3); None when a part of the symbol is not in UNIT_SCALES"""
+    numerator, _, denominator = normalize_unit(unit).split(' - ')[0].partition('/')
+    scale = UNIT_SCALES.get(numerator)
+    if scale is None:
+        return None
+    if denominator:
+        per = UNIT_SCALES.get(denominator)
+        return None if per is None else scale / per
+    return scale
+
+
+def formula_factors(formula: str) -> List[Tuple[str, str, float]]:
+    """(from, to, factor) pairs of an IF(AND(B="from",D="to"),B*f, ...) chain;
+    the first pair wins, as in Excel"""
+    pairs: List[Tuple[str, str, float]] = []
+    seen = set()
+    for source, target, operator, number in PAIR_RE.findall(formula):
+        key = (unit_label(source), unit_label(target))
+        if key in seen:
+            continue
+        seen.add(key)
+        factor = float(number)
+        pairs.append((key[0], key[1], factor if operator == '*' else 1.0 / factor))
+    return pairs
+
+
+def _cells(ws, ref: str) -> List[List]:
+    return [[cell.value for cell in row] for row in ws[ref]]
+
+
+class UnitConverter:
+    """Block-diagonal unit x unit factor matrix"""
+
+    def __init__(self, tables: Dict[str, List[Tuple[str, str, float]]]) -> None:
+        self.units: List[str] = []
+        self.dimensions: List[str] = list(tables)
+        dimension_of: List[int] = []
+        for d, pairs in enumerate(tables.values()):
+            for source, target, _ in pairs:
+                for unit in (source, target):
+                    if unit not in self.units:
+                        self.units.append(unit)
+                        dimension_of.append(d)
+        self.unit_dimension = np.array(dimension_of, dtype=np.int64)
+        self.index: Dict[str, int] = {normalize_unit(unit): i for i, unit in enumerate(self.units)}
+        # Short symbols ("Kg", "m³", "MWh") as aliases of the full labels
+        for unit, i in list(self.index.items()):
+            self.index.setdefault(unit.split(' - ')[0], i)
+
+        self.scale = np.full(len(self.units), np.nan)
+        for pairs in tables.values():
+            self._scale_dimension(pairs)
+        # Units of different dimensions, or left without a scale, stay NaN
+        same_dimension = self.unit_dimension[:, None] == self.unit_dimension[None, :]
+        self.matrix = np.where(same_dimension, self.scale[:, None] / self.scale[None, :], np.nan)
+
+        # (source, target, template factor, derived factor) the template gets wrong
+        self.inconsistent: List[Tuple[str, str, float, float]] = []
+        for pairs in tables.values():
+            for source, target, factor in pairs:
+                derived = self.matrix[self.units.index(source), self.units.index(target)]
+                if not np.isnan(derived) and abs(factor - derived) > TOLERANCE * abs(derived):
+                    self.inconsistent.append((source, target, factor, float(derived)))
+
+    def _scale_dimension(self, pairs: List[Tuple[str, str, float]]) -> None:
+        """Scales of one dimension's units: from their symbols, else walked
+        from a scaled unit through the template's pairs (breadth first, so
+        each unit takes the shortest chain of template factors)"""
+        edges: Dict[int, List[Tuple[int, float]]] = {}
+        for source, target, factor in pairs:
+            if factor:
+                a, b = self.units.index(source), self.units.index(target)
+                edges.setdefault(a, []).append((b, 1.0 / factor))
+                edges.setdefault(b, []).append((a, factor))
+        codes = list(edges)
+        for code in codes:
+            scale = symbol_scale(self.units[code])
+            if scale is not None:
+                self.scale[code] = scale
+        if codes and np.isnan(self.scale[codes]).all():
+            self.scale[codes[0]] = 1.0
+        queue = deque(code for code in codes if not np.isnan(self.scale[code]))
+        while queue:
+            code = queue.popleft()
+            for other, ratio in edges[code]:
+                if np.isnan(self.scale[other]):
+                    # factor(a -> b) = scale[a] / scale[b]
+                    self.scale[other] = self.scale[code] * ratio
+                    queue.append(other)
+
+    @classmethod
+    def from_workbook(cls, excel_file: str = 'VSME-Digital-Template-1.1.0.xlsx') -> 'UnitConverter':
+        wb = openpyxl.load_workbook(excel_file, read_only=True)
+        converter_ws = wb[CONVERTER_SHEET]
+        parameters_ws = wb[PARAMETERS_SHEET]
+        tables: Dict[str, List[Tuple[str, str, float]]] = {}
+        for dimension, cell in FORMULA_TABLES.items():
+            formula = _cells(converter_ws, f'{cell}:{cell}')[0][0]
+            tables[dimension] = formula_factors(formula or '')
+        for dimension, (row_ref, column_ref, factor_ref) in MATRIX_TABLES.items():
+            sources = [unit_label(row[0]) for row in _cells(parameters_ws, row_ref)]
+            targets = [unit_label(value) for value in _cells(parameters_ws, column_ref)[0]]
+            pairs = []
+            for source, row in zip(sources, _cells(parameters_ws, factor_ref)):
+                for target, value in zip(targets, row):
+                    if isinstance(value, (int, float)):
+                        pairs.append((source, target, float(value)))
+            tables[dimension] = pairs
+        wb.close()
+        return cls(tables)
+
+    def unit_codes(self, units: Sequence[str]) -> 'np.ndarray':
+        """Index of each unit label (-1 when unknown); labels are resolved once
+        per distinct value"""
+        resolved: Dict[str, int] = {}
+
+        def code(unit: str) -> int:
+            if unit not in resolved:
+                resolved[unit] = self.index.get(normalize_unit(unit), -1)
+            return resolved[unit]
+
+        return np.fromiter((code(u) for u in units), dtype=np.int64, count=len(units))
+
+    def dimension(self, unit: str) -> Optional[str]:
+        code = self.index.get(normalize_unit(unit))
+        return None if code is None else self.dimensions[self.unit_dimension[code]]
+
+    def factors(self, from_units: Union[str, Sequence[str]],
+                to_units: Union[str, Sequence[str]], count: int) -> 'np.ndarray':
+        """Factor per row; raises ValueError naming every unknown unit or
+        unsupported conversion in the batch"""
+        source = self._codes(from_units, count)
+        target = self._codes(to_units, count)
+        problems = []
+        for codes, labels in ((source, from_units), (target, to_units)):
+            if (codes < 0).any():
+                unknown = sorted({labels if isinstance(labels, str) else labels[i]
+                                  for i in np.flatnonzero(codes < 0)})
+                problems.append(f"unknown unit(s): {', '.join(map(str, unknown))}")
+        if problems:
+            raise ValueError('; '.join(problems))
+
+        factor = self.matrix[source, target]
+        bad = np.isnan(factor)
+        if bad.any():
+            pairs = sorted(set(zip(source[bad].tolist(), target[bad].tolist())))
+            raise ValueError('incompatible conversion(s): ' + ', '.join(
+                f"{self.units[s]} ({self.dimensions[self.unit_dimension[s]]}) -> "
+                f"{self.units[t]} ({self.dimensions[self.unit_dimension[t]]})"
+                for s, t in pairs
+            ))
+        return factor
+
+    def convert(self, values: Sequence[float], from_units: Union[str, Sequence[str]],
+                to_units: Union[str, Sequence[str]]) -> 'np.ndarray':
+        """``values`` expressed in ``to_units``; units are one label for the
+        whole batch or one label per value"""
+        values = np.asarray(values, dtype=np.float64)
+        return values * self.factors(from_units, to_units, len(values))
+
+    def _codes(self, units: Union[str, Sequence[str]], count: int) -> 'np.ndarray':
+        if isinstance(units, str):
+            return np.full(count, self.index.get(normalize_unit(units), -1), dtype=np.int64)
+        return self.unit_codes(units)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch unit-of-measurement conversion")
+    parser.add_argument('values', nargs='?', help="CSV with value and unit columns")
+    parser.add_argument('--to', help="Target unit for all values")
+    parser.add_argument('--template', default='VSME-Digital-Template-1.1.0.xlsx', help="Excel template to read")
+    args = parser.parse_args(argv)
+
+    converter = UnitConverter.from_workbook(args.template)
+    if not args.values:
+        for d, dimension in enumerate(converter.dimensions):
+            units = [u for i, u in enumerate(converter.units) if converter.unit_dimension[i] == d]
+            print(f"{dimension:8} {len(units):2} units: {', '.join(units)}")
+        if converter.inconsistent:
+            print(f"⚠️  {len(converter.inconsistent)} template factor(s) disagree with the unit scales "
+                  f"and were replaced:")
+            for source, target, factor, derived in converter.inconsistent:
+                print(f"   {source} -> {target}: template {factor:g}, derived {derived:g}")
+        return 0
+    if not args.to:
+        parser.error("--to is required when converting values")
+
+    with open(args.values, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    values = [float(row['value']) for row in rows]
+    units = [row['unit'] for row in rows]
+    started = time.perf_counter()
+    try:
+        converted = converter.convert(values, units, args.to)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"Converted {len(values)} values to {args.to} in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['value', 'unit', args.to])
+    for value, unit, result in zip(values, units, converted):
+        writer.writerow([value, unit, f'{result:.10g}'])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
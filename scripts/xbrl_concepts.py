@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Precompiled XBRL concept map of the VSME template.
+
+The template carries its taxonomy mapping implicitly: every disclosure Named
+Range is a VSME taxonomy concept (``Turnover``, ``NumberOfEmployees``, ...),
+the ``*TypedAxis`` ranges key the repeating tables, and the ``template_*``
+ranges of the XBRL block and the 'Technical Sheet' hold the document
+information (entity name, identifier and scheme, currency, reporting period,
+whose start and end dates are formulas over the year/month/day cells). The
+taxonomy entry point is the ``.xsd`` URL on the Introduction sheet.
+
+`build_concept_map` resolves all of that once against the spec into
+docs/data-model/vsme-xbrl-concepts.json: datapoint id -> concept, value kind,
+unit and scale; pattern id -> typed axis and column concepts; plus which
+datapoints make up the document information. `xbrl_export` serializes
+payloads from it without opening a workbook.
+
+    python scripts/xbrl_concepts.py [--template ...] [--spec ...] [--output ...]
+"""
+import argparse
+import json
+import re
+import sys
+import zipfile
+from typing import Dict, Optional, Tuple
+
+from data_model import DataModel
+from import_filled_report import SPEC_PATH
+from normalize_template import TEMPLATE_PATH
+from range_index import RangeIndex
+from xlsx_parts import Cell, cell_name, column_index, defined_names, parse_cell, sheet_parts, split_reference
+
+CONCEPTS_PATH = 'docs/data-model/vsme-xbrl-concepts.json'
+PREFIX = 'vsme'
+
+# template_* Named Ranges of the "Information on the report necessary for
+# XBRL" block
+DOCUMENT_NAMES = {
+    'entityName': 'template_reporting_entity_name',
+    'identifierScheme': 'template_reporting_entity_identifier_scheme',
+    'identifier': 'template_reporting_entity_identifier',
+    'currency': 'template_currency',
+    'periodStart': 'template_reporting_period_startdate',
+    'periodEnd': 'template_reporting_period_enddate',
+}
+# Values of enum_ListIdentifier
+IDENTIFIER_SCHEMES = {
+    'LEI': 'http://standards.iso.org/iso/17442',
+    'DUNS': 'http://www.dnb.com/duns',
+    'EU ID': 'https://e-justice.europa.eu/eu-id',
+    'PermID': 'https://permid.org',
+}
+# spec unit -> (XBRL unit, factor applied to the entered value). {currency}
+# is the report currency.
+UNITS = {
+    'currency': ('iso4217:{currency}', 1),
+    'MWh': ('utr:MWh', 1),
+    'tCO2e': ('utr:tCO2e', 1),
+    'tCO2e/M€': ('utr:tCO2e/iso4217:{currency}', 1e-6),
+    '%': ('xbrli:pure', 0.01),
+}
+KINDS = {'number': 'numeric', 'date': 'date', 'boolean': 'boolean', 'select': 'string',
+         'text': 'string', 'textarea': 'string'}
+
+ENTRY_POINT_RE = re.compile(rb'<t[^>]*>(https?://[^<\s]+\.xsd)</t>')
+CELL_REF_RE = re.compile(r"(?<![A-Za-z_!'])\$?([A-Z]{1,3})\$?(\d+)\b")
+# Named Ranges that are structure or lists, not reportable concepts
+NON_CONCEPT_RE = re.compile(r'^(template_|enum_|List)|(Axis|Table|Hypercube|Domain|Member|LineItems)$')
+
+
+def is_concept(name: Optional[str]) -> bool:
+    return bool(name) and '_' not in name and not NON_CONCEPT_RE.search(name)
+
+
+def entry_point(zf: zipfile.ZipFile) -> Optional[str]:
+    match = ENTRY_POINT_RE.search(zf.read('xl/sharedStrings.xml'))
+    return match.group(1).decode() if match else None
+
+
+def cell_formula(zf: zipfile.ZipFile, part: str, cell: Cell) -> Optional[str]:
+    xml = zf.read(part)
+    match = re.search(rb'<c r="' + cell_name(*cell).encode() + rb'"[^>]*?(/?)>', xml)
+    if match is None or match.group(1):
+        return None
+    body = xml[match.end():xml.index(b'</c>', match.end())]
+    formula = re.search(rb'<f\b[^>]*>(.*?)</f>', body, re.S)
+    return formula.group(1).decode('utf-8') if formula else None
+
+
+def datapoint_cells(model: DataModel) -> Dict[Tuple[str, Cell], str]:
+    """(sheet, top-left cell) -> datapoint id"""
+    cells = {}
+    for entry in model.iter_datapoints():
+        reference = model.reference(entry.datapoint['datapointId'])
+        if not reference:
+            continue
+        sheet, cell_ref = split_reference(reference)
+        try:
+            cells.setdefault((sheet, parse_cell(cell_ref)), entry.datapoint['datapointId'])
+        except ValueError:
+            continue
+    return cells
+
+
+def document_datapoints(zf: zipfile.ZipFile, names: Dict[str, str], cells: Dict[Tuple[str, Cell], str],
+                        parts: Dict[str, str]) -> Dict[str, object]:
+    """Document information item -> datapoint id, or the ids of the
+    year/month/day cells a date formula is built from. Formula cells are
+    always resolved through their precedents, even when a datapoint sits on
+    them: the formula result is never part of a payload."""
+    document: Dict[str, object] = {}
+    for key, name in DOCUMENT_NAMES.items():
+        if name not in names:
+            continue
+        sheet, cell_ref = split_reference(names[name])
+        cell = parse_cell(cell_ref)
+        formula = cell_formula(zf, parts[sheet], cell) if sheet in parts else None
+        if formula is None:
+            if (sheet, cell) in cells:
+                document[key] = cells[(sheet, cell)]
+            continue
+        precedents = [cells.get((sheet, (int(row), column_index(col))))
+                      for col, row in CELL_REF_RE.findall(formula)]
+        precedents = list(dict.fromkeys(p for p in precedents if p))
+        if precedents:
+            document[key] = precedents
+    return document
+
+
+def fact_entry(datapoint: Dict, concept: str) -> Dict:
+    kind = KINDS.get(datapoint.get('dataType'), 'string')
+    entry = {'concept': f'{PREFIX}:{concept}', 'kind': kind, 'periodType': 'duration'}
+    if kind == 'numeric':
+        unit, scale = UNITS.get(datapoint.get('unit'), ('xbrli:pure', 1))
+        entry['unit'] = unit
+        if scale != 1:
+            entry['scale'] = scale
+    return entry
+
+
+def table_entries(model: DataModel, index: RangeIndex) -> Dict[str, Dict]:
+    """patternId -> typed axis, the property keying each row and the column
+    concepts. The axis is the *TypedAxis (or *Axis property) range covering
+    the pattern's rows; without a key property rows are numbered from 1."""
+    tables: Dict[str, Dict] = {}
+    for pattern in model.spec.get('repeatingDataPatterns', []):
+        properties = pattern.get('structure', {}).get('items', {}).get('properties', {})
+        axis, key = None, None
+        for name, prop in properties.items():
+            if (prop.get('excelNamedRange') or '').endswith('Axis'):
+                axis, key = prop['excelNamedRange'], name
+        if axis is None:
+            sheet = pattern.get('excelSheet')
+            axes = sorted(name for name in index.names_on_row(sheet, pattern.get('excelStartRow') or 0)
+                          if name.endswith('TypedAxis'))
+            if axes:
+                axis = axes[0]
+                col = next(d.first_col for d in index.destinations[axis] if d.sheet == sheet)
+                key = next((p for p, prop in properties.items()
+                            if prop.get('excelColumn') and column_index(prop['excelColumn']) == col), None)
+        columns = {name: fact_entry(prop, prop['excelNamedRange']) for name, prop in properties.items()
+                   if is_concept(prop.get('excelNamedRange')) and name != key}
+        if axis and columns:
+            tables[pattern['patternId']] = {'axis': f'{PREFIX}:{axis}', 'key': key, 'columns': columns}
+    return tables
+
+
+def build_concept_map(template_path: str = TEMPLATE_PATH, spec_path: str = SPEC_PATH) -> Dict:
+    model = DataModel.load(spec_path)
+    with zipfile.ZipFile(template_path) as zf:
+        names = defined_names(zf)
+        parts = sheet_parts(zf)
+        cells = datapoint_cells(model)
+        document = document_datapoints(zf, names, cells, parts)
+        taxonomy = entry_point(zf)
+
+    document_ids = {dp for value in document.values() for dp in ([value] if isinstance(value, str) else value)}
+    facts, unmapped = {}, []
+    for entry in model.iter_datapoints():
+        datapoint = entry.datapoint
+        if datapoint.get('dataType') == 'table' or datapoint['datapointId'] in document_ids:
+            continue
+        if is_concept(datapoint.get('excelNamedRange')):
+            facts[datapoint['datapointId']] = fact_entry(datapoint, datapoint['excelNamedRange'])
+        else:
+            unmapped.append(datapoint['datapointId'])
+
+    return {
+        'taxonomy': taxonomy,
+        'namespaces': {
+            PREFIX: taxonomy.rsplit('/', 1)[0] if taxonomy else None,
+            'iso4217': 'http://www.xbrl.org/2003/iso4217',
+            'utr': 'http://www.xbrl.org/2009/utr',
+            'xbrli': 'http://www.xbrl.org/2003/instance',
+        },
+        'identifierSchemes': IDENTIFIER_SCHEMES,
+        'document': document,
+        'facts': facts,
+        'tables': table_entries(model, RangeIndex(names)),
+        'unmapped': unmapped,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract the XBRL concept map from the template")
+    parser.add_argument('--template', default=TEMPLATE_PATH, help="Excel template to read")
+    parser.add_argument('--spec', default=SPEC_PATH, help="Data model spec")
+    parser.add_argument('--output', default=CONCEPTS_PATH, help="Concept map to write")
+    args = parser.parse_args(argv)
+
+    concepts = build_concept_map(args.template, args.spec)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(concepts, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    print(f"✓ {len(concepts['facts'])} fact concepts, {len(concepts['tables'])} tables saved to {args.output}")
+    print(f"  taxonomy: {concepts['taxonomy']}")
+    print(f"  document: {', '.join(f'{k}={v}' for k, v in concepts['document'].items())}")
+    if concepts['unmapped']:
+        print(f"⚠️  {len(concepts['unmapped'])} datapoints without a concept: {', '.join(concepts['unmapped'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
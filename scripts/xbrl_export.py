@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+xBRL-JSON export of datapoint payloads, without a workbook.
+
+The concept map (`xbrl_concepts`, docs/data-model/vsme-xbrl-concepts.json)
+is loaded once; a payload is then turned into facts in one pass and written
+as an xBRL-JSON document (https://xbrl.org/2021/xbrl-json) chunk by chunk:
+
+  * the XBRL block of B1 gives the entity (identifier and scheme), the report
+    currency and the reporting period; every fact shares that entity and
+    period (a duration from the start date to the day after the end date);
+  * numbers keep their entered precision as ``decimals``; percentages become
+    ratios (12.5 % -> 0.125) and intensities per M€ are scaled to per unit of
+    the currency; monetary facts are in the report currency;
+  * rows of the repeating tables become facts with their typed dimension, keyed
+    by the row's identifier (or its position when the table has none);
+  * empty values, and values that do not parse for the concept's kind, are
+    left out, as the Excel-to-XBRL converter does with blank cells.
+
+    python scripts/xbrl_export.py payload.json [--output report.json]
+    python scripts/xbrl_export.py build/synthetic/payloads.jsonl --output build/xbrl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from report_filler import payload_values
+from xbrl_concepts import CONCEPTS_PATH
+
+DOCUMENT_TYPE = 'https://xbrl.org/2021/xbrl-json'
+DEFAULT_SCHEME = 'LEI'
+TRUE_VALUES = {'true', 'yes', '1'}
+FALSE_VALUES = {'false', 'no', '0'}
+
+
+class Fact(NamedTuple):
+    concept: str
+    value: str
+    unit: Optional[str] = None
+    decimals: Optional[int] = None
+    dimensions: Tuple[Tuple[str, str], ...] = ()
+
+
+class Document(NamedTuple):
+    entity: str
+    scheme: Tuple[str, str]
+    currency: Optional[str]
+    period: str
+    start: date
+    end: date
+
+
+def _date(parts: List[Optional[str]]) -> Optional[date]:
+    try:
+        year, month, day = (int(Decimal(part)) for part in parts)
+        return date(year, month, day)
+    except (TypeError, ValueError, InvalidOperation):
+        return None
+
+
+def numeric_fact(text: str, scale: float = 1) -> Optional[Tuple[str, int]]:
+    """Value and decimals of an entered number, scaled; None if it is not one"""
+    try:
+        number = Decimal(text.strip())
+    except InvalidOperation:
+        return None
+    if not number.is_finite():
+        return None
+    decimals = max(0, -number.as_tuple().exponent)
+    if scale != 1:
+        factor = Decimal(str(scale))
+        number *= factor
+        decimals -= factor.adjusted()
+    return format(number, 'f'), decimals
+
+
+class XbrlExporter:
+    """Concept map held in memory, serializing one payload at a time"""
+
+    def __init__(self, concepts_path: str = CONCEPTS_PATH) -> None:
+        with open(concepts_path, encoding='utf-8') as f:
+            self.concepts = json.load(f)
+        self.document_ids = self.concepts['document']
+        self.facts_map: Dict[str, Dict] = self.concepts['facts']
+        self.tables: Dict[str, Dict] = self.concepts['tables']
+        self.schemes: Dict[str, str] = self.concepts['identifierSchemes']
+        namespaces = {prefix: uri for prefix, uri in self.concepts['namespaces'].items() if uri}
+        self.namespaces = namespaces
+
+    def _value(self, values: Mapping[str, str], key: str):
+        ids = self.document_ids.get(key)
+        if isinstance(ids, list):
+            return [values.get(datapoint_id) for datapoint_id in ids]
+        return values.get(ids) if ids else None
+
+    def document(self, values: Mapping[str, str]) -> Document:
+        """Entity, currency and period of a payload; ValueError when the XBRL
+        block is incomplete"""
+        scheme = (self._value(values, 'identifierScheme') or '').strip() or DEFAULT_SCHEME
+        identifier = (self._value(values, 'identifier') or '').strip()
+        if scheme not in self.schemes:
+            raise ValueError(f"Unknown entity identifier scheme: {scheme}")
+        start = self._value(values, 'periodStart')
+        end = self._value(values, 'periodEnd')
+        start = _date(start) if isinstance(start, list) else _date((start or '').split('-'))
+        end = _date(end) if isinstance(end, list) else _date((end or '').split('-'))
+
+        missing = [name for name, value in (('entity identifier', identifier), ('period start', start),
+                                            ('period end', end)) if not value]
+        if missing:
+            raise ValueError(f"Incomplete XBRL information: {', '.join(missing)}")
+        if end < start:
+            raise ValueError(f"Reporting period ends before it starts: {start} - {end}")
+        prefix = ''.join(ch for ch in scheme.lower() if ch.isalnum())
+        currency = (self._value(values, 'currency') or '').strip().upper() or None
+        period = f'{start.isoformat()}T00:00:00/{(end + timedelta(days=1)).isoformat()}T00:00:00'
+        return Document(f'{prefix}:{identifier}', (prefix, self.schemes[scheme]), currency, period, start, end)
+
+    def _fact(self, entry: Mapping, text: str, currency: Optional[str],
+              dimensions: Tuple[Tuple[str, str], ...] = ()) -> Optional[Fact]:
+        text = text.strip()
+        if not text:
+            return None
+        kind = entry['kind']
+        if kind == 'numeric':
+            number = numeric_fact(text, entry.get('scale', 1))
+            unit = entry['unit']
+            if number is None or ('{currency}' in unit and not currency):
+                return None
+            return Fact(entry['concept'], number[0], unit.format(currency=currency), number[1], dimensions)
+        if kind == 'boolean':
+            if text.lower() not in TRUE_VALUES | FALSE_VALUES:
+                return None
+            return Fact(entry['concept'], 'true' if text.lower() in TRUE_VALUES else 'false', dimensions=dimensions)
+        if kind == 'date':
+            try:
+                text = date.fromisoformat(text[:10]).isoformat()
+            except ValueError:
+                return None
+        return Fact(entry['concept'], text, dimensions=dimensions)
+
+    def facts(self, values: Mapping[str, str], tables: Optional[Mapping[str, List[Mapping]]],
+              currency: Optional[str]) -> Iterator[Fact]:
+        for datapoint_id, entry in self.facts_map.items():
+            if datapoint_id in values:
+                fact = self._fact(entry, values[datapoint_id], currency)
+                if fact is not None:
+                    yield fact
+        for pattern_id, rows in (tables or {}).items():
+            table = self.tables.get(pattern_id)
+            if table is None:
+                continue
+            for position, row in enumerate(rows, 1):
+                key = row.get(table['key']) if table['key'] else position
+                if key is None or not str(key).strip():
+                    continue
+                dimensions = ((table['axis'], str(key).strip()),)
+                for name, entry in table['columns'].items():
+                    if row.get(name) is not None:
+                        fact = self._fact(entry, str(row[name]), currency, dimensions)
+                        if fact is not None:
+                            yield fact
+
+    def stream_json(self, datapoints: Iterable[Mapping],
+                    tables: Optional[Mapping[str, List[Mapping]]] = None) -> Iterator[str]:
+        """The xBRL-JSON document of a payload, in chunks. The document
+        information is checked before the chunks are returned, so an
+        incomplete payload raises ValueError before anything is written."""
+        values = payload_values(datapoints)
+        return self._chunks(values, tables, self.document(values))
+
+    def _chunks(self, values: Mapping[str, str], tables: Optional[Mapping[str, List[Mapping]]],
+                document: Document) -> Iterator[str]:
+        namespaces = dict(self.namespaces)
+        namespaces[document.scheme[0]] = document.scheme[1]
+        document_info = {'documentType': DOCUMENT_TYPE, 'namespaces': namespaces,
+                         'taxonomy': [self.concepts['taxonomy']]}
+        yield '{"documentInfo":' + json.dumps(document_info, ensure_ascii=False) + ',\n"facts":{'
+        separator = '\n'
+        for number, fact in enumerate(self.facts(values, tables, document.currency), 1):
+            dimensions = {'concept': fact.concept, 'entity': document.entity, 'period': document.period}
+            if fact.unit:
+                dimensions['unit'] = fact.unit
+            dimensions.update(fact.dimensions)
+            body = {'value': fact.value}
+            if fact.decimals is not None:
+                body['decimals'] = fact.decimals
+            body['dimensions'] = dimensions
+            yield f'{separator}"f{number}":' + json.dumps(body, ensure_ascii=False)
+            separator = ',\n'
+        yield '\n}}\n'
+
+    def to_json(self, datapoints: Iterable[Mapping], tables: Optional[Mapping[str, List[Mapping]]] = None) -> str:
+        return ''.join(self.stream_json(datapoints, tables))
+
+
+def iter_payloads(path: str) -> Iterator[Tuple[str, List[Dict], Dict]]:
+    """(report id, datapoints, tables) of a payload file: a datapoint list,
+    a {datapoints, tables} record, or payloads.jsonl of synthetic_reports"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record.get('reportId', ''), record.get('datapoints', []), record.get('tables', {})
+            return
+        payload = json.load(f)
+    name = os.path.splitext(os.path.basename(path))[0]
+    if isinstance(payload, dict):
+        yield payload.get('reportId', name), payload.get('datapoints', []), payload.get('tables', {})
+    else:
+        yield name, payload, {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export payloads as xBRL-JSON")
+    parser.add_argument('payload', help="Payload JSON, or a payloads.jsonl of several reports")
+    parser.add_argument('--output', help="File to write (a directory for .jsonl input); default: stdout")
+    parser.add_argument('--concepts', default=CONCEPTS_PATH, help="Concept map from xbrl_concepts.py")
+    args = parser.parse_args(argv)
+
+    exporter = XbrlExporter(args.concepts)
+    batch = args.payload.endswith('.jsonl')
+    if batch:
+        if not args.output:
+            parser.error("--output directory is required for .jsonl input")
+        os.makedirs(args.output, exist_ok=True)
+
+    written = failed = 0
+    started = time.perf_counter()
+    for report_id, datapoints, tables in iter_payloads(args.payload):
+        try:
+            chunks = exporter.stream_json(datapoints, tables)
+            if batch:
+                path = os.path.join(args.output, f'{report_id}.json')
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.writelines(chunks)
+            elif args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.writelines(chunks)
+            else:
+                sys.stdout.writelines(chunks)
+            written += 1
+        except ValueError as e:
+            failed += 1
+            print(f"⚠️  {report_id}: {e}", file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    if batch or args.output:
+        print(f"✓ {written} report(s) exported in {elapsed * 1000:.0f} ms "
+              f"({elapsed * 1000 / max(written, 1):.2f} ms/report)" + (f", {failed} failed" if failed else ''))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
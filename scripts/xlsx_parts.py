@@ -0,0 +1,395 @@
+"""
+Low-level helpers for reading xlsx parts without loading a whole workbook.
+
+openpyxl parses every sheet, style and string up front. These helpers work on
+the zip package directly: they resolve sheet names to their XML parts, read
+defined names, dropdown and typed validations, merged ranges and cell number
+formats, and scan a sheet part with an event-driven parser that stops as soon
+as the requested cells have been seen.
+"""
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+DOC_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+# Data validations referring to other sheets live in the x14 extension list
+X14_NS = 'http://schemas.microsoft.com/office/spreadsheetml/2009/9/main'
+XM_NS = 'http://schemas.microsoft.com/office/excel/2006/main'
+
+_M = '{%s}' % MAIN_NS
+TAG_SHEET = _M + 'sheet'
+TAG_SHEETS = _M + 'sheets'
+TAG_DEFINED_NAME = _M + 'definedName'
+TAG_ROW = _M + 'row'
+TAG_C = _M + 'c'
+TAG_V = _M + 'v'
+TAG_F = _M + 'f'
+TAG_IS = _M + 'is'
+TAG_T = _M + 't'
+TAG_SI = _M + 'si'
+TAG_R = _M + 'r'
+TAG_SHEET_DATA = _M + 'sheetData'
+TAG_DATA_VALIDATION = _M + 'dataValidation'
+TAG_FORMULA1 = _M + 'formula1'
+TAG_MERGE_CELL = _M + 'mergeCell'
+TAG_NUM_FMTS = _M + 'numFmts'
+TAG_CELL_XFS = _M + 'cellXfs'
+TAG_X14_DATA_VALIDATION = '{%s}dataValidation' % X14_NS
+TAG_X14_FORMULA1 = '{%s}formula1' % X14_NS
+TAG_XM_F = '{%s}f' % XM_NS
+TAG_XM_SQREF = '{%s}sqref' % XM_NS
+ATTR_RID = '{%s}id' % DOC_REL_NS
+
+CELL_RE = re.compile(r'\$?([A-Z]{1,3})\$?(\d+)')
+SI_START_RE = re.compile(rb'<si[\s>/]')
+SI_WRAPPER = b'<sst xmlns="' + MAIN_NS.encode() + b'">%s</sst>'
+STYLES_PART = 'xl/styles.xml'
+# Built-in number formats (ECMA-376 18.8.30) that show numbers and dates
+BUILTIN_NUMBER_FORMATS = set(range(1, 14)) | set(range(37, 41)) | {48}
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(45, 48))
+# Quoted text, escaped characters and [colour]/[condition] sections of a
+# format code, which say nothing about the kind of value
+FORMAT_LITERAL_RE = re.compile(r'"[^"]*"|\\.|\[[^\]]*\]')
+# Validation types (18.18.90) of cells that only accept numbers or dates
+VALIDATION_KINDS = {'decimal': 'number', 'whole': 'number', 'date': 'date'}
+
+Cell = Tuple[int, int]
+
+
+class CellValue(NamedTuple):
+    """Raw cell content: the ``t`` attribute, the text of ``<v>``/``<is>`` and
+    whether the value is a formula result"""
+    type: str
+    raw: Optional[str]
+    formula: bool = False
+
+
+class ListValidation(NamedTuple):
+    """A list-type data validation: the source of its dropdown (``formula1``,
+    e.g. ``enum_ListYesNo`` or ``"A,B"``) and the ranges it applies to"""
+    formula: str
+    ranges: Tuple[Tuple[int, int, int, int], ...]
+
+    def covers(self, cell: Cell) -> bool:
+        row, col = cell
+        return any(r1 <= row <= r2 and c1 <= col <= c2 for r1, c1, r2, c2 in self.ranges)
+
+
+def column_index(letters: str) -> int:
+    """Convert Excel column letters to a 1-based index ('A' -> 1, 'AA' -> 27)"""
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index
+
+
+def column_letters(index: int) -> str:
+    """Convert a 1-based column index to Excel letters (27 -> 'AA')"""
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def cell_name(row: int, col: int) -> str:
+    return f'{column_letters(col)}{row}'
+
+
+def parse_cell(cell_ref: str) -> Cell:
+    """Return (row, col) of a cell or of the top-left cell of a range"""
+    match = CELL_RE.search(cell_ref)
+    if not match:
+        raise ValueError(f"Not a cell reference: {cell_ref}")
+    return int(match.group(2)), column_index(match.group(1))
+
+
+def parse_range(cell_ref: str) -> Tuple[int, int, int, int]:
+    """Return (first_row, first_col, last_row, last_col) of a cell or range"""
+    matches = CELL_RE.findall(cell_ref)
+    if not matches:
+        raise ValueError(f"Not a cell reference: {cell_ref}")
+    (c1, r1), (c2, r2) = matches[0], matches[-1]
+    return int(r1), column_index(c1), int(r2), column_index(c2)
+
+
+def split_reference(reference: str) -> Tuple[str, str]:
+    """Split "'Sheet Name'!$D$3" into ('Sheet Name', '$D$3')"""
+    sheet, _, cell_ref = reference.rpartition('!')
+    if sheet.startswith("'") and sheet.endswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    return sheet, cell_ref
+
+
+def _resolve_target(target: str) -> str:
+    if target.startswith('/'):
+        return target[1:]
+    parts = []
+    for piece in ('xl/' + target).split('/'):
+        if piece == '..':
+            parts.pop()
+        elif piece and piece != '.':
+            parts.append(piece)
+    return '/'.join(parts)
+
+
+def workbook_relationships(zf: zipfile.ZipFile) -> Dict[str, Tuple[str, str]]:
+    """Relationship id -> (type, part path) from xl/_rels/workbook.xml.rels"""
+    root = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    return {
+        rel.get('Id'): (rel.get('Type'), _resolve_target(rel.get('Target')))
+        for rel in root
+    }
+
+
+def sheet_parts(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """Sheet name -> worksheet part path, in workbook order.
+
+    Only the ``<sheets>`` element of workbook.xml is parsed; the (much larger)
+    defined names that follow it are never read.
+    """
+    rels = workbook_relationships(zf)
+    parts: Dict[str, str] = {}
+    with zf.open('xl/workbook.xml') as stream:
+        for _, elem in ET.iterparse(stream, events=('end',)):
+            if elem.tag == TAG_SHEET:
+                parts[elem.get('name')] = rels[elem.get(ATTR_RID)][1]
+            elif elem.tag == TAG_SHEETS:
+                break
+    return parts
+
+
+def defined_names(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """Workbook-level defined name -> reference text (e.g. "'Sheet'!$D$3")"""
+    names: Dict[str, str] = {}
+    with zf.open('xl/workbook.xml') as stream:
+        for _, elem in ET.iterparse(stream, events=('end',)):
+            if elem.tag == TAG_DEFINED_NAME:
+                if elem.get('localSheetId') is None:
+                    names[elem.get('name')] = elem.text or ''
+                elem.clear()
+    return names
+
+
+def string_item_text(item: ET.Element) -> str:
+    """Displayed text of an ``<si>``/``<is>`` item: plain ``<t>`` or rich-text
+    runs; phonetic ``<rPh>`` hints are skipped"""
+    parts = []
+    for child in item:
+        if child.tag == TAG_T:
+            parts.append(child.text or '')
+        elif child.tag == TAG_R:
+            text = child.find(TAG_T)
+            if text is not None:
+                parts.append(text.text or '')
+    return ''.join(parts)
+
+
+def cell_value(elem: ET.Element) -> Optional[CellValue]:
+    """Content of a ``<c>`` element, None when it has no value"""
+    cell_type = elem.get('t', 'n')
+    if cell_type == 'inlineStr':
+        inline = elem.find(TAG_IS)
+        raw = string_item_text(inline) if inline is not None else None
+    else:
+        value = elem.find(TAG_V)
+        raw = value.text if value is not None else None
+    if raw is None:
+        return None
+    return CellValue(cell_type, raw, elem.find(TAG_F) is not None)
+
+
+def iter_cells(zf: zipfile.ZipFile, part: str) -> Iterator[Tuple[Cell, CellValue]]:
+    """Every cell with a value of a worksheet part, in sheet order"""
+    with zf.open(part) as stream:
+        for _, elem in ET.iterparse(stream, events=('end',)):
+            if elem.tag == TAG_C:
+                value = cell_value(elem)
+                if value is not None:
+                    yield parse_cell(elem.get('r')), value
+                elem.clear()
+            elif elem.tag == TAG_ROW:
+                elem.clear()
+
+
+def scan_cells(zf: zipfile.ZipFile, part: str, targets: Iterable[Cell]) -> Dict[Cell, CellValue]:
+    """Read the given cells from a worksheet part.
+
+    Rows are streamed in order; parsing stops once every target has been seen
+    or the last target row has passed, so the tail of the part is never
+    decompressed. Cells that are absent or empty are missing from the result.
+    """
+    wanted: Set[Cell] = set(targets)
+    if not wanted:
+        return {}
+    last_row = max(row for row, _ in wanted)
+    found: Dict[Cell, CellValue] = {}
+    with zf.open(part) as stream:
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == TAG_ROW and int(elem.get('r', 0)) > last_row:
+                    break
+                continue
+            if elem.tag == TAG_C:
+                cell = parse_cell(elem.get('r'))
+                if cell in wanted:
+                    value = cell_value(elem)
+                    if value is not None:
+                        found[cell] = value
+                    wanted.discard(cell)
+                    if not wanted:
+                        break
+                elem.clear()
+            elif elem.tag == TAG_ROW:
+                elem.clear()
+    return found
+
+
+def formula_cells(zf: zipfile.ZipFile, part: str) -> Set[Cell]:
+    """Cells of a worksheet part holding a formula, with or without a cached
+    result (members of shared-formula groups included)"""
+    found: Set[Cell] = set()
+    with zf.open(part) as stream:
+        for _, elem in ET.iterparse(stream, events=('end',)):
+            if elem.tag == TAG_C:
+                if elem.find(TAG_F) is not None:
+                    found.add(parse_cell(elem.get('r')))
+                elem.clear()
+            elif elem.tag == TAG_ROW:
+                elem.clear()
+    return found
+
+
+def list_validations(zf: zipfile.ZipFile, part: str) -> List[ListValidation]:
+    """List-type data validations of a worksheet part, in document order:
+    the ``<dataValidations>`` element first, then those of the x14 extension"""
+    validations: List[ListValidation] = []
+    with zf.open(part) as stream:
+        for _, elem in ET.iterparse(stream, events=('end',)):
+            if elem.tag == TAG_DATA_VALIDATION:
+                formula, sqref = elem.findtext(TAG_FORMULA1), elem.get('sqref')
+            elif elem.tag == TAG_X14_DATA_VALIDATION:
+                formula, sqref = elem.findtext(f'{TAG_X14_FORMULA1}/{TAG_XM_F}'), elem.findtext(TAG_XM_SQREF)
+            else:
+                if elem.tag in (TAG_C, TAG_ROW):
+                    elem.clear()
+                continue
+            if elem.get('type') == 'list' and formula and sqref:
+                validations.append(ListValidation(formula.strip(), tuple(parse_range(ref) for ref in sqref.split())))
+            elem.clear()
+    return validations
+
+
+def format_kind(code: str) -> Optional[str]:
+    """'number' or 'date' for a custom number format code, None for text
+    and General"""
+    code = FORMAT_LITERAL_RE.sub('', code.split(';')[0]).lower()
+    if code in ('', 'general', '@'):
+        return None
+    if re.search(r'[dmyhs]', code):
+        return 'date'
+    if re.search(r'[0#?]', code):
+        return 'number'
+    return None
+
+
+def style_kinds(zf: zipfile.ZipFile) -> List[Optional[str]]:
+    """The kind of value ('number', 'date' or None) each cell style (``s``
+    attribute, an index into cellXfs) formats its cell for"""
+    if STYLES_PART not in zf.namelist():
+        return []
+    root = ET.fromstring(zf.read(STYLES_PART))
+    custom: Dict[int, Optional[str]] = {}
+    formats = root.find(TAG_NUM_FMTS)
+    for fmt in (formats if formats is not None else []):
+        custom[int(fmt.get('numFmtId', 0))] = format_kind(fmt.get('formatCode', ''))
+    kinds: List[Optional[str]] = []
+    xfs = root.find(TAG_CELL_XFS)
+    for xf in (xfs if xfs is not None else []):
+        fmt_id = int(xf.get('numFmtId', 0))
+        if fmt_id in custom:
+            kinds.append(custom[fmt_id])
+        elif fmt_id in BUILTIN_DATE_FORMATS:
+            kinds.append('date')
+        else:
+            kinds.append('number' if fmt_id in BUILTIN_NUMBER_FORMATS else None)
+    return kinds
+
+
+class SheetLayout(NamedTuple):
+    """Cell styles (``s``), formulas, merged ranges and number/date
+    validations of a worksheet part"""
+    styles: Dict[Cell, int]
+    formulas: Dict[Cell, str]
+    merged: List[Tuple[int, int, int, int]]
+    validations: List[Tuple[str, Tuple[Tuple[int, int, int, int], ...]]]
+
+
+def sheet_layout(zf: zipfile.ZipFile, part: str) -> SheetLayout:
+    """`SheetLayout` of a worksheet part, in one pass; validations are
+    ('number' or 'date', ranges)"""
+    styles: Dict[Cell, int] = {}
+    formulas: Dict[Cell, str] = {}
+    merged: List[Tuple[int, int, int, int]] = []
+    validations = []
+    with zf.open(part) as stream:
+        for _, elem in ET.iterparse(stream, events=('end',)):
+            if elem.tag == TAG_C:
+                cell = parse_cell(elem.get('r'))
+                style = elem.get('s')
+                if style:
+                    styles[cell] = int(style)
+                formula = elem.find(TAG_F)
+                if formula is not None:
+                    formulas[cell] = formula.text or ''
+            elif elem.tag == TAG_MERGE_CELL:
+                merged.append(parse_range(elem.get('ref')))
+            elif elem.tag == TAG_DATA_VALIDATION:
+                kind = VALIDATION_KINDS.get(elem.get('type'))
+                if kind and elem.get('sqref'):
+                    validations.append((kind, tuple(parse_range(ref) for ref in elem.get('sqref').split())))
+            elif elem.tag != TAG_ROW:
+                continue
+            elem.clear()
+    return SheetLayout(styles, formulas, merged, validations)
+
+
+def read_shared_strings(zf: zipfile.ZipFile, wanted: Optional[Iterable[int]] = None) -> Dict[int, str]:
+    """Shared strings by index.
+
+    With ``wanted``, only the requested ``<si>`` items are parsed: item
+    boundaries are located with a byte scan of the part, which is much cheaper
+    than building an element for each of the thousands of strings before them.
+    """
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return {}
+    if wanted is None:
+        strings: Dict[int, str] = {}
+        with zf.open('xl/sharedStrings.xml') as stream:
+            for _, elem in ET.iterparse(stream, events=('end',)):
+                if elem.tag == TAG_SI:
+                    strings[len(strings)] = string_item_text(elem)
+                    elem.clear()
+        return strings
+
+    wanted_set = set(wanted)
+    if not wanted_set:
+        return {}
+    data = zf.read('xl/sharedStrings.xml')
+    starts = [m.start() for m in SI_START_RE.finditer(data)]
+    if not starts:
+        # Prefixed namespace (e.g. <x:si>): fall back to the full parse
+        full = read_shared_strings(zf)
+        return {i: full[i] for i in wanted_set if i in full}
+    end_of_items = data.rfind(b'</', starts[-1])
+    strings = {}
+    for index in sorted(wanted_set):
+        if index >= len(starts):
+            continue
+        end = starts[index + 1] if index + 1 < len(starts) else end_of_items
+        item = ET.fromstring(SI_WRAPPER % data[starts[index]:end])
+        strings[index] = string_item_text(item[0])
+    return strings
@@ -0,0 +1,173 @@
+"""
+Streaming zip writer for generated workbooks.
+
+`zipfile` needs a seekable file (or a full in-memory buffer) because it goes
+back to patch each local header once the entry is written. `stream_zip`
+yields the archive as a sequence of byte chunks instead, in one forward
+pass:
+
+  * entries read from a template with `read_entries` are copied as their
+    original compressed bytes, behind a fresh local header: nothing is
+    inflated or deflated again;
+  * new content is deflated in ``CHUNK_SIZE`` slices and each compressed
+    chunk is yielded as it is produced; CRC and sizes follow in a data
+    descriptor (flag bit 3), as Java's ZipOutputStream writes them;
+  * the central directory and end record come last.
+
+A consumer therefore holds at most one chunk at a time. `ZipWriter` is the
+same writer driven one entry at a time, for producers that only get later
+entries after sending the first ones; `compress_entry` deflates content up
+front into a `RawEntry`, e.g. in a worker process.
+
+Archives are limited to classic (non-ZIP64) sizes, which is ample for the
+template.
+"""
+import copy
+import io
+import struct
+import zipfile
+import zlib
+from typing import Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+CHUNK_SIZE = 64 << 10
+LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+DATA_DESCRIPTOR = struct.Struct('<4sIII')
+CENTRAL_HEADER = struct.Struct('<4sBBHHHHHIIIHHHHHII')
+END_RECORD = struct.Struct('<4sHHHHIIH')
+VERSION = 20
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+ZIP32_LIMIT = 0xFFFFFFFF
+
+
+class RawEntry(NamedTuple):
+    """A template entry as stored: compressed bytes and their metadata"""
+    info: zipfile.ZipInfo
+    compressed: Union[bytes, memoryview]
+
+
+class NewEntry(NamedTuple):
+    """Content to compress while streaming, with the template entry's metadata"""
+    info: zipfile.ZipInfo
+    data: bytes
+
+
+Entry = Union[RawEntry, NewEntry]
+
+
+def read_entries(archive: Union[bytes, memoryview], copy: bool = True) -> List[RawEntry]:
+    """Every entry of an in-memory zip with its compressed bytes, in order.
+
+    With ``copy=False`` the entries are views into ``archive`` (e.g. a shared
+    memory block), which must then outlive them.
+    """
+    entries = []
+    view = memoryview(archive)
+    with zipfile.ZipFile(io.BytesIO(view)) as zf:
+        for info in zf.infolist():
+            if info.flag_bits & 0x01:
+                raise ValueError(f"Encrypted zip entry: {info.filename}")
+            header = LOCAL_HEADER.unpack_from(view, info.header_offset)
+            start = info.header_offset + LOCAL_HEADER.size + header[9] + header[10]
+            compressed = view[start:start + info.compress_size]
+            entries.append(RawEntry(info, bytes(compressed) if copy else compressed))
+    return entries
+
+
+def _dos_time(info: zipfile.ZipInfo) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = info.date_time
+    return hour << 11 | minute << 5 | second // 2, (year - 1980) << 9 | month << 5 | day
+
+
+def _name(info: zipfile.ZipInfo) -> Tuple[bytes, int]:
+    try:
+        return info.filename.encode('ascii'), 0
+    except UnicodeEncodeError:
+        return info.filename.encode('utf-8'), FLAG_UTF8
+
+
+def _deflate(data: bytes, compress_type: int) -> Iterator[bytes]:
+    if compress_type == zipfile.ZIP_STORED:
+        for start in range(0, len(data), CHUNK_SIZE):
+            yield data[start:start + CHUNK_SIZE]
+        return
+    if compress_type != zipfile.ZIP_DEFLATED:
+        raise ValueError(f"Unsupported compression method: {compress_type}")
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    for start in range(0, len(data), CHUNK_SIZE):
+        chunk = compressor.compress(data[start:start + CHUNK_SIZE])
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def compress_entry(info: zipfile.ZipInfo, data: bytes) -> RawEntry:
+    """``data`` compressed as ``info`` says, as a `RawEntry` that any stream
+    can copy (e.g. deflated in a worker process, written by another)"""
+    compressed = b''.join(_deflate(data, info.compress_type))
+    info = copy.copy(info)
+    info.CRC, info.compress_size, info.file_size = zlib.crc32(data), len(compressed), len(data)
+    return RawEntry(info, compressed)
+
+
+class ZipWriter:
+    """One archive written entry by entry; each call returns the chunks to
+    send, so entries can be added as they become available"""
+
+    def __init__(self) -> None:
+        self.central: List[bytes] = []
+        self.offset = 0
+
+    def add(self, entry: Entry) -> Iterator[bytes]:
+        info = entry.info
+        name, flags = _name(info)
+        mtime, mdate = _dos_time(info)
+        header_offset = self.offset
+        if isinstance(entry, RawEntry):
+            crc, compressed_size, size = info.CRC, info.compress_size, info.file_size
+            header = LOCAL_HEADER.pack(b'PK\x03\x04', VERSION, flags, info.compress_type, mtime, mdate,
+                                       crc, compressed_size, size, len(name), 0)
+            yield header + name
+            yield entry.compressed
+            self.offset += len(header) + len(name) + compressed_size
+        else:
+            # Stored entries are sized up front; deflated ones get a descriptor
+            stored = info.compress_type == zipfile.ZIP_STORED
+            crc, size = zlib.crc32(entry.data), len(entry.data)
+            if not stored:
+                flags |= FLAG_DATA_DESCRIPTOR
+            header = LOCAL_HEADER.pack(b'PK\x03\x04', VERSION, flags, info.compress_type, mtime, mdate,
+                                       crc if stored else 0, size if stored else 0, size if stored else 0,
+                                       len(name), 0)
+            yield header + name
+            self.offset += len(header) + len(name)
+            compressed_size = 0
+            for chunk in _deflate(entry.data, info.compress_type):
+                compressed_size += len(chunk)
+                yield chunk
+            self.offset += compressed_size
+            if not stored:
+                descriptor = DATA_DESCRIPTOR.pack(b'PK\x07\x08', crc, compressed_size, size)
+                yield descriptor
+                self.offset += len(descriptor)
+        if max(self.offset, size, compressed_size) > ZIP32_LIMIT:
+            raise ValueError("Archive exceeds the ZIP32 size limits")
+        self.central.append(CENTRAL_HEADER.pack(
+            b'PK\x01\x02', VERSION, info.create_system, VERSION, flags, info.compress_type, mtime, mdate,
+            crc, compressed_size, size, len(name), 0, 0, 0, info.internal_attr, info.external_attr,
+            header_offset) + name)
+
+    def finish(self) -> Iterator[bytes]:
+        """The central directory and end record"""
+        directory = b''.join(self.central)
+        yield directory
+        yield END_RECORD.pack(b'PK\x05\x06', 0, 0, len(self.central), len(self.central), len(directory),
+                              self.offset, 0)
+
+
+def stream_zip(entries: Iterable[Entry]) -> Iterator[bytes]:
+    """The archive of ``entries``, in their order, as a stream of chunks"""
+    writer = ZipWriter()
+    for entry in entries:
+        yield from writer.add(entry)
+    yield from writer.finish()
@@ -0,0 +1,9 @@
+"""Shared setup: the scripts are flat modules run from the repository root
+(relative paths such as docs/data-model/vsme-data-model-spec.json)"""
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+os.chdir(ROOT)
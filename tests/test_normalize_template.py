@@ -0,0 +1,19 @@
+import zipfile
+
+from normalize_template import NORMALIZED_PATH, TEMPLATE_PATH, fill_template_path, normalize_template
+
+
+def test_fillers_use_the_normalized_template_once_built(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert fill_template_path() == TEMPLATE_PATH
+    (tmp_path / NORMALIZED_PATH).parent.mkdir(parents=True)
+    (tmp_path / NORMALIZED_PATH).write_bytes(b'')
+    assert fill_template_path() == NORMALIZED_PATH
+
+
+def test_normalized_template_has_no_calc_chain(tmp_path):
+    output = tmp_path / 'normalized.xlsx'
+    normalize_template(TEMPLATE_PATH, str(output))
+    with zipfile.ZipFile(output) as zf:
+        assert 'xl/calcChain.xml' not in zf.namelist()
+        assert b'fullCalcOnLoad="1"' in zf.read('xl/workbook.xml')
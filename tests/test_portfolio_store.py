@@ -0,0 +1,31 @@
+import json
+import math
+from collections import defaultdict
+
+from portfolio_store import main
+from synthetic_reports import generate
+
+SAMPLE = 'VSME_Report_2025-11-21.xlsx'
+
+
+def test_append_then_query_round_trip(tmp_path, capsys):
+    list(generate(str(tmp_path / 'synthetic'), count=20, seed=3))
+    payloads = tmp_path / 'synthetic' / 'payloads.jsonl'
+    expected = defaultdict(float)
+    for line in payloads.read_text(encoding='utf-8').splitlines():
+        values = {dp['datapointId']: dp['values'] for dp in json.loads(line)['datapoints']}
+        if 'scope1Emissions' in values:
+            expected[int(values['reportingPeriodEndYear'])] += float(values['scope1Emissions'])
+    assert expected
+
+    store = str(tmp_path / 'portfolio')
+    assert main(['append', store, SAMPLE, str(payloads)]) == 0
+    assert '✓ 21 reports' in capsys.readouterr().out
+
+    for year, total in expected.items():
+        assert main(['query', store, 'scope1Emissions', '--year', str(year)]) == 0
+        key, value = capsys.readouterr().out.split()
+        assert key == 'all' and math.isclose(float(value), total, rel_tol=1e-9)
+
+    assert main(['query', store, 'entityName', '--agg', 'count', '--by', 'entity']) == 0
+    assert 'duns:sdfsdf\t1' in capsys.readouterr().out.splitlines()
@@ -0,0 +1,23 @@
+import numpy as np
+
+from range_arrays import RangeArrayReader
+from report_filler import ReportFiller
+
+SAMPLE = 'VSME_Report_2025-11-21.xlsx'
+
+
+def test_table_columns_are_typed_from_the_template(tmp_path):
+    empty = tmp_path / 'empty.xlsx'
+    empty.write_bytes(ReportFiller().fill([]))
+    reader = RangeArrayReader(names=['AmountOfEmissionToSoil', 'BreakdownOfEnergyConsumptionTable',
+                                     'AmountOfEmissionsTable', 'SitesInBiodiversitySensitiveAreasTable'])
+    for path in (SAMPLE, empty):
+        arrays = reader.read(str(path))
+        assert arrays['AmountOfEmissionToSoil'].dtype == np.float64
+        assert arrays['BreakdownOfEnergyConsumptionTable'].dtype == np.float64
+        records = reader.records('AmountOfEmissionsTable', arrays['AmountOfEmissionsTable'])
+        assert [records.dtype[field].kind for field in 'DGJK'] == ['O', 'f', 'f', 'f']
+        # Site names looked up by formula stay text despite the '0.00' format
+        sites = reader.records('SitesInBiodiversitySensitiveAreasTable',
+                               arrays['SitesInBiodiversitySensitiveAreasTable'])
+        assert sites.dtype['D'].kind == 'O' and sites.dtype['G'].kind == 'f'
@@ -0,0 +1,43 @@
+import os
+
+from report_cache import ReportCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_oversize_put_drops_the_stale_entry(tmp_path):
+    cache = ReportCache(max_bytes=10, directory=str(tmp_path), max_disk_bytes=10)
+    cache.put('key', b'old')
+    cache.put('key', b'x' * 11)
+    assert cache.get_memory('key') is None
+    assert cache.get_disk('key') is None
+    assert cache.bytes == 0 and cache.disk_bytes == 0
+
+
+def test_tiers_are_consulted_separately(tmp_path):
+    clock = Clock()
+    cache = ReportCache(ttl=60, directory=str(tmp_path), clock=clock)
+    cache.put_disk('key', b'report')
+    os.utime(tmp_path / 'key.xlsx', (clock.now - 30, clock.now - 30))
+    assert cache.get_memory('key') is None
+    assert cache.get_disk('key') == b'report'
+    # Promoted with the file's age: expires with it
+    assert cache.get_memory('key') == b'report'
+    clock.now += 31
+    assert cache.get('key') is None
+    metrics = cache.metrics()
+    assert (metrics['hits'], metrics['diskHits'], metrics['misses']) == (1, 1, 1)
+
+
+def test_memory_only_cache_counts_misses():
+    cache = ReportCache()
+    assert cache.get('missing') is None
+    cache.put('key', b'report')
+    assert cache.get('key') == b'report'
+    assert (cache.counters['hits'], cache.counters['misses']) == (1, 1)
@@ -0,0 +1,60 @@
+import asyncio
+import io
+import json
+import zipfile
+
+from report_cache import ReportCache
+from report_filler import ReportFiller
+from report_service import ReportService, make_handler
+
+PAYLOAD = [
+    {'datapointId': 'entityName', 'values': 'Alpine Foods'},
+    {'datapointId': 'scope1Emissions', 'values': '1250.5'},
+]
+
+
+def _parts(content: bytes):
+    with zipfile.ZipFile(io.BytesIO(content)) as zf:
+        assert zf.testzip() is None
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+async def _post(port: int, body: bytes):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b'POST /excel-update HTTP/1.1\r\nHost: x\r\nConnection: close\r\n'
+                 b'Content-Length: %d\r\n\r\n' % len(body) + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, rest = response.partition(b'\r\n\r\n')
+    headers = dict(line.split(': ', 1) for line in head.decode('latin-1').split('\r\n')[1:])
+    if headers.get('Transfer-Encoding') != 'chunked':
+        return headers, rest
+    content = b''
+    while True:
+        size, _, rest = rest.partition(b'\r\n')
+        size = int(size, 16)
+        if not size:
+            return headers, content
+        content, rest = content + rest[:size], rest[size + 2:]
+
+
+def test_misses_are_streamed_and_hits_sent_whole():
+    async def run():
+        service = ReportService(1, 4, cache=ReportCache())
+        await service.start()
+        try:
+            server = await asyncio.start_server(make_handler(service, 1 << 20, 30.0), '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                body = json.dumps(PAYLOAD).encode()
+                return await _post(port, body), await _post(port, body), service.metrics()
+        finally:
+            service.close()
+
+    (first_headers, first), (second_headers, second), metrics = asyncio.run(run())
+    assert first_headers['Transfer-Encoding'] == 'chunked'
+    assert second_headers['Content-Length'] == str(len(second))
+    assert first == second
+    assert _parts(first) == _parts(ReportFiller().fill(PAYLOAD))
+    assert (metrics['fills'], metrics['cache']['hits']) == (1, 1)
@@ -0,0 +1,12 @@
+from translations import extract_translations
+
+
+def test_only_input_ranges_are_linked_to_labels():
+    languages, labels, range_labels = extract_translations('VSME-Digital-Template-1.1.0.xlsx')
+    assert 'en' in languages
+    assert range_labels['template_reporting_entity_name'] == 'template_label_name_of_the_reporting_entity'
+    assert range_labels['TotalSealedArea'] == 'template_label_total_sealed_area'
+    for name in ('BreakdownOfEnergyConsumptionAxis', 'BreakdownOfEnergyConsumptionTable',
+                 'BaselineYearMember', 'TypeOfHumanRightRelatedToTheConfirmedIncident'):
+        assert name not in range_labels
+    assert set(range_labels.values()) <= set(labels['en'])
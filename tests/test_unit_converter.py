@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from unit_converter import UnitConverter, normalize_unit, symbol_scale
+
+
+@pytest.fixture(scope='module')
+def converter():
+    return UnitConverter.from_workbook()
+
+
+def _blocks(converter):
+    for d, dimension in enumerate(converter.dimensions):
+        codes = np.flatnonzero(converter.unit_dimension == d)
+        yield dimension, converter.matrix[np.ix_(codes, codes)]
+
+
+def test_matrix_is_reciprocal_per_dimension(converter):
+    for dimension, block in _blocks(converter):
+        assert not np.isnan(block).any(), dimension
+        np.testing.assert_allclose(block * block.T, 1.0, rtol=1e-12, err_msg=dimension)
+
+
+def test_matrix_is_transitive_per_dimension(converter):
+    for dimension, block in _blocks(converter):
+        # m[a, k] * m[k, b] == m[a, b] for every intermediate k
+        through = block[:, :, None] * block[None, :, :]
+        np.testing.assert_allclose(through, np.broadcast_to(block[:, None, :], through.shape),
+                                   rtol=1e-12, err_msg=dimension)
+
+
+def test_dimensions_do_not_mix(converter):
+    with pytest.raises(ValueError, match='incompatible'):
+        converter.convert([1.0], 'Kg', 'MWh')
+
+
+@pytest.mark.parametrize('source, target, factor', [
+    ('J/t', 'KJ/t', 1e-3),
+    ('KJ/t', 'J/t', 1e3),
+    ('Gg/L', 't/m³', 1e6),
+    ('J/g', 'MWh/g', 1 / 3.6e9),
+    ('MWh/Kg', 'TJ/Kg', 3.6e-3),
+    ('t - tonne', 'Kg - Kilogram', 1e3),
+    ('TJ', 'MWh', 1e3 / 3.6),
+])
+def test_factors_follow_unit_scales(converter, source, target, factor):
+    assert converter.convert([2.0], source, target)[0] == pytest.approx(2.0 * factor, rel=1e-12)
+
+
+def test_template_errors_are_reported(converter):
+    wrong = {(source, target) for source, target, _, _ in converter.inconsistent}
+    assert ('J/t', 'KJ/t') in wrong
+    assert ('t/m³', 'Gg/L') in wrong
+    assert ('Kg - Kilogram', 't - tonne') not in wrong
+
+
+def test_lookup_ignores_case_and_dash_style(converter):
+    assert normalize_unit('Gg – Gigagram') == normalize_unit('gg - gigagram')
+    np.testing.assert_allclose(converter.convert([1500.0, 2.0], ['kg', 'KG - kilogram'], 't'), [1.5, 0.002])
+    assert converter.dimension('mwh') == 'energy'
+
+
+def test_unknown_symbols_take_their_scale_from_the_template():
+    assert symbol_scale('lb') is None
+    converter = UnitConverter({'mass': [('Kg', 'lb', 2.20462), ('lb', 'oz', 16.0)]})
+    assert converter.convert([1.0], 'oz', 'Kg')[0] == pytest.approx(1 / (2.20462 * 16))
+    assert converter.inconsistent == []
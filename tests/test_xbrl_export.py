@@ -0,0 +1,34 @@
+import json
+
+from import_filled_report import ReportImporter
+from synthetic_reports import generate
+from xbrl_export import XbrlExporter, main
+
+SAMPLE = 'VSME_Report_2025-11-21.xlsx'
+
+
+def test_sample_report_exports_with_its_entity_and_period():
+    exporter = XbrlExporter()
+    datapoints = ReportImporter().import_report(SAMPLE)
+    document = exporter.document({dp['datapointId']: dp['values'] for dp in datapoints})
+    # D4 holds the scheme dropdown, E4 the identifier entered next to it
+    assert document.entity == 'duns:sdfsdf'
+    assert document.scheme == ('duns', 'http://www.dnb.com/duns')
+    assert document.currency == 'USD'
+    assert (document.start.isoformat(), document.end.isoformat()) == ('2025-11-04', '2025-11-28')
+
+    exported = json.loads(exporter.to_json(datapoints))
+    assert exported['documentInfo']['namespaces']['duns'] == 'http://www.dnb.com/duns'
+
+
+def test_synthetic_payloads_export(tmp_path):
+    list(generate(str(tmp_path / 'synthetic'), count=5, seed=1))
+    output = tmp_path / 'xbrl'
+    assert main([str(tmp_path / 'synthetic' / 'payloads.jsonl'), '--output', str(output)]) == 0
+    documents = sorted(output.iterdir())
+    assert len(documents) == 5
+    for path in documents:
+        facts = json.loads(path.read_text(encoding='utf-8'))['facts']
+        assert facts
+        entities = {fact['dimensions']['entity'] for fact in facts.values()}
+        assert len(entities) == 1 and ':' in entities.pop()